@@ -0,0 +1 @@
+"""Benchmarks for the food_mcp storage engines and service layer. Run with `python -m benchmarks --help`."""
@@ -0,0 +1,141 @@
+"""
+Command line entry point, run from the food_mcp directory:
+
+    python -m benchmarks run --sizes 10000 100000 1000000 --output results.json
+    python -m benchmarks compare baseline.json results.json
+    python -m benchmarks load --serve --engine json --items 10000 --clients 32 --duration 10
+    python -m benchmarks load --url http://127.0.0.1:8000/mcp
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from food_mcp.service import ENGINES
+
+from .load import run_load, serve_pantry
+from .report import find_regressions, format_load_table, format_table
+from .runner import run_benchmarks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the pantry storage engines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and emit JSON results")
+    run.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Pantry sizes in items")
+    run.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES), help="Storage engines")
+    run.add_argument("--ops", type=int, default=100, help="Timed calls per operation")
+    run.add_argument("--load-repeat", type=int, default=3, help="Timed cold starts per engine and size")
+    run.add_argument("--batch", type=int, default=5, help="Items per add_items call")
+    run.add_argument("--seed", type=int, default=0, help="Dataset seed")
+    run.add_argument("--workdir", help="Directory for temporary pantry files")
+    run.add_argument("--output", help="Write JSON results here instead of stdout")
+
+    compare = commands.add_parser("compare", help="Report regressions between two result files")
+    compare.add_argument("baseline", help="Earlier results JSON")
+    compare.add_argument("current", help="Newer results JSON")
+    compare.add_argument("--threshold", type=float, default=1.2, help="Ratio above which a metric counts as a regression")
+
+    load = commands.add_parser("load", help="Load an HTTP server with concurrent clients and emit JSON results")
+    target = load.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Endpoint of a running server, e.g. http://127.0.0.1:8000/mcp")
+    target.add_argument("--serve", action="store_true", help="Start a local server over a synthetic pantry")
+    load.add_argument("--engine", choices=list(ENGINES), default="json", help="Storage engine of the started server")
+    load.add_argument("--items", type=int, default=10_000, help="Pantry size of the started server")
+    load.add_argument("--transport", choices=["http", "sse"], default="http", help="Transport of the started server")
+    load.add_argument("--max-readers", type=int, default=8, help="Concurrent reads allowed by the started server")
+    load.add_argument("--clients", type=int, default=16, help="Concurrent client sessions")
+    load.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    load.add_argument("--write-ratio", type=float, default=0.1, help="Share of calls that change the pantry")
+    load.add_argument("--seed", type=int, default=0, help="Dataset and call mix seed")
+    load.add_argument("--workdir", help="Directory for the started server's pantry file")
+    load.add_argument("--output", help="Write JSON results here instead of stdout")
+
+    args = parser.parse_args()
+
+    if args.command == "load":
+        return _load(args)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        with open(args.current) as f:
+            current = json.load(f)["results"]
+        regressions = find_regressions(baseline, current, args.threshold)
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regression(s) above {args.threshold}x", file=sys.stderr)
+        return 1 if regressions else 0
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        engines=args.engines,
+        ops=args.ops,
+        load_repeat=args.load_repeat,
+        batch=args.batch,
+        seed=args.seed,
+        workdir=args.workdir,
+        progress=lambda message: print(message, file=sys.stderr),
+    )
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "ops": args.ops,
+            "batch": args.batch,
+        },
+        "results": results,
+    }
+
+    print(format_table(results), file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    return 0
+
+
+def _load(args: argparse.Namespace) -> int:
+    def run(url: str) -> dict:
+        return run_load(url, clients=args.clients, duration=args.duration, write_ratio=args.write_ratio, seed=args.seed)
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+    }
+    if args.serve:
+        meta.update(engine=args.engine, items=args.items, transport=args.transport, max_readers=args.max_readers)
+        with serve_pantry(
+            engine=args.engine,
+            items=args.items,
+            transport=args.transport,
+            max_readers=args.max_readers,
+            seed=args.seed,
+            workdir=args.workdir,
+            progress=lambda message: print(message, file=sys.stderr),
+        ) as url:
+            result = run(url)
+    else:
+        meta["url"] = args.url
+        result = run(args.url)
+
+    print(format_load_table(result), file=sys.stderr)
+    document = {"meta": meta, "results": result}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
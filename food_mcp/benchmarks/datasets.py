@@ -0,0 +1,73 @@
+"""Synthetic pantry datasets with a realistic, skewed distribution of item names."""
+
+import random
+from datetime import datetime, timedelta
+
+from food_mcp.pantry import PantryItem
+
+# (general_name, shelf life in days, typical quantities, receipt name variants)
+CATALOG = [
+    ("milk", 7, ["1 gallon", "half gallon", "1 quart"], ["Whole Milk", "Organic Valley 2% Milk", "Skim Milk"]),
+    ("eggs", 25, ["12", "18", "6"], ["Large Eggs AA", "Organic Brown Eggs", "Cage Free Eggs"]),
+    ("bread", 5, ["1 loaf"], ["Sourdough Loaf", "Whole Wheat Bread", "Brioche"]),
+    ("chicken breast", 3, ["1lb", "2.5lbs", "1.2lbs"], ["Boneless Chicken Breast", "Organic Chicken Breast"]),
+    ("chicken legs", 3, ["2lbs", "3lbs"], ["Chicken Legs Family Pack", "Chicken Drumsticks"]),
+    ("ground beef", 2, ["1lb", "2lbs"], ["80/20 Ground Beef", "Lean Ground Beef"]),
+    ("ny strip", 3, ["0.8lbs", "1.5lbs"], ["NY Strip Steak", "Prime NY Strip"]),
+    ("salmon", 2, ["1lb", "0.75lbs"], ["Atlantic Salmon Fillet", "Wild Sockeye Salmon"]),
+    ("butter", 60, ["1lb", "8oz"], ["Unsalted Butter", "Kerrygold Butter"]),
+    ("cheddar", 30, ["8oz", "1lb"], ["Sharp Cheddar", "Tillamook Cheddar"]),
+    ("yogurt", 14, ["32oz", "6oz"], ["Greek Yogurt", "Vanilla Yogurt"]),
+    ("spinach", 5, ["5oz", "10oz"], ["Baby Spinach", "Organic Spinach"]),
+    ("tomatoes", 7, ["1lb", "2lbs", "6"], ["Roma Tomatoes", "Cherry Tomatoes", "Vine Tomatoes"]),
+    ("onions", 30, ["3lbs", "2"], ["Yellow Onions", "Red Onion"]),
+    ("garlic", 60, ["3", "1"], ["Garlic Bulbs", "Peeled Garlic"]),
+    ("potatoes", 30, ["5lbs", "3lbs"], ["Russet Potatoes", "Yukon Gold Potatoes"]),
+    ("apples", 21, ["3lbs", "6"], ["Honeycrisp Apples", "Gala Apples"]),
+    ("bananas", 5, ["6", "1 bunch"], ["Bananas", "Organic Bananas"]),
+    ("rice", 365, ["5lbs", "2lbs"], ["Jasmine Rice", "Basmati Rice"]),
+    ("pasta", 365, ["1lb", "2lbs"], ["Spaghetti", "Penne Rigate", "Fusilli"]),
+    ("flour", 240, ["5lbs", "2lbs"], ["King Arthur All-Purpose Flour", "Bread Flour"]),
+    ("sugar", 720, ["4lbs"], ["Granulated Sugar", "Cane Sugar"]),
+    ("olive oil", 540, ["1 liter", "500ml"], ["Extra Virgin Olive Oil"]),
+    ("canned tomatoes", 540, ["28oz", "14oz"], ["San Marzano Tomatoes", "Diced Tomatoes"]),
+    ("black beans", 720, ["15oz"], ["Black Beans Can", "Organic Black Beans"]),
+    ("coffee", 180, ["12oz", "2lbs"], ["Whole Bean Coffee", "Ground Coffee"]),
+    ("orange juice", 10, ["52oz", "1 gallon"], ["Orange Juice No Pulp"]),
+    ("tortillas", 14, ["10", "20"], ["Flour Tortillas", "Corn Tortillas"]),
+    ("bacon", 7, ["12oz", "1lb"], ["Thick Cut Bacon", "Applewood Bacon"]),
+    ("broccoli", 5, ["1lb", "2"], ["Broccoli Crowns", "Broccoli Florets"]),
+]
+
+
+def generate_items(count: int, seed: int = 0, now: datetime | None = None) -> list[PantryItem]:
+    """
+    Generate ``count`` pantry items added over the past year.
+
+    General names follow a Zipf-like distribution (a few staples dominate, like a real
+    receipt history), and expiration times follow each item's shelf life.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 1)
+    # Weight the catalog 1/rank so staples such as milk and eggs dominate
+    weights = [1 / rank for rank in range(1, len(CATALOG) + 1)]
+
+    items = []
+    for entry in rng.choices(CATALOG, weights=weights, k=count):
+        general_name, shelf_life, quantities, receipt_names = entry
+        time_added = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        receipt_name = rng.choice(receipt_names)
+        items.append(PantryItem(
+            name=receipt_name,
+            general_name=general_name,
+            quantity=rng.choice(quantities),
+            reciept_name=receipt_name,
+            time_added=time_added,
+            expiration_time=time_added + timedelta(days=shelf_life),
+        ))
+    return items
+
+
+def general_names() -> list[str]:
+    """All general names the generator can produce."""
+    return [general_name for general_name, *_ in CATALOG]
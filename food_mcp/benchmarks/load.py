@@ -0,0 +1,211 @@
+"""Load an HTTP pantry server with many concurrent MCP clients and measure throughput and tail latency."""
+
+import asyncio
+import itertools
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from fastmcp import Client
+
+from food_mcp.pantry import Pantry
+from food_mcp.service import ENGINES
+
+from .datasets import general_names, generate_items
+from .runner import PERCENTILES, SEARCH_QUERIES, _percentile, _seed_engine
+
+# The food_mcp directory, where main.py lives
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_load(
+    url: str,
+    clients: int = 16,
+    duration: float = 10.0,
+    write_ratio: float = 0.1,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Call pantry tools from ``clients`` concurrent sessions, each issuing one call after
+    another, for ``duration`` seconds.
+
+    Reads are spread over get_pantry_summary, search_pantry and query_pantry. Writes
+    alternate between adding a batch of items and removing it again, so the pantry size
+    stays stable.
+
+    Args:
+        url: Server endpoint, e.g. http://127.0.0.1:8000/mcp (or .../sse for the SSE transport)
+        clients: Concurrent client sessions
+        duration: Seconds to keep calling
+        write_ratio: Share of calls that are writes
+        seed: Seed for the choice of calls
+
+    Returns:
+        Overall and per-tool latency statistics, with requests per second over the run
+    """
+    return asyncio.run(_run_load(url, clients, duration, write_ratio, seed))
+
+
+async def _run_load(url: str, clients: int, duration: float, write_ratio: float, seed: int) -> dict[str, Any]:
+    names = general_names()
+    # tool -> [(latency ns, failed)]
+    calls: dict[str, list[tuple[int, bool]]] = {}
+
+    async with Client(url) as client:
+        # Build the lazy indexes and caches before timing anything
+        for tool, arguments in _reads(random.Random(seed), names, itertools.cycle(SEARCH_QUERIES), 3):
+            await client.call_tool(tool, arguments)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _client(url, number, deadline, write_ratio, random.Random(seed + number), names, calls)
+        for number in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    timings = [call for tool_calls in calls.values() for call in tool_calls]
+    return {
+        "clients": clients,
+        "duration_sec": elapsed,
+        "write_ratio": write_ratio,
+        "overall": _summarize(timings, elapsed),
+        "tools": {tool: _summarize(tool_calls, elapsed) for tool, tool_calls in sorted(calls.items())},
+    }
+
+
+async def _client(
+    url: str,
+    number: int,
+    deadline: float,
+    write_ratio: float,
+    rng: random.Random,
+    names: list[str],
+    calls: dict[str, list[tuple[int, bool]]],
+) -> None:
+    queries = itertools.cycle(SEARCH_QUERIES)
+    batches = itertools.count()
+    added: Optional[str] = None
+
+    async with Client(url) as client:
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                if added is None:
+                    added = f"load item {number}-{next(batches)}"
+                    tool, arguments = "add_to_pantry", {"items": [
+                        {"name": added.title(), "general_name": added, "quantity": "1", "reciept_name": added.upper()}
+                    ]}
+                else:
+                    tool, arguments = "remove_from_pantry", {"items": [added]}
+                    added = None
+            else:
+                tool, arguments = next(_reads(rng, names, queries, 1))
+
+            start = time.perf_counter_ns()
+            try:
+                failed = (await client.call_tool(tool, arguments, raise_on_error=False)).is_error
+            except Exception:
+                # E.g. a 503 once the server's connection limit is reached
+                failed = True
+            latency = time.perf_counter_ns() - start
+            calls.setdefault(tool, []).append((latency, failed))
+
+        if added is not None:
+            await client.call_tool("remove_from_pantry", {"items": [added]}, raise_on_error=False)
+
+
+def _reads(
+    rng: random.Random, names: list[str], queries: Iterator[str], count: int
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """``count`` rounds of the read calls, in random order."""
+    for _ in range(count):
+        reads = [
+            ("get_pantry_summary", {"general_name": rng.choice(names)}),
+            ("search_pantry", {"query": next(queries)}),
+            ("query_pantry", {"general_name": rng.choice(names), "limit": 20}),
+        ]
+        rng.shuffle(reads)
+        yield from reads
+
+
+def _summarize(calls: list[tuple[int, bool]], elapsed: float) -> dict[str, Any]:
+    """Latency percentiles in milliseconds, and requests per second over the whole run."""
+    ordered = sorted(latency for latency, _ in calls)
+    stats: dict[str, Any] = {"count": len(ordered), "errors": sum(failed for _, failed in calls)}
+    stats["requests_per_sec"] = len(ordered) / elapsed
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = _percentile(ordered, p) / 1e6 if ordered else None
+    stats["max_ms"] = ordered[-1] / 1e6 if ordered else None
+    return stats
+
+
+@contextmanager
+def serve_pantry(
+    engine: str = "json",
+    items: int = 10_000,
+    transport: str = "http",
+    max_readers: int = 8,
+    seed: int = 0,
+    workdir: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    """
+    Run main.py as an HTTP server on a free local port, over a synthetic pantry of
+    ``items`` items, and yield its endpoint URL. The server is shut down gracefully
+    (SIGINT, as with Ctrl-C) on exit.
+    """
+    progress = progress or (lambda message: None)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        progress(f"generating {items} items")
+        template = Path(tmp) / "template.json"
+        template.write_text(Pantry(items=generate_items(items, seed=seed)).model_dump_json(indent=2))
+        path = Path(tmp) / ENGINES[engine].default_filename
+        _seed_engine(engine, path, template)
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = {
+            **os.environ,
+            "PANTRY_ENGINE": engine,
+            "PANTRY_DB_PATH": str(path),
+            "PANTRY_TRANSPORT": transport,
+            "PANTRY_PORT": str(port),
+            "PANTRY_MAX_READERS": str(max_readers),
+        }
+        progress(f"starting {engine} server on port {port}")
+        server = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for_port(server, port)
+            yield f"http://127.0.0.1:{port}/{'sse' if transport == 'sse' else 'mcp'}"
+        finally:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+
+def _wait_for_port(server: subprocess.Popen, port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The pantry server exited with status {server.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"The pantry server did not start listening on port {port} within {timeout:.0f}s")
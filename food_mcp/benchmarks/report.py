@@ -0,0 +1,74 @@
+"""Human-readable tables and regression checks for benchmark results."""
+
+from typing import Any
+
+COLUMNS = ("p50_ms", "p95_ms", "p99_ms", "ops_per_sec", "peak_memory_bytes")
+
+
+def format_table(results: list[dict[str, Any]]) -> str:
+    """Render results as one row per (engine, size, operation)."""
+    header = f"{'engine':<8} {'items':>9} {'operation':<18} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak MiB':>9}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        for operation, stats in result["operations"].items():
+            lines.append(
+                f"{result['engine']:<8} {result['items']:>9} {operation:<18} "
+                f"{stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+                f"{stats['ops_per_sec'] or 0:>10.1f} {stats['peak_memory_bytes'] / 2**20:>9.2f}"
+            )
+        lines.append(f"{result['engine']:<8} {result['items']:>9} {'file size':<18} {result['file_size_bytes'] / 2**20:>10.2f} MiB")
+        startup = result["startup"]
+        lines.append(
+            f"{result['engine']:<8} {result['items']:>9} {'cold start':<18} {startup['seconds']:>10.3f} s "
+            f"{startup['max_rss_bytes'] / 2**20:>10.2f} MiB RSS"
+        )
+    return "\n".join(lines)
+
+
+def format_load_table(result: dict[str, Any]) -> str:
+    """Render a load run as one row per tool, then the overall figures."""
+    header = f"{'tool':<20} {'calls':>8} {'errors':>7} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}"
+    lines = [header, "-" * len(header)]
+    for tool, stats in [*result["tools"].items(), ("overall", result["overall"])]:
+        if not stats["count"]:
+            continue
+        lines.append(
+            f"{tool:<20} {stats['count']:>8} {stats['errors']:>7} {stats['requests_per_sec']:>10.1f} "
+            f"{stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f} {stats['max_ms']:>10.3f}"
+        )
+    lines.append(f"{result['clients']} clients for {result['duration_sec']:.1f} s")
+    return "\n".join(lines)
+
+
+def find_regressions(
+    baseline: list[dict[str, Any]], current: list[dict[str, Any]], threshold: float = 1.2
+) -> list[str]:
+    """
+    Compare two result sets and describe every metric that got worse by more than ``threshold``x.
+
+    p95 latency, peak memory, file size and cold start time and RSS are compared for each
+    (engine, size, operation) present in both sets.
+    """
+    previous = {(r["engine"], r["items"]): r for r in baseline}
+    regressions = []
+    for result in current:
+        key = (result["engine"], result["items"])
+        if key not in previous:
+            continue
+        label = f"{result['engine']} @ {result['items']} items"
+        old = previous[key]
+
+        if result["file_size_bytes"] > old["file_size_bytes"] * threshold:
+            regressions.append(f"{label}: file size {old['file_size_bytes']} -> {result['file_size_bytes']} bytes")
+        for metric in ("seconds", "max_rss_bytes"):
+            if result["startup"][metric] > old["startup"][metric] * threshold:
+                regressions.append(f"{label}: cold start {metric} {old['startup'][metric]:.3f} -> {result['startup'][metric]:.3f}")
+
+        for operation, stats in result["operations"].items():
+            old_stats = old["operations"].get(operation)
+            if old_stats is None:
+                continue
+            for metric in ("p95_ms", "peak_memory_bytes"):
+                if stats[metric] > old_stats[metric] * threshold:
+                    regressions.append(f"{label}: {operation} {metric} {old_stats[metric]:.3f} -> {stats[metric]:.3f}")
+    return regressions
@@ -0,0 +1,214 @@
+"""Time the storage engines and the service layer against synthetic pantries of a given size."""
+
+import itertools
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from food_mcp.pantry import Pantry, PantryItem
+from food_mcp.service import ENGINES, PantryService
+
+from .datasets import general_names, generate_items
+
+PERCENTILES = (50, 95, 99)
+
+# search_pantry queries: exact, partial, misspelled and brand names
+SEARCH_QUERIES = ("chicken", "chiken legs", "tomato", "kerrygold", "whole milk", "grnd beef")
+
+
+def run_benchmarks(
+    sizes: list[int],
+    engines: list[str],
+    ops: int = 100,
+    load_repeat: int = 3,
+    batch: int = 5,
+    seed: int = 0,
+    workdir: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> list[dict[str, Any]]:
+    """
+    Benchmark every engine at every pantry size.
+
+    Args:
+        sizes: Pantry sizes (number of items) to benchmark
+        engines: Storage engines to benchmark (keys of ENGINES)
+        ops: Timed calls per operation
+        load_repeat: Timed cold starts per engine and size (these are slow at large sizes)
+        batch: Items per add_items call
+        seed: Seed for the dataset and the choice of looked-up names
+        workdir: Directory for the pantry files (a temporary directory by default)
+        progress: Called with a short message as each benchmark starts
+
+    Returns:
+        One result per (engine, size) with file size, cold start time and memory,
+        and per-operation statistics
+    """
+    progress = progress or (lambda message: None)
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            progress(f"generating {size} items")
+            template = Path(tmp) / f"template-{size}.json"
+            template.write_text(Pantry(items=generate_items(size, seed=seed)).model_dump_json(indent=2))
+
+            for engine in engines:
+                progress(f"{engine} @ {size} items")
+                run_dir = Path(tmp) / f"{engine}-{size}"
+                run_dir.mkdir()
+                path = run_dir / ENGINES[engine].default_filename
+                _seed_engine(engine, path, template)
+                results.append({
+                    "engine": engine,
+                    "items": size,
+                    "file_size_bytes": _file_size(run_dir),
+                    "startup": _measure_startup(engine, path),
+                    "operations": _benchmark_engine(engine, path, ops, load_repeat, batch, seed),
+                })
+                shutil.rmtree(run_dir)
+            template.unlink()
+    return results
+
+
+def _seed_engine(engine: str, path: Path, template: Path) -> None:
+    """Create a pantry file for the engine holding the template's items."""
+    if engine == "sqlite":
+        db = ENGINES[engine](str(path))
+        db.import_json(str(template))
+        db.close()
+    else:
+        # The journal snapshot uses the JSON engine's format
+        shutil.copyfile(template, path)
+
+
+def _measure_startup(engine: str, path: Path) -> dict[str, float]:
+    """Time a cold start and record its peak RSS in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", engine, str(path)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def _benchmark_engine(
+    engine: str, path: Path, ops: int, load_repeat: int, batch: int, seed: int
+) -> dict[str, dict[str, Any]]:
+    rng = random.Random(seed)
+    names = general_names()
+    operations = {}
+
+    def open_engine() -> None:
+        # Open the engine and serialize the full pantry, as the get_pantry tool would
+        db = ENGINES[engine](str(path))
+        db.get_snapshot()
+        db.close()
+
+    operations["load_data"] = _measure(open_engine, load_repeat)
+
+    service = PantryService(db_path=str(path), engine=engine)
+    db = service.db
+    try:
+        operations["find_item"] = _measure(lambda: db.find_item(rng.choice(names)), ops)
+
+        # Mutations use their own general names so the dataset size stays stable
+        added = iter(range(ops + 1))
+
+        def add() -> None:
+            i = next(added)
+            db.add_items([_bench_item(i, j) for j in range(batch)])
+
+        operations["add_items"] = _measure(add, ops)
+
+        updates = iter(range(10 * ops + 10))
+        operations["update_item"] = _measure(
+            lambda: db.update_item(f"bench item {next(updates) % ops}", quantity=str(rng.randint(1, 9))), ops
+        )
+
+        # A read after a write has to serialize the pantry again; a repeated read hits the snapshot cache
+        operations["get_pantry"] = _measure(
+            service.get_pantry, ops,
+            setup=lambda: db.update_item(f"bench item {next(updates) % ops}", quantity=str(rng.randint(1, 9))),
+        )
+        operations["get_pantry_cached"] = _measure(service.get_pantry, ops)
+        operations["get_pantry_summary"] = _measure(service.get_pantry_summary, ops)
+        queries = itertools.cycle(SEARCH_QUERIES)
+        operations["search_pantry"] = _measure(lambda: service.search_pantry(next(queries)), ops)
+        # What the expiry scheduler asks on every sweep; the datasets end on 2025-01-01
+        operations["next_expiration"] = _measure(lambda: db.next_expiration(datetime(2024, 7, 1)), ops)
+
+        removed = iter(range(ops + 1))
+        operations["remove_items"] = _measure(lambda: db.remove_items([f"bench item {next(removed)}"]), ops)
+    finally:
+        db.close()
+    return operations
+
+
+def _bench_item(i: int, j: int) -> PantryItem:
+    return PantryItem(
+        name=f"Bench Item {i}-{j}",
+        general_name=f"bench item {i}",
+        quantity="1",
+        reciept_name=f"BENCH {i}-{j}",
+    )
+
+
+def _measure(
+    operation: Callable[[], Any], count: int, setup: Optional[Callable[[], Any]] = None
+) -> dict[str, Any]:
+    """
+    Time ``count`` calls of an operation, then make one more call under tracemalloc
+    (which slows allocation down, so it is kept out of the timings) to find its peak memory.
+    """
+    timings = []
+    for _ in range(count):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        operation()
+        timings.append(time.perf_counter_ns() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return _summarize(timings, peak)
+
+
+def _summarize(timings: list[int], peak_memory: int) -> dict[str, Any]:
+    """Latency statistics in milliseconds, throughput in calls per second."""
+    ordered = sorted(timings)
+    total = sum(ordered)
+    stats: dict[str, Any] = {"count": len(ordered)}
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = _percentile(ordered, p) / 1e6
+    stats["mean_ms"] = statistics.fmean(ordered) / 1e6
+    stats["max_ms"] = ordered[-1] / 1e6
+    stats["ops_per_sec"] = len(ordered) / (total / 1e9) if total else None
+    stats["peak_memory_bytes"] = peak_memory
+    return stats
+
+
+def _percentile(ordered: list[int], p: float) -> float:
+    """Linearly interpolated percentile of a sorted list."""
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _file_size(directory: Path) -> int:
+    """Total size of the engine's files (data file plus journals, WAL and lock files)."""
+    return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
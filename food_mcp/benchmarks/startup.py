@@ -0,0 +1,32 @@
+"""
+Measure a cold start in a fresh interpreter, so resident memory is not skewed by earlier benchmarks:
+
+    python -m benchmarks.startup <engine> <db_path>
+
+Prints {"seconds": ..., "max_rss_bytes": ...} for opening the engine and reading the full pantry.
+"""
+
+import json
+import resource
+import sys
+import time
+
+from food_mcp.service import ENGINES
+
+
+def measure_startup(engine: str, db_path: str) -> dict[str, float]:
+    start = time.perf_counter()
+    db = ENGINES[engine](db_path)
+    db.get_snapshot()
+    seconds = time.perf_counter() - start
+    db.close()
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    if sys.platform != "darwin":
+        max_rss *= 1024
+    return {"seconds": seconds, "max_rss_bytes": max_rss}
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure_startup(sys.argv[1], sys.argv[2])))
@@ -0,0 +1,199 @@
+"""AsyncPantryService: async variants of the PantryService tools that keep disk I/O off the event loop."""
+
+import asyncio
+import functools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .service import PantryService
+
+logger = logging.getLogger(__name__)
+
+# Tools that change the pantry; every other tool only reads it
+WRITE_METHODS = frozenset({
+    "add_to_pantry", "remove_from_pantry", "update_pantry_item", "apply_pantry_changes", "purge_expired",
+})
+
+
+class ReadWriteLock:
+    """
+    asyncio lock admitting up to ``max_readers`` readers at once, or a single writer.
+
+    Waiters are admitted in arrival order, so a waiting writer holds back readers that
+    arrive after it and a steady stream of reads cannot starve writes.
+    """
+
+    def __init__(self, max_readers: int):
+        if max_readers < 1:
+            raise ValueError("max_readers must be at least 1")
+        self.max_readers = max_readers
+        self._readers = 0
+        self._writing = False
+        # (is writer, future resolved once admitted), in arrival order
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+
+    async def acquire(self, write: bool) -> None:
+        if not self._waiters and self._can_enter(write):
+            self._enter(write)
+            return
+
+        waiter = (write, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].done() and not waiter[1].cancelled():
+                # Admitted just as we were cancelled
+                self.release(write)
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                # A cancelled writer at the front may have been holding readers back
+                self._wake()
+            raise
+
+    def release(self, write: bool) -> None:
+        if write:
+            self._writing = False
+        else:
+            self._readers -= 1
+        self._wake()
+
+    def _can_enter(self, write: bool) -> bool:
+        if write:
+            return not self._writing and self._readers == 0
+        return not self._writing and self._readers < self.max_readers
+
+    def _enter(self, write: bool) -> None:
+        if write:
+            self._writing = True
+        else:
+            self._readers += 1
+
+    def _wake(self) -> None:
+        while self._waiters:
+            write, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._can_enter(write):
+                break
+            self._waiters.popleft()
+            self._enter(write)
+            future.set_result(None)
+
+
+class AsyncPantryService:
+    """
+    Async facade over a PantryService.
+
+    Every public method of the wrapped service is available here as a coroutine
+    function with the same name, signature and docstring (so FastMCP exposes the
+    same tools), running the synchronous method in a worker thread. Reads run
+    concurrently, up to ``max_concurrent_reads`` at once, while writes (WRITE_METHODS)
+    run one at a time with no read in progress, so one service can be shared by many
+    clients. Optionally enables write-behind on the database, so a burst of mutations
+    costs in-memory work plus a single debounced flush.
+    """
+
+    def __init__(
+        self,
+        service: PantryService,
+        flush_delay: float = 0.0,
+        max_flush_delay: float = 1.0,
+        max_concurrent_reads: int = 8,
+    ):
+        """
+        Initialize the async service.
+
+        Args:
+            service: The PantryService to wrap
+            flush_delay: Seconds of quiet after a change before it is flushed to disk;
+                0 writes every change immediately (still in a worker thread)
+            max_flush_delay: Upper bound on how long a change may stay unflushed
+            max_concurrent_reads: Most read tools running at once; further calls wait their turn
+        """
+        self.service = service
+        if flush_delay > 0:
+            service.db.enable_write_behind(delay=flush_delay, max_delay=max_flush_delay)
+
+        self._lock = ReadWriteLock(max_concurrent_reads)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_reads, thread_name_prefix="pantry")
+        self._closed = False
+        # Calls running in worker threads, counted down by the threads themselves so that
+        # aclose can wait for them even if the event loop they started on has gone
+        self._running = 0
+        self._idle = threading.Condition()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.service, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        return self._in_thread(attr, write=name in WRITE_METHODS)
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting calls, wait up to ``timeout`` seconds for the ones in progress and
+        flush pending writes; call on shutdown, from any event loop.
+        """
+        self._closed = True
+        if not await asyncio.to_thread(self._wait_idle, timeout):
+            logger.warning("Pantry calls still running after %s seconds; closing the pantry anyway", timeout)
+        await asyncio.to_thread(self.service.db.close)
+        self._executor.shutdown(wait=False)
+
+    def _wait_idle(self, timeout: float) -> bool:
+        """Wait until no call is running in a worker thread; False if ``timeout`` seconds pass first."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._running == 0, timeout)
+
+    def _run(self, call: Callable[[], Any]) -> Any:
+        """Run a call in a worker thread, counting it as running until it returns."""
+        try:
+            return call()
+        finally:
+            self._done_running()
+
+    def _done_running(self) -> None:
+        with self._idle:
+            self._running -= 1
+            self._idle.notify_all()
+
+    def _in_thread(self, method: Callable[..., Any], write: bool) -> Callable[..., Any]:
+        """Wrap a blocking method in a coroutine function that runs it in a worker thread under the lock."""
+
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if self._closed:
+                raise RuntimeError("The pantry server is shutting down")
+            await self._lock.acquire(write)
+            if self._closed:
+                # Closed while waiting for the lock
+                self._lock.release(write)
+                raise RuntimeError("The pantry server is shutting down")
+            with self._idle:
+                self._running += 1
+            try:
+                job = asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._run, functools.partial(method, *args, **kwargs)
+                )
+            except BaseException:
+                self._done_running()
+                self._lock.release(write)
+                raise
+
+            def finished(job: asyncio.Future) -> None:
+                # Held until the thread is done, even if the caller gave up waiting
+                self._lock.release(write)
+                if not job.cancelled():
+                    job.exception()
+
+            job.add_done_callback(finished)
+            return await asyncio.shield(job)
+
+        return wrapper
@@ -0,0 +1,75 @@
+"""ChangeFeed: bounded history of pantry changes, so clients can catch up with diffs."""
+
+import threading
+from collections import deque
+from typing import Callable, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .pantry import PantryItem
+
+
+class ChangeEvent(BaseModel):
+    version: int = Field(description="Pantry version produced by this change.")
+    op: Literal["add", "remove", "update"] = Field(description="The kind of change.")
+    items: list[PantryItem] = Field(
+        description="Items added, removed, or (for updates) the item after the update.",
+    )
+
+
+class ChangeFeed:
+    """
+    Ring buffer of the most recent ChangeEvents.
+
+    Diffs can be served for any version from the feed's floor (the oldest
+    version it still has every later change for) up to the latest version.
+    Listeners are called synchronously after each change is recorded.
+    """
+
+    def __init__(self, maxlen: int = 1000, version: int = 0):
+        self._events: deque[ChangeEvent] = deque(maxlen=maxlen)
+        self._floor = version
+        self._listeners: list[Callable[[ChangeEvent], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def latest_version(self) -> int:
+        with self._lock:
+            return self._events[-1].version if self._events else self._floor
+
+    def append(self, event: ChangeEvent) -> None:
+        """Record a change and notify listeners."""
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                # The oldest event is about to fall off, so diffs from before it are lost
+                self._floor = self._events[0].version
+            self._events.append(event)
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(event)
+
+    def reset(self, version: int) -> None:
+        """Forget the history, e.g. after the pantry was replaced wholesale."""
+        with self._lock:
+            self._events.clear()
+            self._floor = version
+
+    def since(self, version: int) -> Optional[list[ChangeEvent]]:
+        """
+        Get the changes made after ``version``.
+
+        Returns:
+            The changes in order, or None if the feed no longer covers ``version``
+            (the caller should fall back to a full snapshot)
+        """
+        with self._lock:
+            latest = self._events[-1].version if self._events else self._floor
+            if version < self._floor or version > latest:
+                return None
+            return [event for event in self._events if event.version > version]
+
+    def subscribe(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """Call ``listener`` with every future change."""
+        with self._lock:
+            self._listeners.append(listener)
@@ -1,58 +1,228 @@
+import atexit
+import itertools
 import json
+import os
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
 
-from .pantry import Pantry, PantryItem
+try:
+    import fcntl
+except ImportError:
+    # No advisory locking on Windows; change detection still works
+    fcntl = None
+
+from .changes import ChangeEvent, ChangeFeed
+from .dedup import Submission, SubmissionLog, content_hash
+from .item_store import StoredItem, dump_pantry, extend_pantry_document, iter_pantry_file, sort_key
+from .pantry import Pantry, PantryItem, PantryOperation
+from .search import DEFAULT_THRESHOLD, SearchIndex
+from .shared_lock import SharedLock
+from .summary import ItemSummary, SummaryIndex
+from .write_behind import WriteBehind
+
+# Fields query_items can sort by
+SORT_FIELDS = ("time_added", "expiration_time", "general_name")
+
+
+class Snapshot(NamedTuple):
+    """The serialized pantry at a given version."""
+    version: int
+    etag: str
+    data: str
 
 
 class Database:
+    # File name used under ~/.pantry_mcp when no db_path is given
+    default_filename = "pantry_data.json"
+    # Whether several processes may share db_path: writes then hold an advisory
+    # lock on <db_path>.lock, and the pantry is reloaded when another process
+    # has replaced the file
+    shared_file = True
+
     def __init__(self, db_path: str):
         self.db_path = Path(db_path)
-        self.pantry: Pantry = self.load_data()
+        self._init_state()
+        with self._exclusive():
+            self._load()
+
+    def _init_state(self) -> None:
+        # Bumped on every mutation. Versions restart with each process, so ETags
+        # also carry a per-instance epoch to stay unique across restarts.
+        self.version = 0
+        self._epoch = uuid.uuid4().hex[:8]
+        self._snapshot: Optional[Snapshot] = None
+        self.changes = ChangeFeed()
+
+        # Reads hold the lock shared, so they run alongside each other; writes hold it exclusively
+        self._lock = SharedLock()
+        self._lock_depth = 0
+        # Serializes the first-use builds of the summary and search indexes by concurrent reads
+        self._index_lock = threading.Lock()
+        self._lock_file = None
+        if self.shared_file and fcntl is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.db_path.with_name(f"{self.db_path.name}.lock"), 'a')
+        # (inode, size, mtime) of the data file as last read or written by this process
+        self._stamp: Optional[tuple[int, int, int]] = None
+
+        # Set by enable_write_behind; _dirty marks changes not yet on disk
+        self._write_behind: Optional[WriteBehind] = None
+        self._dirty = False
+
+        # Recent add_items submissions, stored in the data file next to the items
+        self._submissions = SubmissionLog()
+
+        # Cold file that remove_expired moves expired items to
+        self.archive_path = _archive_path(self.db_path)
+
+    @property
+    def pantry(self) -> Pantry:
+        """The in-memory pantry, in insertion order, built from the item store on first access after a change."""
+        if self._pantry is None:
+            self._pantry = Pantry.model_construct(items=[item.to_model() for item in self._items.values()])
+        return self._pantry
+
+    @pantry.setter
+    def pantry(self, pantry: Pantry) -> None:
+        """Replace the in-memory pantry and rebuild every index from scratch."""
+        self._set_items(StoredItem.from_model(item) for item in pantry.items)
+
+    def _set_items(self, items: Iterable[StoredItem]) -> None:
+        """Replace the item store and rebuild every index from scratch."""
+        # Items are keyed by a stable id so the indexes survive removals. Ids restart with
+        # every load, so query_items positions carry this tag to tell which load they are from.
+        self._ids = itertools.count()
+        self._ids_epoch = uuid.uuid4().hex[:8]
+        self._items: dict[int, StoredItem] = {}
+        # general_name -> {item id: item}, in insertion order
+        self._by_name: dict[str, dict[int, StoredItem]] = {}
+        # Sorted lists of (timestamp, item id)
+        self._by_expiration: list[tuple[datetime, int]] = []
+        self._by_time_added: list[tuple[datetime, int]] = []
+        # Pantry view of _items, materialized lazily (and only when asked for)
+        self._pantry: Optional[Pantry] = None
+        # Per-general_name aggregates, built on the first summary request and then kept up to date
+        self._summary: Optional[SummaryIndex] = None
+        # Word index of item names for fuzzy search, likewise built on first use
+        self._search: Optional[SearchIndex] = None
+
+        # Hot loop at startup, so attribute lookups are hoisted
+        by_name = self._by_name
+        by_expiration = self._by_expiration.append
+        by_time_added = self._by_time_added.append
+        self._items = dict(zip(self._ids, items))
+        for item_id, item in self._items.items():
+            matches = by_name.get(item.general_name)
+            if matches is None:
+                matches = by_name[item.general_name] = {}
+            matches[item_id] = item
+            if item.expiration_time is not None:
+                by_expiration((sort_key(item.expiration_time), item_id))
+            by_time_added((sort_key(item.time_added), item_id))
+
+        # Sorting on the timestamp alone is stable, so ties stay in id order as with a full
+        # tuple sort, at half the comparisons
+        self._by_expiration.sort(key=itemgetter(0))
+        self._by_time_added.sort(key=itemgetter(0))
+        # Distinct general_names, sorted for prefix lookups
+        self._names: list[str] = sorted(self._by_name)
 
     def load_data(self) -> Pantry:
         """Load pantry data from JSON file. Creates empty pantry if file doesn't exist."""
+        return Pantry.model_construct(items=[item.to_model() for item in self._read_items()])
+
+    def _load(self) -> None:
+        """Load the data file into the in-memory item store."""
+        extra: dict[str, Any] = {}
+        self._set_items(self._read_items(extra))
+        self._submissions = SubmissionLog.from_json(extra.get("submissions", []))
+
+    def _read_items(self, extra: Optional[dict[str, Any]] = None) -> list[StoredItem]:
+        """
+        Stream the data file into compact items, without building a PantryItem per item.
+        Creates an empty pantry if the file doesn't exist.
+
+        Args:
+            extra: Receives any top-level keys of the file besides "items"
+        """
         if not self.db_path.exists():
             # Create empty pantry if file doesn't exist
-            empty_pantry = Pantry(items=[])
-            self.save_data(empty_pantry)
-            return empty_pantry
+            self.save_data(Pantry(items=[]))
+            return []
 
         try:
             with open(self.db_path, 'r') as f:
-                data = json.load(f)
-                return Pantry(**data)
+                self._stamp = _stamp(os.fstat(f.fileno()))
+                return list(iter_pantry_file(f, extra))
         except json.JSONDecodeError as e:
             raise ValueError(f"Corrupted pantry data file: {e}")
 
     def save_data(self, pantry: Pantry) -> None:
         """Save pantry data to JSON file."""
+        self._write(pantry.model_dump_json(indent=2))
+
+    def _write(self, data: str) -> None:
+        """Write the file atomically: write a temp file, then rename it over the old one."""
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.db_path, 'w') as f:
-            f.write(pantry.model_dump_json(indent=2))
+        tmp_path = self.db_path.with_name(f"{self.db_path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            stamp = _stamp(os.fstat(f.fileno()))
+        os.replace(tmp_path, self.db_path)
+        self._stamp = stamp
 
-    def add_items(self, items: list[PantryItem]) -> Pantry:
-        """Add items to pantry. Always appends new items (no merging)."""
-        for new_item in items:
-            # Always add as a new item (append-only behavior)
-            self.pantry.items.append(new_item)
+    def add_items(self, items: list[PantryItem], idempotency_key: Optional[str] = None) -> Pantry:
+        """
+        Add items to pantry. Always appends new items (no merging), unless the submission
+        repeats a recent one (see dedup.SubmissionLog): then nothing is added, and the given
+        items are returned, as they match what the original submission added.
+
+        Returns only the added items, so a write never materializes the whole pantry.
+
+        Args:
+            items: Items to add
+            idempotency_key: Identifies the submission, so a retry with the same key is not
+                added twice; without a key, the same items submitted again shortly are
+
+        Raises:
+            ValueError: If idempotency_key was already used for different items
+        """
+        with self._exclusive():
+            self._refresh()
+            submission = Submission(idempotency_key, content_hash(items), datetime.now())
+            if self._find_submission(submission) is not None:
+                return Pantry.model_construct(items=list(items))
 
-        # Save to disk
-        self.save_data(self.pantry)
-        return self.pantry
+            self._apply_add(items)
+            self._record_submission(submission)
+
+            # Persist the change
+            self._changed({"op": "add", "items": items, "submission": submission.to_record()}, items)
+            return Pantry.model_construct(items=list(items))
 
     def remove_items(self, general_names: list[str]) -> Pantry:
-        """Remove items from pantry by general_name."""
-        self.pantry.items = [
-            item for item in self.pantry.items
-            if item.general_name not in general_names
-        ]
+        """
+        Remove items from pantry by general_name.
+
+        Returns only the removed items, so a write never materializes the whole pantry.
+        """
+        with self._exclusive():
+            self._refresh()
+            removed = self._apply_remove(general_names)
 
-        # Save to disk
-        self.save_data(self.pantry)
-        return self.pantry
+            # Persist the change
+            self._changed({"op": "remove", "general_names": general_names}, removed)
+            return Pantry.model_construct(items=removed)
 
     def update_item(
         self,
@@ -61,29 +231,688 @@ class Database:
         name: Optional[str] = None
     ) -> PantryItem:
         """Update an existing pantry item's quantity or name."""
-        item = self.find_item(general_name)
+        with self._exclusive():
+            self._refresh()
+            item = self._apply_update(general_name, quantity, name)
+
+            # Persist the change
+            self._changed({
+                "op": "update",
+                "general_name": general_name,
+                "quantity": quantity,
+                "name": name,
+            }, [item])
+            return item
+
+    def remove_expired(self, before: datetime, archive: bool = True) -> Pantry:
+        """
+        Remove every item whose expiration_time is before the given time. Costs O(k)
+        in the number of removed items, found through the expiration index.
+
+        Args:
+            before: Items expiring before this are removed
+            archive: Append the removed items to archive_path first, so they are kept
+                out of the pantry but not lost (a crash in between may archive them twice)
+
+        Returns:
+            The removed items, soonest expired first
+        """
+        with self._exclusive():
+            self._refresh()
+            if archive:
+                self._archive(self.items_expiring_before(before))
+            removed = self._apply_remove_expired(before)
+            if removed:
+                self._changed({"op": "remove", "expired_before": before.isoformat()}, removed)
+            return Pantry.model_construct(items=removed)
+
+    def apply_batch(self, operations: list[PantryOperation]) -> list[Any]:
+        """
+        Apply add/remove/update operations in order, all or nothing, and persist them
+        with a single write.
+
+        Returns:
+            Per-operation results: the added items, the removed items, or the updated item,
+            as they were right after that operation
+        """
+        with self._exclusive():
+            self._refresh()
+            self._validate_batch(operations)
+
+            changes = []
+            results: list[Any] = []
+            for operation in operations:
+                if operation.op == "add":
+                    self._apply_add(operation.items)
+                    changes.append(({"op": "add", "items": operation.items}, operation.items))
+                    results.append(list(operation.items))
+                elif operation.op == "remove":
+                    removed = self._apply_remove(operation.general_names)
+                    changes.append(({"op": "remove", "general_names": operation.general_names}, removed))
+                    results.append(removed)
+                else:
+                    item = self._apply_update(operation.general_name, operation.quantity, operation.name)
+                    changes.append(({
+                        "op": "update",
+                        "general_name": operation.general_name,
+                        "quantity": operation.quantity,
+                        "name": operation.name,
+                    }, [item]))
+                    results.append(item)
+
+            if changes:
+                self._changed_batch(changes)
+            return results
+
+    def get_pantry(self) -> Pantry:
+        """Get the entire pantry inventory."""
+        with self._shared():
+            return self.pantry
+
+    def format_etag(self, version: int) -> str:
+        """Get the ETag of a pantry version."""
+        return f"{self._epoch}-{version}"
+
+    def parse_etag(self, etag: str) -> Optional[int]:
+        """Get the version an ETag refers to, or None if it comes from another instance."""
+        epoch, _, version = etag.rpartition("-")
+        if epoch != self._epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def changes_since(self, version: int) -> Optional[list[ChangeEvent]]:
+        """Get the changes made after ``version`` (see ChangeFeed.since), noticing other processes' writes first."""
+        with self._shared():
+            return self.changes.since(version)
+
+    def get_snapshot(self) -> Snapshot:
+        """Get the pantry serialized as indented JSON, cached until the next mutation."""
+        with self._shared():
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self.version:
+                snapshot = Snapshot(
+                    version=self.version,
+                    etag=self.format_etag(self.version),
+                    data=self._dump(),
+                )
+                self._snapshot = snapshot
+            return snapshot
+
+    def _dump(self) -> str:
+        """Serialize the pantry as indented JSON straight from the item store."""
+        return dump_pantry(self._items.values(), indent=2)
+
+    def get_summary(self, general_name: Optional[str] = None) -> list[ItemSummary]:
+        """
+        Get the total quantity, number of entries and earliest expiration per general_name,
+        sorted by general_name.
+
+        Args:
+            general_name: Only summarize this general_name (an empty list if the pantry has none)
+        """
+        with self._shared():
+            with self._index_lock:
+                if self._summary is None:
+                    self._summary = SummaryIndex(self._items.values())
+            return self._summary.summarize(general_name)
+
+    def search_items(
+        self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD
+    ) -> list[tuple[PantryItem, float]]:
+        """
+        Find the items whose name, general_name or reciept_name best match a free-text query,
+        tolerating typos and partial names.
+
+        Args:
+            query: Text to look for, e.g. "chiken legs"
+            limit: Maximum number of items to return
+            threshold: Minimum similarity (0-1) of a match
+
+        Returns:
+            (item, similarity) pairs, best match first; ties in insertion order
+        """
+        with self._shared():
+            with self._index_lock:
+                if self._search is None:
+                    self._search = SearchIndex(
+                        (item_id, item.name, item.general_name, item.reciept_name)
+                        for item_id, item in self._items.items()
+                    )
+            return [(self._items[item_id].to_model(), score)
+                    for score, item_id in self._search.search(query, limit, threshold)]
+
+    def find_item(self, general_name: str) -> Optional[PantryItem]:
+        """Find an item by its general_name."""
+        with self._shared():
+            item = self._first_item(general_name)
+            return item.to_model() if item else None
+
+    def items_expiring_before(self, before: datetime) -> list[PantryItem]:
+        """Get items whose expiration_time is before the given time, soonest first."""
+        with self._shared():
+            end = bisect_left(self._by_expiration, (sort_key(before), -1))
+            return [self._items[item_id].to_model() for _, item_id in self._by_expiration[:end]]
+
+    def next_expiration(self, after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Get the soonest expiration_time at or after ``after`` (of any item if None), as
+        naive local time, or None if no item expires then.
+        """
+        with self._shared():
+            pos = bisect_left(self._by_expiration, (sort_key(after), -1)) if after else 0
+            return self._by_expiration[pos][0] if pos < len(self._by_expiration) else None
+
+    def items_added_since(self, since: datetime) -> list[PantryItem]:
+        """Get items added at or after the given time, oldest first."""
+        with self._shared():
+            start = bisect_left(self._by_time_added, (sort_key(since), -1))
+            return [self._items[item_id].to_model() for _, item_id in self._by_time_added[start:]]
+
+    def query_items(
+        self,
+        general_name: Optional[str] = None,
+        general_name_prefix: Optional[str] = None,
+        expires_after: Optional[datetime] = None,
+        expires_before: Optional[datetime] = None,
+        added_since: Optional[datetime] = None,
+        sort_by: str = "time_added",
+        descending: bool = False,
+        after: Optional[list] = None,
+        limit: int = 50,
+    ) -> tuple[list[PantryItem], Optional[list]]:
+        """
+        Get one page of items matching every given filter, in sort order.
+
+        The scan walks the index for sort_by, starting at the bounds implied by
+        the filters and the cursor, and stops once the page is full. Sorting by
+        expiration_time only returns items that have one.
+
+        Args:
+            general_name: Exact general_name to match
+            general_name_prefix: Prefix the general_name must start with
+            expires_after: Only items expiring at or after this time
+            expires_before: Only items expiring before this time
+            added_since: Only items added at or after this time
+            sort_by: One of SORT_FIELDS
+            descending: Sort in descending order
+            after: Position returned by the previous page, to continue after it. Positions
+                from before the pantry was last reloaded are refused with a ValueError.
+            limit: Maximum number of items to return
+
+        Returns:
+            The page of items, and the JSON-serializable position of its last item
+            if more items follow (None otherwise)
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_by}'. Choose from: {', '.join(SORT_FIELDS)}")
+
+        with self._shared():
+            if after is not None:
+                # Item ids of an earlier load (e.g. before another process's write) point elsewhere now
+                if len(after) != 3 or after[2] != self._ids_epoch:
+                    raise ValueError("invalid cursor")
+                after = after[:2]
+            if sort_by == "general_name":
+                entries = self._scan_names(general_name, general_name_prefix, descending, after)
+            elif sort_by == "time_added":
+                lo = (sort_key(added_since), -1) if added_since else None
+                entries = _scan_index(self._by_time_added, lo, None, _decode_position(after), descending)
+            else:
+                lo = (sort_key(expires_after), -1) if expires_after else None
+                hi = (sort_key(expires_before), -1) if expires_before else None
+                entries = _scan_index(self._by_expiration, lo, hi, _decode_position(after), descending)
+
+            page = []
+            last = None
+            for key, item_id in entries:
+                item = self._items[item_id]
+                if not _matches(item, general_name, general_name_prefix, expires_after, expires_before, added_since):
+                    continue
+                if len(page) == limit:
+                    # A further match exists, so hand back where this page ended
+                    return page, [*_encode_position(last), self._ids_epoch]
+                page.append(item.to_model())
+                last = (key, item_id)
+            return page, None
+
+    def _scan_names(
+        self,
+        general_name: Optional[str],
+        general_name_prefix: Optional[str],
+        descending: bool,
+        after: Optional[list],
+    ) -> Iterator[tuple[str, int]]:
+        """Yield (general_name, item id) in name order, then insertion order."""
+        if general_name is not None:
+            names = [general_name] if general_name in self._by_name else []
+        else:
+            prefix = general_name_prefix or ""
+            start = bisect_left(self._names, prefix)
+            end = start
+            while end < len(self._names) and self._names[end].startswith(prefix):
+                end += 1
+            names = self._names[start:end]
+
+        if descending:
+            names = reversed(names)
+        for name in names:
+            if after is not None:
+                after_name, after_id = after
+                if (name > after_name) if descending else (name < after_name):
+                    continue
+            item_ids = reversed(self._by_name[name]) if descending else iter(self._by_name[name])
+            for item_id in item_ids:
+                if after is not None and name == after_name:
+                    if (item_id >= after_id) if descending else (item_id <= after_id):
+                        continue
+                yield name, item_id
+
+    def enable_write_behind(self, delay: float = 0.05, max_delay: float = 1.0) -> None:
+        """
+        Coalesce writes: mutations only update memory, and a background thread persists
+        them once changes pause for ``delay`` seconds (at most ``max_delay`` after the first).
+
+        Pending changes are flushed by flush(), close() and at interpreter exit. While
+        changes are pending the file is not reloaded, so another process's concurrent
+        writes can be overwritten; use this when one process does the writing.
+        """
+        if self._write_behind is None:
+            self._write_behind = WriteBehind(self.flush, delay=delay, max_delay=max_delay)
+            atexit.register(self.flush)
+
+    def flush(self) -> None:
+        """Persist changes held back by write-behind."""
+        with self._exclusive():
+            if self._dirty:
+                self._flush_pending()
+                self._dirty = False
+
+    def close(self) -> None:
+        """Flush pending changes, stop the write-behind thread and release the lock file."""
+        if self._write_behind is not None:
+            self._write_behind.close()
+            self._write_behind = None
+        self.flush()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    # ==================== MULTI-PROCESS INTERNALS ====================
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the in-process lock exclusively and, for shared files, the cross-process file lock (re-entrant)."""
+        with self._lock.exclusive():
+            if self._lock_depth == 0 and self._lock_file is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def _shared(self) -> Iterator[None]:
+        """Pick up other processes' writes, then hold the in-process lock alongside other reads."""
+        self._refresh()
+        with self._lock.shared():
+            yield
+
+    def _refresh(self) -> None:
+        """Reload the pantry if another process replaced the data file since we last read or wrote it."""
+        if not self.shared_file or self._dirty or self._is_current():
+            return
+        with self._exclusive():
+            # Another thread may have reloaded while we waited for the lock
+            if not self._is_current():
+                self._load()
+                self._replaced()
+
+    def _is_current(self) -> bool:
+        """Cheap staleness check: a single stat of the data file."""
+        try:
+            return _stamp(os.stat(self.db_path)) == self._stamp
+        except FileNotFoundError:
+            return False
+
+    # ==================== MUTATION INTERNALS ====================
+
+    def _first_item(self, general_name: str) -> Optional[StoredItem]:
+        """The first stored item with the given general_name."""
+        matches = self._by_name.get(general_name)
+        if not matches:
+            return None
+        return next(iter(matches.values()))
+
+    def _apply_add(self, items: list[PantryItem]) -> None:
+        """Append items to the in-memory pantry and its indexes."""
+        self._pantry = None
+        for item in items:
+            # Always add as a new item (append-only behavior)
+            new_item = StoredItem.from_model(item)
+            item_id = next(self._ids)
+            self._items[item_id] = new_item
+            if new_item.general_name not in self._by_name:
+                insort(self._names, new_item.general_name)
+            self._by_name.setdefault(new_item.general_name, {})[item_id] = new_item
+            if new_item.expiration_time is not None:
+                insort(self._by_expiration, (sort_key(new_item.expiration_time), item_id))
+            insort(self._by_time_added, (sort_key(new_item.time_added), item_id))
+            if self._summary is not None:
+                self._summary.add(new_item)
+            if self._search is not None:
+                self._search.add(item_id, new_item.name, new_item.general_name, new_item.reciept_name)
+
+    def _apply_remove(self, general_names: list[str]) -> list[PantryItem]:
+        """Drop every in-memory item whose general_name is listed, returning the removed items."""
+        self._pantry = None
+        removed = []
+        for general_name in general_names:
+            if general_name not in self._by_name:
+                continue
+            _discard(self._names, general_name)
+            if self._summary is not None:
+                self._summary.discard(general_name)
+            for item_id, item in self._by_name.pop(general_name).items():
+                del self._items[item_id]
+                if item.expiration_time is not None:
+                    _discard(self._by_expiration, (sort_key(item.expiration_time), item_id))
+                _discard(self._by_time_added, (sort_key(item.time_added), item_id))
+                if self._search is not None:
+                    self._search.discard(item_id, item.name, item.general_name, item.reciept_name)
+                removed.append(item.to_model())
+        return removed
+
+    def _apply_remove_expired(self, before: datetime) -> list[PantryItem]:
+        """Drop every in-memory item expiring before the given time, returning the removed items."""
+        end = bisect_left(self._by_expiration, (sort_key(before), -1))
+        if not end:
+            return []
+        self._pantry = None
+        # The expired items are a prefix of the expiration index
+        expired = self._by_expiration[:end]
+        del self._by_expiration[:end]
+
+        removed = []
+        # general_names that lost entries, and their time_added index entries
+        names = set()
+        time_added = []
+        for _, item_id in expired:
+            item = self._items.pop(item_id)
+            matches = self._by_name[item.general_name]
+            del matches[item_id]
+            if matches:
+                if self._summary is not None:
+                    self._summary.remove(item)
+            else:
+                del self._by_name[item.general_name]
+                _discard(self._names, item.general_name)
+                if self._summary is not None:
+                    self._summary.discard(item.general_name)
+            names.add(item.general_name)
+            time_added.append((sort_key(item.time_added), item_id))
+            if self._search is not None:
+                self._search.discard(item_id, item.name, item.general_name, item.reciept_name)
+            removed.append(item.to_model())
+        _discard_all(self._by_time_added, time_added)
+
+        if self._summary is not None:
+            # The removed entries were the earliest of their general_names; the new earliest of
+            # each is its first entry left in the expiration index
+            pending = {name for name in names if name in self._by_name}
+            for _, item_id in self._by_expiration:
+                if not pending:
+                    break
+                item = self._items[item_id]
+                if item.general_name in pending:
+                    pending.discard(item.general_name)
+                    self._summary.set_earliest(item.general_name, item.expiration_time)
+            for name in pending:
+                self._summary.set_earliest(name, None)
+        return removed
+
+    def _apply_update(
+        self,
+        general_name: str,
+        quantity: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> PantryItem:
+        """Update the first in-memory item matching general_name."""
+        self._pantry = None
+        item = self._first_item(general_name)
 
         if not item:
             raise ValueError(f"Item with general_name '{general_name}' not found in pantry")
 
         # Update fields if provided
         if quantity is not None:
+            if self._summary is not None:
+                self._summary.change_quantity(general_name, item.quantity, quantity)
             item.quantity = quantity
         if name is not None:
+            if self._search is not None:
+                item_id = next(iter(self._by_name[general_name]))
+                self._search.discard(item_id, item.name, item.general_name, item.reciept_name)
             item.name = name
             item.reciept_name = name
+            if self._search is not None:
+                self._search.add(item_id, item.name, item.general_name, item.reciept_name)
 
-        # Save to disk
-        self.save_data(self.pantry)
-        return item
+        return item.to_model()
 
-    def get_pantry(self) -> Pantry:
-        """Get the entire pantry inventory."""
-        return self.pantry
+    def _find_submission(self, submission: Submission) -> Optional[Submission]:
+        """The earlier submission that ``submission`` repeats, if any."""
+        return self._submissions.find(submission.idempotency_key, submission.content_hash)
 
-    def find_item(self, general_name: str) -> Optional[PantryItem]:
-        """Find an item by its general_name."""
-        for item in self.pantry.items:
-            if item.general_name == general_name:
-                return item
-        return None
\ No newline at end of file
+    def _record_submission(self, submission: Submission) -> None:
+        self._submissions.record(submission)
+
+    def _validate_batch(self, operations: list[PantryOperation]) -> None:
+        """Check up front that every operation of a batch will succeed, so none is applied if one would fail."""
+        # general_name -> whether the pantry will hold it at that point of the batch
+        present: dict[str, bool] = {}
+        for index, operation in enumerate(operations, start=1):
+            if operation.op == "add":
+                for item in operation.items:
+                    present[item.general_name] = True
+            elif operation.op == "remove":
+                for general_name in operation.general_names:
+                    present[general_name] = False
+            else:
+                exists = present.get(operation.general_name)
+                if exists is None:
+                    exists = self.find_item(operation.general_name) is not None
+                if not exists:
+                    raise ValueError(
+                        f"Operation {index}: Item with general_name '{operation.general_name}' "
+                        "not found in pantry; no changes were applied"
+                    )
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply a mutation record (as produced by the public methods) in memory."""
+        op = record["op"]
+        if op == "batch":
+            for sub_record in record["records"]:
+                self._apply(sub_record)
+        elif op == "add":
+            self._apply_add(record["items"])
+            if "submission" in record:
+                self._record_submission(Submission.from_record(record["submission"]))
+        elif op == "remove":
+            if "expired_before" in record:
+                self._apply_remove_expired(datetime.fromisoformat(record["expired_before"]))
+            else:
+                self._apply_remove(record["general_names"])
+        elif op == "update":
+            self._apply_update(record["general_name"], record["quantity"], record["name"])
+        else:
+            raise ValueError(f"Unknown pantry operation: {op}")
+
+    def _archive(self, items: list[PantryItem]) -> None:
+        """Append items to the archive file, one JSON object per line with the time they were archived."""
+        if not items:
+            return
+        archived_at = datetime.now().isoformat()
+        lines = "".join(
+            json.dumps({**item.model_dump(mode="json"), "archived_at": archived_at}) + "\n" for item in items
+        )
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.archive_path, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _changed(self, record: dict[str, Any], items: list[PantryItem]) -> None:
+        """
+        Bump the version for a mutation already applied in memory, persist it,
+        and publish the affected items to the change feed.
+        """
+        self._changed_batch([(record, items)])
+
+    def _changed_batch(self, changes: list[tuple[dict[str, Any], list[PantryItem]]]) -> None:
+        """Like _changed for several mutations, persisted as one record with a single write."""
+        first_version = self.version + 1
+        self.version += len(changes)
+        self._snapshot = None
+
+        if len(changes) == 1:
+            self._commit(changes[0][0])
+        else:
+            self._commit({"op": "batch", "records": [record for record, _ in changes]})
+
+        for version, (record, items) in enumerate(changes, start=first_version):
+            # Stored items are never handed out, so updating them in place doesn't change these
+            self.changes.append(ChangeEvent.model_construct(
+                version=version,
+                op=record["op"],
+                items=list(items),
+            ))
+
+    def _replaced(self) -> None:
+        """Bump the version after the pantry was replaced wholesale, without per-item history."""
+        self.version += 1
+        self._snapshot = None
+        self.changes.reset(self.version)
+
+    def _commit(self, record: dict[str, Any]) -> None:
+        """Persist a mutation that has already been applied in memory.
+
+        The JSON engine simply rewrites the whole file (reusing the cached
+        snapshot, so the next read is free); other engines override this to
+        persist only the change described by ``record``. With write-behind
+        enabled the write is left to the background flush.
+        """
+        if self._write_behind is not None:
+            self._dirty = True
+            self._write_behind.mark_dirty()
+            return
+        self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Write everything not yet on disk."""
+        data = self.get_snapshot().data
+        submissions = self._submissions.to_json()
+        if submissions:
+            # Kept out of the snapshot, which get_pantry serves as is
+            data = extend_pantry_document(data, submissions=submissions)
+        self._write(data)
+
+
+def _archive_path(db_path: Path) -> Path:
+    """The cold file expired items are archived to, next to the data file (pantry_data.archive.jsonl)."""
+    return db_path.with_name(f"{db_path.stem}.archive.jsonl")
+
+
+def _stamp(stat: os.stat_result) -> tuple[int, int, int]:
+    """Identify a version of the data file. Every write renames a new file into place, so the inode changes."""
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _discard(index: list, entry: Any) -> None:
+    """Remove an entry from a sorted index."""
+    pos = bisect_left(index, entry)
+    if pos < len(index) and index[pos] == entry:
+        del index[pos]
+
+
+def _discard_all(index: list, entries: list) -> None:
+    """Remove several entries from a sorted index."""
+    if len(entries) < 1024:
+        for entry in entries:
+            _discard(index, entry)
+        return
+    # Copy the runs between the doomed positions once, rather than shift the tail once per entry
+    positions = sorted(
+        pos for pos, entry in ((bisect_left(index, entry), entry) for entry in entries)
+        if pos < len(index) and index[pos] == entry
+    )
+    runs = []
+    start = 0
+    for pos in positions:
+        runs.append(index[start:pos])
+        start = pos + 1
+    runs.append(index[start:])
+    index[:] = list(itertools.chain.from_iterable(runs))
+
+
+def _scan_index(
+    index: list[tuple[datetime, int]],
+    lo: Optional[tuple[datetime, int]],
+    hi: Optional[tuple[datetime, int]],
+    after: Optional[tuple[datetime, int]],
+    descending: bool,
+) -> Iterator[tuple[datetime, int]]:
+    """Yield entries of a sorted index within [lo, hi), strictly past the ``after`` entry."""
+    start = bisect_left(index, lo) if lo else 0
+    end = bisect_left(index, hi) if hi else len(index)
+    if after is not None:
+        if descending:
+            end = min(end, bisect_left(index, after))
+        else:
+            start = max(start, bisect_right(index, after))
+
+    positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+    for pos in positions:
+        yield index[pos]
+
+
+def _matches(
+    item: StoredItem,
+    general_name: Optional[str],
+    general_name_prefix: Optional[str],
+    expires_after: Optional[datetime],
+    expires_before: Optional[datetime],
+    added_since: Optional[datetime],
+) -> bool:
+    """Check an item against query_items filters."""
+    if general_name is not None and item.general_name != general_name:
+        return False
+    if general_name_prefix is not None and not item.general_name.startswith(general_name_prefix):
+        return False
+    if expires_after or expires_before:
+        if item.expiration_time is None:
+            return False
+        expiration = sort_key(item.expiration_time)
+        if expires_after and expiration < sort_key(expires_after):
+            return False
+        if expires_before and expiration >= sort_key(expires_before):
+            return False
+    if added_since and sort_key(item.time_added) < sort_key(added_since):
+        return False
+    return True
+
+
+def _encode_position(position: tuple[Any, int]) -> list:
+    """Make an index position JSON-serializable."""
+    key, item_id = position
+    return [key.isoformat() if isinstance(key, datetime) else key, item_id]
+
+
+def _decode_position(position: Optional[list]) -> Optional[tuple[datetime, int]]:
+    """Inverse of _encode_position for timestamp indexes."""
+    if position is None:
+        return None
+    key, item_id = position
+    return datetime.fromisoformat(key), item_id
@@ -0,0 +1,122 @@
+"""Recent add_items submissions, so a retried submission is answered without adding its items again."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Iterable, NamedTuple, Optional
+
+from .pantry import PantryItem
+
+# How long a submission is remembered for its idempotency key
+SUBMISSION_TTL = timedelta(hours=24)
+# How long an identical batch without an idempotency key counts as a retry. Kept short, since
+# buying exactly the same items again later is a legitimate new submission.
+CONTENT_WINDOW = timedelta(minutes=10)
+# Most submissions remembered at once
+MAX_SUBMISSIONS = 256
+
+
+class Submission(NamedTuple):
+    """
+    A recent submission. Its items are not kept: a retry matches the content hash, so
+    it carries the same items and is answered with them.
+    """
+
+    idempotency_key: Optional[str]
+    content_hash: str
+    time: datetime
+
+    def to_record(self) -> dict[str, Any]:
+        """JSON-serializable form."""
+        return {"idempotency_key": self.idempotency_key, "content_hash": self.content_hash, "time": self.time.isoformat()}
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "Submission":
+        return cls(record["idempotency_key"], record["content_hash"], datetime.fromisoformat(record["time"]))
+
+
+def content_hash(items: list[PantryItem]) -> str:
+    """
+    Hash a batch of items by content, ignoring their order and time_added (which is set
+    when a submission is received, so differs between a submission and its retry).
+    """
+    digests = sorted(
+        json.dumps(item.model_dump(mode="json", exclude={"time_added"}), sort_keys=True)
+        for item in items
+    )
+    return hashlib.sha256("\n".join(digests).encode()).hexdigest()
+
+
+def check_reuse(submission: Submission, content_hash: str) -> None:
+    """Refuse an idempotency key that was used for a different batch of items."""
+    if submission.content_hash != content_hash:
+        raise ValueError(
+            f"Idempotency key '{submission.idempotency_key}' was already used for different items; "
+            "use a new key for a new submission"
+        )
+
+
+class SubmissionLog:
+    """
+    Bounded, expiring record of recent submissions, oldest first.
+
+    A submission with an idempotency key is a retry if that key was seen within
+    SUBMISSION_TTL; one without a key, if the same batch was submitted within CONTENT_WINDOW.
+    """
+
+    def __init__(self, submissions: Iterable[Submission] = ()):
+        # ("key", idempotency key) or ("content", content hash) -> submission
+        self._submissions: OrderedDict[tuple[str, str], Submission] = OrderedDict()
+        # Cached to_json() output, since the log changes far less often than the pantry is written
+        self._json: Optional[list[dict[str, Any]]] = None
+        for submission in submissions:
+            self.record(submission)
+
+    def find(self, idempotency_key: Optional[str], content_hash: str) -> Optional[Submission]:
+        """
+        The earlier submission a new one repeats, if any.
+
+        Raises:
+            ValueError: If the idempotency key was used for different items
+        """
+        self._expire()
+        submission = self._submissions.get(_log_key(idempotency_key, content_hash))
+        if idempotency_key is not None:
+            if submission is not None:
+                check_reuse(submission, content_hash)
+            return submission
+        if submission is not None and datetime.now() - submission.time <= CONTENT_WINDOW:
+            return submission
+        return None
+
+    def record(self, submission: Submission) -> None:
+        key = _log_key(submission.idempotency_key, submission.content_hash)
+        self._submissions.pop(key, None)
+        self._submissions[key] = submission
+        self._json = None
+        self._expire()
+
+    def to_json(self) -> list[dict[str, Any]]:
+        """Every submission as JSON-serializable dicts."""
+        if self._json is None:
+            self._json = [submission.to_record() for submission in self._submissions.values()]
+        return self._json
+
+    @classmethod
+    def from_json(cls, data: list[dict[str, Any]]) -> "SubmissionLog":
+        return cls(Submission.from_record(entry) for entry in data)
+
+    def _expire(self) -> None:
+        """Forget submissions past SUBMISSION_TTL, and the oldest beyond MAX_SUBMISSIONS."""
+        cutoff = datetime.now() - SUBMISSION_TTL
+        while self._submissions:
+            oldest = next(iter(self._submissions.values()))
+            if oldest.time >= cutoff and len(self._submissions) <= MAX_SUBMISSIONS:
+                break
+            self._submissions.popitem(last=False)
+            self._json = None
+
+
+def _log_key(idempotency_key: Optional[str], content_hash: str) -> tuple[str, str]:
+    return ("key", idempotency_key) if idempotency_key is not None else ("content", content_hash)
@@ -0,0 +1,120 @@
+"""ExpiryScheduler: act on items as their expiration_time passes, on a background thread."""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from .database import Database
+from .pantry import PantryItem
+
+logger = logging.getLogger(__name__)
+
+# Items reported per query while looking for newly expired items
+PAGE_SIZE = 500
+
+
+class ExpiryScheduler:
+    """
+    Sleeps until the next item in the pantry expires, then calls ``on_expired`` with every
+    item whose expiration_time passed since the last call. The first call, right after start,
+    reports the items that are already expired.
+
+    With ``archive_after`` set, items expired for longer than that are also removed from
+    the pantry and archived (see Database.remove_expired), so the pantry stays small.
+
+    The next due time comes from the expiration index (Database.next_expiration), and every
+    change to the pantry wakes the thread to recompute it, so a sweep never scans the pantry.
+    Changes made by other processes are picked up within ``max_sleep`` seconds.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        on_expired: Callable[[list[PantryItem]], None],
+        archive_after: Optional[timedelta] = None,
+        max_sleep: float = 60.0,
+    ):
+        """
+        Args:
+            db: The pantry database to watch
+            on_expired: Called on the scheduler thread with newly expired items, soonest expired first
+            archive_after: Archive items this long after they expired; None keeps them in the pantry
+            max_sleep: Longest wait between sweeps
+        """
+        self.db = db
+        self.on_expired = on_expired
+        self.archive_after = archive_after
+        self.max_sleep = max_sleep
+
+        # Items expiring before this have been reported
+        self._reported_until: Optional[datetime] = None
+        self._cond = threading.Condition()
+        self._woken = False
+        self._closed = False
+        db.changes.subscribe(lambda event: self.wake())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Sweep again now, e.g. because an item that expires sooner was added."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Stop the background thread, waiting for a sweep in progress."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._woken = False
+
+            try:
+                timeout = self._sweep()
+            except Exception:
+                logger.exception("Sweeping expired pantry items failed")
+                timeout = self.max_sleep
+
+            with self._cond:
+                if not self._woken and not self._closed:
+                    self._cond.wait(timeout)
+
+    def _sweep(self) -> float:
+        """Report newly expired items, archive long expired ones, and return the seconds until the next sweep is due."""
+        now = datetime.now()
+        expired = self._expired_since(self._reported_until, now)
+        self._reported_until = now
+        if expired:
+            self.on_expired(expired)
+
+        due = [self.db.next_expiration(now)]
+        if self.archive_after is not None:
+            self.db.remove_expired(now - self.archive_after, archive=True)
+            earliest = self.db.next_expiration()
+            due.append(earliest + self.archive_after if earliest else None)
+
+        wait = min(((moment - now).total_seconds() for moment in due if moment is not None), default=self.max_sleep)
+        return min(max(wait, 0.0), self.max_sleep)
+
+    def _expired_since(self, since: Optional[datetime], now: datetime) -> list[PantryItem]:
+        """Items whose expiration_time is in [since, now), soonest first, a page at a time."""
+        items: list[PantryItem] = []
+        cursor = None
+        while True:
+            page, cursor = self.db.query_items(
+                expires_after=since,
+                expires_before=now,
+                sort_by="expiration_time",
+                after=cursor,
+                limit=PAGE_SIZE,
+            )
+            items.extend(page)
+            if cursor is None:
+                return items
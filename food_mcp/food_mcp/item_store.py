@@ -0,0 +1,309 @@
+"""Compact in-memory pantry items, and streaming (de)serialization of pantry files."""
+
+import json
+import re
+import sys
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+from pydantic_core import to_json
+
+from .pantry import PantryItem
+
+# Characters read from a pantry file at a time
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Text up to the next bracket outside a string (a string cut off by the end of the buffer stops it at its quote)
+_NOT_BRACKETS = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+class StoredItem:
+    """
+    A pantry item as the in-memory engines hold it: six plain attributes in __slots__.
+
+    Much smaller and quicker to build than a PantryItem, which carries Pydantic's
+    per-instance state. Items are validated once on the way in (tool arguments,
+    or the file this server wrote) and become PantryItems again only when returned.
+    """
+
+    __slots__ = ("name", "general_name", "quantity", "reciept_name", "time_added", "expiration_time")
+
+    def __init__(
+        self,
+        name: str,
+        general_name: str,
+        quantity: str,
+        reciept_name: str,
+        time_added: datetime,
+        expiration_time: Optional[datetime],
+    ):
+        self.name = name
+        # Few distinct values repeat across many items, so share one string each
+        self.general_name = sys.intern(general_name)
+        self.quantity = sys.intern(quantity)
+        self.reciept_name = name if reciept_name == name else reciept_name
+        self.time_added = time_added
+        self.expiration_time = expiration_time
+
+    @classmethod
+    def from_model(cls, item: PantryItem) -> "StoredItem":
+        return cls(item.name, item.general_name, item.quantity, item.reciept_name, item.time_added, item.expiration_time)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "StoredItem":
+        """Build from a JSON object, validating it as a PantryItem only if it is not in the format we write."""
+        try:
+            expiration_time = data["expiration_time"]
+            return cls(
+                data["name"],
+                data["general_name"],
+                data["quantity"],
+                data["reciept_name"],
+                datetime.fromisoformat(data["time_added"]),
+                datetime.fromisoformat(expiration_time) if expiration_time is not None else None,
+            )
+        except (KeyError, TypeError, ValueError):
+            return cls.from_model(PantryItem.model_validate(data))
+
+    def to_model(self) -> PantryItem:
+        """Build a PantryItem without re-validating."""
+        return PantryItem.model_construct(
+            name=self.name,
+            general_name=self.general_name,
+            quantity=self.quantity,
+            reciept_name=self.reciept_name,
+            time_added=self.time_added,
+            expiration_time=self.expiration_time,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "general_name": self.general_name,
+            "quantity": self.quantity,
+            "reciept_name": self.reciept_name,
+            "time_added": self.time_added,
+            "expiration_time": self.expiration_time,
+        }
+
+
+def sort_key(timestamp: datetime) -> datetime:
+    """Normalize timestamps to naive local time so naive and aware values compare."""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def dump_pantry(items: Iterable[StoredItem], indent: Optional[int] = None, **extra: Any) -> str:
+    """
+    Serialize items in the same format as Pantry.model_dump_json, plus any extra top-level keys.
+
+    ``items`` may also be dicts from StoredItem.to_dict.
+    """
+    data = {"items": [item if isinstance(item, dict) else item.to_dict() for item in items], **extra}
+    return to_json(data, indent=indent).decode()
+
+
+def extend_pantry_document(document: str, **extra: Any) -> str:
+    """
+    Add top-level keys to a document from dump_pantry(indent=2), without serializing
+    its items again.
+    """
+    if not extra:
+        return document
+    # '{\n  "key": ...\n}' -> '  "key": ...\n}', spliced in place of the document's closing brace
+    keys = to_json(extra, indent=2).decode()[2:]
+    return f"{document.rstrip()[:-1].rstrip()},\n{keys}"
+
+
+def iter_pantry_file(f: TextIO, extra: Optional[dict[str, Any]] = None) -> Iterator[StoredItem]:
+    """
+    Stream the items of a pantry file, decoding one item at a time from chunked reads
+    so the whole document is never held in memory.
+
+    Other top-level keys are stored in ``extra`` once the generator is exhausted.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid pantry document
+    """
+    reader = _ChunkedReader(f)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "items":
+            reader.expect("[")
+            for value in reader.array_values():
+                yield StoredItem.from_dict(value)
+        elif extra is not None:
+            extra[key] = reader.value()
+        else:
+            reader.value()
+        if reader.expect(",}") == "}":
+            break
+    reader.expect_end()
+
+
+class _ChunkedReader:
+    """
+    Minimal pull parser over a text file. Objects and arrays are cut where a bracket scan
+    that skips strings finds their end, and decoded with json.loads; other values with
+    json's raw_decode.
+    """
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed text; False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, allowed: str) -> str:
+        """Consume one of the ``allowed`` structural characters and return it."""
+        char = self.peek()
+        if not char or char not in allowed:
+            raise json.JSONDecodeError(f"Expected one of {allowed!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def expect_end(self) -> None:
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self.buffer, self.pos)
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        end = self._containers_end(first_only=True)
+        if end is not None:
+            value = json.loads(self.buffer[self.pos:end])
+            self.pos = end
+            return value
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may continue in the next chunk
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may have more digits in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array_values(self) -> Iterator[Any]:
+        """Yield the values of an array whose "[" was just consumed, then consume its "]"."""
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            values = self._decode_buffered_values()
+            if values is None:
+                values = [self.value()]
+            yield from values
+            if self.expect(",]") == "]":
+                return
+            self._skip_whitespace()
+
+    def _decode_buffered_values(self) -> Optional[list[Any]]:
+        """
+        Decode every complete value left in the buffer with a single json.loads call,
+        instead of one raw_decode call per value.
+
+        The batch is first cut after the last "}", which usually ends an item. A cut
+        anywhere else (inside a string, inside a nested object, or past the end of the
+        array) cannot decode, so a batch that decodes is exact; otherwise _containers_end
+        scans for where the complete values end.
+        """
+        searched = self.pos
+        while True:
+            end = self.buffer.rfind("}", searched) + 1
+            if end:
+                try:
+                    values = json.loads(f"[{self.buffer[self.pos:end]}]")
+                except json.JSONDecodeError:
+                    break
+                self.pos = end
+                return values
+            if self.buffer[self.pos:self.pos + 1] != "{":
+                break
+            # The next item continues in the next chunk; only the new text needs searching
+            searched = len(self.buffer) - self.pos
+            if not self._fill():
+                break
+        end = self._containers_end()
+        if end is None:
+            return None
+        values = json.loads(f"[{self.buffer[self.pos:end]}]")
+        self.pos = end
+        return values
+
+    def _containers_end(self, first_only: bool = False) -> Optional[int]:
+        """
+        Find where the run of values starting at the current position stops being complete:
+        the end of the last object or array (of the first one, with ``first_only``) that
+        the buffer holds in full, reading more chunks until there is one.
+
+        Strings are matched whole, so brackets inside them don't count, and text already
+        scanned is not scanned again when the next chunk is read.
+
+        Returns:
+            The end offset in the buffer, or None if the next value is not an object or
+            array, or the file ends before it does
+        """
+        if self.buffer[self.pos:self.pos + 1] not in ("{", "["):
+            return None
+        depth = 0
+        end = None
+        scan = self.pos
+        while True:
+            scan = _NOT_BRACKETS.match(self.buffer, scan).end()
+            char = self.buffer[scan:scan + 1]
+            if char in ("{", "["):
+                depth += 1
+            elif char in ("}", "]"):
+                if depth == 0:
+                    # The bracket closing the enclosing array or object
+                    return end
+                depth -= 1
+                if depth == 0:
+                    end = scan + 1
+                    if first_only:
+                        return end
+            elif end is not None:
+                # The end of the buffer, or a string that continues past it
+                return end
+            else:
+                # The first value continues in the next chunk, which moves the buffer
+                scan -= self.pos
+                if not self._fill():
+                    return None
+                scan += self.pos
+                continue
+            scan += 1
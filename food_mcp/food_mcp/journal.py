@@ -0,0 +1,211 @@
+"""JournalDatabase: append-only operation log with background snapshot compaction."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .database import Database
+from .dedup import SubmissionLog
+from .item_store import dump_pantry
+from .pantry import Pantry, PantryItem
+
+
+class JournalDatabase(Database):
+    """
+    Database engine that appends one record per mutation to a journal file
+    instead of rewriting the whole pantry.
+
+    On disk the engine keeps:
+      - ``<db_path>``: a snapshot of the pantry (same format as the JSON engine,
+        plus a ``journal_seq`` marker for the last record folded into it)
+      - ``<db_path>.log``: one JSON record per line for every mutation since
+        the snapshot
+      - ``<db_path>.log.compacting``: the previous log while a compaction is
+        in progress
+
+    Startup loads the snapshot and replays any records newer than its
+    ``journal_seq``. Once the log holds ``compact_every`` records, a background
+    thread folds it into a fresh snapshot.
+
+    The journal assumes a single writing process, so the data file is not
+    locked or watched for changes by other processes.
+    """
+
+    shared_file = False
+
+    def __init__(self, db_path: str, compact_every: int = 1000, fsync: bool = True):
+        """
+        Initialize the journal engine.
+
+        Args:
+            db_path: Path of the snapshot file
+            compact_every: Number of journal records that triggers a background compaction
+            fsync: Whether to fsync the journal after every record
+        """
+        self.log_path = Path(f"{db_path}.log")
+        self.compacting_path = Path(f"{db_path}.log.compacting")
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self._compact_lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+        self._seq = 0
+        self._log_records = 0
+
+        super().__init__(db_path)
+        self._log = open(self.log_path, 'a')
+
+    def load_data(self) -> Pantry:
+        """
+        Read the snapshot and the journal records written after it into a separate store,
+        leaving the live pantry and the files as they are.
+        """
+        # A bare instance for the replay: same files, none of the live state
+        replica = JournalDatabase.__new__(JournalDatabase)
+        replica.db_path, replica.log_path, replica.compacting_path = self.db_path, self.log_path, self.compacting_path
+        replica._init_state()
+        replica._seq = replica._log_records = 0
+        with self._lock.shared():
+            replica._load(repair=False)
+        return replica.pantry
+
+    def _load(self, repair: bool = True) -> None:
+        """
+        Stream the snapshot into the item store, then replay journal records written after it.
+
+        Args:
+            repair: Whether to cut a torn last record off the journal file
+        """
+        extra: dict[str, Any] = {}
+        self._set_items(self._read_items(extra))
+        self._seq = extra.get("journal_seq", 0)
+        self._submissions = SubmissionLog.from_json(extra.get("submissions", []))
+
+        # An interrupted compaction leaves its log behind; replay it first
+        for path in (self.compacting_path, self.log_path):
+            self._replay(path, repair)
+
+    def save_data(self, pantry: Pantry) -> None:
+        """Atomically write a snapshot of the pantry tagged with the journal sequence."""
+        self._write_snapshot([item.model_dump() for item in pantry.items], self._seq, self._submissions.to_json())
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot and start an empty journal."""
+        with self._compact_lock:
+            with self._lock.exclusive():
+                # Rotate the log so writers keep appending while the snapshot is written
+                self._log.close()
+                if self.compacting_path.exists():
+                    # A previous compaction never finished; keep its records
+                    with open(self.compacting_path, 'a') as old, open(self.log_path, 'r') as new:
+                        old.write(new.read())
+                    self.log_path.unlink()
+                else:
+                    os.replace(self.log_path, self.compacting_path)
+                self._log = open(self.log_path, 'a')
+                self._log_records = 0
+
+                seq = self._seq
+                snapshot = [item.to_dict() for item in self._items.values()]
+                submissions = self._submissions.to_json()
+
+            # Disk I/O happens outside the lock so mutations are not blocked by it
+            self._write_snapshot(snapshot, seq, submissions)
+            self.compacting_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Flush pending records, wait for a running compaction and close the journal file."""
+        super().close()
+        if self._compaction is not None:
+            self._compaction.join()
+        with self._lock.exclusive():
+            self._log.close()
+
+    # ==================== JOURNAL INTERNALS ====================
+
+    def _commit(self, record: dict[str, Any]) -> None:
+        """Append the mutation record to the journal instead of rewriting the pantry."""
+        self._seq += 1
+        entry = {"seq": self._seq, **_encode_record(record)}
+
+        self._log.write(json.dumps(entry) + "\n")
+        self._log.flush()
+        if self._write_behind is not None:
+            # Group commit: one fsync covers every record of a burst
+            self._dirty = True
+            self._write_behind.mark_dirty()
+        elif self.fsync:
+            os.fsync(self._log.fileno())
+
+        self._log_records += 1
+        if self._log_records >= self.compact_every:
+            self._start_compaction()
+
+    def _flush_pending(self) -> None:
+        """Make the journal records written so far durable."""
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _write_snapshot(self, items: list[dict[str, Any]], seq: int, submissions: list[dict[str, Any]]) -> None:
+        """Atomically replace the snapshot with dumped items and recent submissions."""
+        self._write(dump_pantry(items, journal_seq=seq, submissions=submissions))
+
+    def _start_compaction(self) -> None:
+        """Run compact() on a background thread unless one is already running."""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._compaction = threading.Thread(target=self.compact, daemon=True)
+        self._compaction.start()
+
+    def _replay(self, path: Path, repair: bool = True) -> None:
+        """Apply every record in ``path`` newer than the current sequence number."""
+        if not path.exists():
+            return
+
+        with open(path, 'r') as f:
+            lines = f.readlines()
+
+        # Records are only acknowledged once their newline is written, so a
+        # final line without one is a torn write from a crash
+        if lines and not lines[-1].endswith("\n"):
+            lines.pop()
+            if repair:
+                self._truncate_torn_tail(path, lines)
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Corrupted pantry journal {path}: {e}")
+
+            if entry["seq"] <= self._seq:
+                continue
+            self._apply(_decode_record(entry))
+            self._seq = entry["seq"]
+            self._log_records += 1
+
+    @staticmethod
+    def _truncate_torn_tail(path: Path, valid_lines: list[str]) -> None:
+        """Rewrite ``path`` keeping only its fully written records."""
+        with open(path, 'w') as f:
+            f.writelines(valid_lines)
+
+
+def _encode_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Make a mutation record JSON-serializable."""
+    if record["op"] == "add":
+        return {**record, "items": [item.model_dump(mode="json") for item in record["items"]]}
+    if record["op"] == "batch":
+        return {**record, "records": [_encode_record(sub_record) for sub_record in record["records"]]}
+    return record
+
+
+def _decode_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of _encode_record."""
+    if record["op"] == "add":
+        return {**record, "items": [PantryItem(**item) for item in record["items"]]}
+    if record["op"] == "batch":
+        return {**record, "records": [_decode_record(sub_record) for sub_record in record["records"]]}
+    return record
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -25,4 +25,27 @@ class PantryItem(BaseModel):
     )
     
 class Pantry(BaseModel):
-    items: list[PantryItem]
\ No newline at end of file
+    items: list[PantryItem]
+
+
+class AddOperation(BaseModel):
+    op: Literal["add"] = "add"
+    items: list[PantryItem] = Field(description="Items to add to the pantry.")
+
+
+class RemoveOperation(BaseModel):
+    op: Literal["remove"] = "remove"
+    general_names: list[str] = Field(description="General names of the items to remove.")
+
+
+class UpdateOperation(BaseModel):
+    op: Literal["update"] = "update"
+    general_name: str = Field(description="The general name of the item to update.")
+    quantity: Optional[str] = Field(default=None, description="New quantity.")
+    name: Optional[str] = Field(default=None, description="New name.")
+
+
+PantryOperation = Annotated[
+    Union[AddOperation, RemoveOperation, UpdateOperation],
+    Field(discriminator="op"),
+]
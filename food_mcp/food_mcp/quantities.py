@@ -0,0 +1,172 @@
+"""Parse free-text pantry quantities ("2.5lbs", "1 gallon", "half dozen") into a value and a normalized unit."""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Unit used for plain counts ("12", "6 each")
+COUNT = "count"
+
+
+class Unit(NamedTuple):
+    """A normalized unit: what it measures, and its size in that dimension's base unit (g, ml, count)."""
+    dimension: str
+    factor: float
+
+
+UNITS: dict[str, Unit] = {
+    "g": Unit("mass", 1.0),
+    "kg": Unit("mass", 1000.0),
+    "mg": Unit("mass", 0.001),
+    "lb": Unit("mass", 453.59237),
+    "oz": Unit("mass", 28.349523125),
+    "ml": Unit("volume", 1.0),
+    "l": Unit("volume", 1000.0),
+    "tsp": Unit("volume", 4.92892159375),
+    "tbsp": Unit("volume", 14.78676478125),
+    "fl oz": Unit("volume", 29.5735295625),
+    "cup": Unit("volume", 236.5882365),
+    "pt": Unit("volume", 473.176473),
+    "qt": Unit("volume", 946.352946),
+    "gal": Unit("volume", 3785.411784),
+    COUNT: Unit("count", 1.0),
+}
+
+# Spellings of the units above
+ALIASES = {
+    "gram": "g", "grams": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kilo": "kg", "kilos": "kg", "kgs": "kg",
+    "milligram": "mg", "milligrams": "mg",
+    "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ounce": "oz", "ounces": "oz",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l", "ltr": "l",
+    "teaspoon": "tsp", "teaspoons": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "floz": "fl oz", "fl. oz": "fl oz", "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "cups": "cup",
+    "pint": "pt", "pints": "pt",
+    "quart": "qt", "quarts": "qt",
+    "gallon": "gal", "gallons": "gal",
+    "": COUNT, "ct": COUNT, "each": COUNT, "ea": COUNT, "pc": COUNT, "pcs": COUNT,
+    "piece": COUNT, "pieces": COUNT, "item": COUNT, "items": COUNT,
+}
+
+# Container and produce words whose singular is not the plural minus its "s", and words
+# that only look plural. Any other word ending in a single "s" is a regular plural.
+IRREGULAR_PLURALS = {
+    "berries": "berry", "blackberries": "blackberry", "blueberries": "blueberry", "cherries": "cherry",
+    "cranberries": "cranberry", "raspberries": "raspberry", "strawberries": "strawberry",
+    "batches": "batch", "boxes": "box", "bunches": "bunch", "dishes": "dish", "glasses": "glass",
+    "peaches": "peach", "pouches": "pouch", "radishes": "radish", "sandwiches": "sandwich",
+    "mangoes": "mango", "potatoes": "potato", "tomatoes": "tomato",
+    "halves": "half", "leaves": "leaf", "loaves": "loaf",
+    "asparagus": "asparagus", "couscous": "couscous", "hummus": "hummus", "molasses": "molasses",
+}
+
+# Words that stand for a number, or multiply the number before them
+NUMBER_WORDS = {"a": 1.0, "an": 1.0, "one": 1.0, "two": 2.0, "three": 3.0, "four": 4.0, "half": 0.5}
+MULTIPLIERS = {"dozen": 12.0}
+
+_QUANTITY = re.compile(
+    r"""
+    ^(?P<number>
+        \d+\s+\d+/\d+          # mixed fraction: 1 1/2
+      | \d+/\d+                # fraction: 1/2
+      | \d*\.?\d+              # decimal: 2, 2.5, .5
+      | [a-z]+(?=\s)           # number word: half, a
+    )?
+    \s*(?P<multiplier>dozen\b)?
+    \s*(?P<unit>[a-z][a-z .]*?)?
+    \.?$
+    """,
+    re.VERBOSE,
+)
+
+
+class Quantity(NamedTuple):
+    value: float
+    unit: str
+
+
+# Quantities repeat a lot across entries ("1lb", "12")
+@lru_cache(maxsize=4096)
+def parse_quantity(text: str) -> Optional[Quantity]:
+    """
+    Parse a quantity string into a value and a normalized unit.
+
+    Known units are normalized to the keys of UNITS ("2.5lbs" -> 2.5 lb, "1 gallon" -> 1 gal,
+    "12" -> 12 count, "a dozen" -> 12 count). Any other single word is kept as a unit of its
+    own, singularized ("2 cans" -> 2 can, "2 loaves" -> 2 loaf), when a number comes with it.
+    A dozen of anything that is not a measuring unit is a count ("1 dozen eggs" -> 12 count),
+    so it adds up with plain counts of the same item.
+
+    Returns:
+        The parsed quantity, or None if the text is not a number and/or unit
+    """
+    match = _QUANTITY.match(" ".join(text.lower().split()))
+    if match is None:
+        return None
+    number, multiplier, unit = match.group("number", "multiplier", "unit")
+
+    if number is None:
+        value = 1.0
+    elif number in NUMBER_WORDS:
+        value = NUMBER_WORDS[number]
+    elif number.isalpha():
+        return None
+    else:
+        try:
+            value = sum(_parse_number(part) for part in number.split())
+        except ZeroDivisionError:
+            return None
+    if multiplier:
+        value *= MULTIPLIERS[multiplier]
+
+    unit = (unit or "").strip()
+    if number is None and not multiplier and unit not in UNITS and ALIASES.get(unit, COUNT) == COUNT:
+        # A bare word is only a quantity if it names a measuring unit ("gallon")
+        return None
+    unit = _normalize_unit(unit)
+    if unit is None:
+        return None
+    if multiplier and unit not in UNITS:
+        unit = COUNT
+    return Quantity(value, unit)
+
+
+def convert(quantity: Quantity, unit: str) -> Quantity:
+    """Express a quantity in another unit of the same dimension."""
+    source, target = UNITS[quantity.unit], UNITS[unit]
+    if source.dimension != target.dimension:
+        raise ValueError(f"Cannot convert {quantity.unit} to {unit}")
+    return Quantity(quantity.value * source.factor / target.factor, unit)
+
+
+def dimension(unit: str) -> str:
+    """The dimension a unit measures; units outside UNITS (cans, loaves) are their own dimension."""
+    known = UNITS.get(unit)
+    return known.dimension if known else unit
+
+
+def _parse_number(text: str) -> float:
+    if "/" in text:
+        numerator, denominator = text.split("/")
+        return float(numerator) / float(denominator)
+    return float(text)
+
+
+def _normalize_unit(unit: str) -> Optional[str]:
+    """Map a unit spelling to its normalized name, or None if it is not a single unit word."""
+    if unit in UNITS:
+        return unit
+    if unit in ALIASES:
+        return ALIASES[unit]
+    if not unit.isalpha():
+        return None
+    # Container units such as cans, boxes and berries are kept, in the singular
+    if unit in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[unit]
+    if unit.endswith("s") and not unit.endswith("ss"):
+        return unit[:-1]
+    return unit
@@ -0,0 +1,200 @@
+"""Fuzzy search over item names: a word index of the distinct name, general_name and reciept_name texts."""
+
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable
+
+# Minimum similarity (0-1) of a text to a query for its items to match
+DEFAULT_THRESHOLD = 0.3
+# Minimum similarity of a word to a query word to count as the same word ("chiken" ~ "chicken")
+WORD_THRESHOLD = 0.45
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# Names repeat a lot across entries
+@lru_cache(maxsize=4096)
+def normalize(text: str) -> str:
+    """Lowercase a text and reduce it to its words, so "Whole  Milk!" and "whole milk" are the same text."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def trigrams(word: str) -> set[str]:
+    """The trigrams of a word padded as "  word ", so short words and word starts count ("eg" -> "  e", " eg", "eg ")."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(shared: float, query_size: int, text_size: int) -> float:
+    """
+    Score how well something of ``text_size`` parts matches a query of ``query_size`` parts
+    when ``shared`` of them match: the mean of their Jaccard similarity, which favors texts of
+    the query's length, and the share of the query found, so "chicken" still matches
+    "Boneless Chicken Breast". Used for words (parts are trigrams) and texts (parts are words).
+    """
+    shared = min(shared, text_size)
+    return (shared / (query_size + text_size - shared) + shared / query_size) / 2
+
+
+def item_texts(name: str, general_name: str, reciept_name: str) -> set[str]:
+    """The distinct normalized texts an item can be found by."""
+    texts = {normalize(name), normalize(general_name), normalize(reciept_name)}
+    texts.discard("")
+    return texts
+
+
+class SearchIndex:
+    """
+    Index of the pantry's item names, updated on every change.
+
+    Items are indexed through their distinct texts, and texts through their words. A pantry
+    holds far fewer distinct words than entries, so a query compares its words with the
+    vocabulary (by trigrams, to tolerate typos), then scores the texts holding the matched
+    words, shortest first, until no longer text can make it into the results.
+    """
+
+    def __init__(self, items: Iterable[tuple[int, str, str, str]] = ()):
+        # trigram -> vocabulary words containing it
+        self._trigrams: dict[str, set[str]] = {}
+        # word -> (its number of trigrams, {number of words of a text: texts with that many words containing it})
+        self._words: dict[str, tuple[int, dict[int, set[str]]]] = {}
+        # text -> (its distinct words, {item id: None} in insertion order)
+        self._texts: dict[str, tuple[frozenset[str], dict[int, None]]] = {}
+        for item_id, name, general_name, reciept_name in items:
+            self.add(item_id, name, general_name, reciept_name)
+
+    def add(self, item_id: int, name: str, general_name: str, reciept_name: str) -> None:
+        for text in item_texts(name, general_name, reciept_name):
+            entry = self._texts.get(text)
+            if entry is None:
+                words = frozenset(text.split())
+                entry = self._texts[text] = (words, {})
+                for word in words:
+                    self._add_word(word)[1].setdefault(len(words), set()).add(text)
+            entry[1][item_id] = None
+
+    def discard(self, item_id: int, name: str, general_name: str, reciept_name: str) -> None:
+        """Unindex an item, given the names it was indexed with."""
+        for text in item_texts(name, general_name, reciept_name):
+            entry = self._texts.get(text)
+            if entry is None:
+                continue
+            entry[1].pop(item_id, None)
+            if entry[1]:
+                continue
+            del self._texts[text]
+            words = entry[0]
+            for word in words:
+                by_length = self._words[word][1]
+                by_length[len(words)].discard(text)
+                if not by_length[len(words)]:
+                    del by_length[len(words)]
+                if not by_length:
+                    self._discard_word(word)
+
+    def search(self, query: str, limit: int, threshold: float = DEFAULT_THRESHOLD) -> list[tuple[float, int]]:
+        """
+        The ``limit`` items whose best matching text is most similar to the query, as
+        (similarity, item id) pairs, best first; ties go to the oldest item.
+        """
+        tokens = set(normalize(query).split())
+        # For each query word, the similar vocabulary words and their similarity to it
+        matched = [self._similar_words(token) for token in tokens]
+        best_shared = sum(max(words.values(), default=0.0) for words in matched)
+        if not best_shared:
+            return []
+
+        lengths = sorted({length for words in matched for word in words for length in self._words[word][1]})
+        # bounds[i]: the highest score a text of lengths[i:] could reach
+        bounds = [similarity(best_shared, len(tokens), length) for length in lengths] + [0.0]
+        for i in range(len(lengths) - 1, -1, -1):
+            bounds[i] = max(bounds[i], bounds[i + 1])
+
+        scores: dict[str, float] = {}
+        for i, length in enumerate(lengths):
+            for words in matched:
+                for word in words:
+                    for text in self._words[word][1].get(length, ()):
+                        if text not in scores:
+                            scores[text] = self._score(text, matched, len(tokens))
+            if self._settled(scores, bounds[i + 1], limit):
+                break
+
+        return self._rank({text: score for text, score in scores.items() if score >= threshold}, limit)
+
+    def _similar_words(self, token: str) -> dict[str, float]:
+        grams = trigrams(token)
+        shared: Counter = Counter()
+        for gram in grams:
+            words = self._trigrams.get(gram)
+            if words:
+                shared.update(words)
+        # A word sharing fewer trigrams can't reach WORD_THRESHOLD (the score never exceeds the query share)
+        needed = math.ceil(WORD_THRESHOLD * len(grams) - 1e-9)
+        similar = {}
+        for word, count in shared.items():
+            if count >= needed:
+                score = similarity(count, len(grams), self._words[word][0])
+                if score >= WORD_THRESHOLD:
+                    similar[word] = score
+        return similar
+
+    def _score(self, text: str, matched: list[dict[str, float]], query_size: int) -> float:
+        """Similarity of a text to the query, each query word counting as its best match among the text's words."""
+        words = self._texts[text][0]
+        shared = sum(
+            max((similar[word] for word in words if word in similar), default=0.0)
+            for similar in matched
+        )
+        return similarity(shared, query_size, len(words))
+
+    def _settled(self, scores: dict[str, float], bound: float, limit: int) -> bool:
+        """Whether ``limit`` items already beat every text not scored yet."""
+        seen: set[int] = set()
+        for text, score in scores.items():
+            if score > bound:
+                for item_id in self._texts[text][1]:
+                    seen.add(item_id)
+                    if len(seen) >= limit:
+                        return True
+        return False
+
+    def _rank(self, candidates: dict[str, float], limit: int) -> list[tuple[float, int]]:
+        """
+        Pick the ``limit`` best items given the score of every matching text. Texts are
+        visited best first and each gives at most as many items as may still be needed,
+        so a text shared by thousands of items costs a partial scan.
+        """
+        # Texts come best first, so the first score an item gets is its best
+        best: dict[int, float] = {}
+        cutoff = None
+        for text, score in sorted(candidates.items(), key=lambda entry: -entry[1]):
+            if cutoff is not None and score < cutoff:
+                break
+            # Items already seen through a better text may come first, so over-fetch by that many
+            for item_id in heapq.nsmallest(limit + len(best), self._texts[text][1]):
+                best.setdefault(item_id, score)
+            if cutoff is None and len(best) >= limit:
+                cutoff = score
+        ranked = sorted(best.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(score, item_id) for item_id, score in ranked[:limit]]
+
+    def _add_word(self, word: str) -> tuple[int, dict[int, set[str]]]:
+        entry = self._words.get(word)
+        if entry is None:
+            grams = trigrams(word)
+            entry = self._words[word] = (len(grams), {})
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(word)
+        return entry
+
+    def _discard_word(self, word: str) -> None:
+        del self._words[word]
+        for gram in trigrams(word):
+            words = self._trigrams[gram]
+            words.discard(word)
+            if not words:
+                del self._trigrams[gram]
@@ -1,36 +1,66 @@
 """PantryService: Business logic layer for MCP tools, resources, and prompts."""
 
+import base64
+import json
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from .database import Database
-from .pantry import PantryItem
+from .journal import JournalDatabase
+from .pantry import Pantry, PantryItem, PantryOperation
+from .sqlite_database import SQLiteDatabase
+
+# Storage engines selectable via PantryService(engine=...)
+ENGINES: dict[str, type[Database]] = {
+    "json": Database,
+    "journal": JournalDatabase,
+    "sqlite": SQLiteDatabase,
+}
 
 
 class PantryService:
     """Service layer that handles all MCP tool operations for pantry management."""
 
-    def __init__(self, db_path: str | None = None):
-        """Initialize the service with a database connection."""
+    def __init__(self, db_path: str | None = None, engine: str = "json"):
+        """
+        Initialize the service with a database connection.
+
+        Args:
+            db_path: Path of the pantry data file (defaults to the engine's file under ~/.pantry_mcp)
+            engine: Storage engine to use, one of ENGINES ("json" rewrites the file on every
+                change, "journal" appends each change to a log that is compacted in the background,
+                "sqlite" stores items as indexed rows in a SQLite file)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown storage engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+        engine_cls = ENGINES[engine]
         if db_path is None:
             # Use user's home directory by default for write permissions
-            db_path = str(Path.home() / ".pantry_mcp" / "pantry_data.json")
-        self.db = Database(db_path)
+            db_path = str(Path.home() / ".pantry_mcp" / engine_cls.default_filename)
+        self.db = engine_cls(db_path)
 
     # ==================== MCP TOOLS ====================
 
-    def add_to_pantry(self, items: list[PantryItem]) -> str:
+    def add_to_pantry(self, items: list[PantryItem], idempotency_key: Optional[str] = None) -> str:
         """
-        Add items to the pantry inventory.
+        Add items to the pantry inventory. Submitting the same items again (a retried call)
+        does not add them twice: it returns the original confirmation.
 
         Args:
             items: List of PantryItem objects with: name, general_name, quantity, reciept_name, expiration_time (optional)
+            idempotency_key: Optional unique key for this submission, e.g. the receipt's store, date and
+                total ("food-bazar-2024-01-15-42.17"). A retry with the same key within 24 hours adds
+                nothing; without a key, identical items submitted again within 10 minutes are a retry
 
         Returns:
             Confirmation message with added items
         """
-        # Add to database
-        self.db.add_items(items)
+        # Add to database (a retry adds nothing and returns the same items)
+        try:
+            items = self.db.add_items(items, idempotency_key).items
+        except ValueError as e:
+            return f"Error: {str(e)}"
 
         # Format response
         item_list = "\n".join([
@@ -87,16 +117,239 @@ class PantryService:
         except ValueError as e:
             return f"Error: {str(e)}"
 
+    def apply_pantry_changes(self, operations: list[PantryOperation]) -> str:
+        """
+        Apply several pantry changes at once, e.g. everything from one receipt. Prefer this over
+        separate add/remove/update calls. Operations run in order and are all-or-nothing: if one
+        would fail, none is applied.
+
+        Args:
+            operations: List of operations, each one of:
+                - {"op": "add", "items": [PantryItem, ...]}
+                - {"op": "remove", "general_names": ["milk", ...]}
+                - {"op": "update", "general_name": "flour", "quantity": "3lbs" (optional), "name": "..." (optional)}
+
+        Returns:
+            Per-operation confirmation messages
+        """
+        try:
+            results = self.db.apply_batch(operations)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        lines = []
+        for index, (operation, result) in enumerate(zip(operations, results), start=1):
+            if operation.op == "add":
+                names = ", ".join(f"{item.general_name} ({item.quantity})" for item in result)
+                lines.append(f"  {index}. Added {len(result)} item(s): {names}")
+            elif operation.op == "remove":
+                names = ", ".join(operation.general_names)
+                lines.append(f"  {index}. Removed {len(result)} item(s): {names}")
+            else:
+                changes = []
+                if operation.quantity:
+                    changes.append(f"quantity to {operation.quantity}")
+                if operation.name:
+                    changes.append(f"name to {operation.name}")
+                lines.append(f"  {index}. Updated {result.general_name}: {' and '.join(changes)}")
+
+        return f"Applied {len(operations)} operation(s):\n" + "\n".join(lines)
+
     def get_pantry(self) -> str:
         """
-        Get the entire pantry inventory. Use this tool if you need to find a specific item,
-        or a group of items.
+        Get the entire pantry inventory. Use this tool if you need to see everything. To find
+        specific items prefer search_pantry (by name) or query_pantry (filters and pages).
 
         Returns:
             JSON string of all pantry items
         """
-        pantry = self.db.get_pantry()
-        return pantry.model_dump_json(indent=2)
+        return self.db.get_snapshot().data
+
+    def query_pantry(
+        self,
+        general_name: Optional[str] = None,
+        general_name_prefix: Optional[str] = None,
+        expires_after: Optional[datetime] = None,
+        expires_before: Optional[datetime] = None,
+        added_since: Optional[datetime] = None,
+        fields: Optional[list[str]] = None,
+        sort_by: Literal["time_added", "expiration_time", "general_name"] = "time_added",
+        descending: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> str:
+        """
+        Query the pantry with filters, returning one page of items. Prefer this over get_pantry
+        when looking for specific items, as it only returns what matches.
+
+        Args:
+            general_name: Only items with exactly this general name (e.g. "milk")
+            general_name_prefix: Only items whose general name starts with this (e.g. "chicken")
+            expires_after: Only items expiring at or after this ISO 8601 date/time
+            expires_before: Only items expiring before this ISO 8601 date/time
+            added_since: Only items added at or after this ISO 8601 date/time
+            fields: Item fields to return (default all), e.g. ["general_name", "quantity"]
+            sort_by: Field to sort by; sorting by expiration_time skips items without one
+            descending: Sort in descending order
+            limit: Maximum number of items per page (1-500)
+            cursor: next_cursor from a previous call with the same filters, to get the next page
+
+        Returns:
+            Compact JSON with "items" and "next_cursor" (null when there are no more pages)
+        """
+        if not 1 <= limit <= 500:
+            return "Error: limit must be between 1 and 500"
+        if fields:
+            unknown = set(fields) - set(PantryItem.model_fields)
+            if unknown:
+                return f"Error: unknown field(s): {', '.join(sorted(unknown))}"
+
+        after = None
+        if cursor:
+            try:
+                state = json.loads(base64.urlsafe_b64decode(cursor))
+            except ValueError:
+                return "Error: invalid cursor"
+            if not _valid_cursor(state):
+                return "Error: invalid cursor"
+            if state["sort_by"] != sort_by or state["descending"] != descending:
+                return "Error: cursor does not match sort_by/descending of this query"
+            after = state["after"]
+
+        try:
+            items, last = self.db.query_items(
+                general_name=general_name,
+                general_name_prefix=general_name_prefix,
+                expires_after=expires_after,
+                expires_before=expires_before,
+                added_since=added_since,
+                sort_by=sort_by,
+                descending=descending,
+                after=after,
+                limit=limit,
+            )
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        next_cursor = None
+        if last is not None:
+            state = {"sort_by": sort_by, "descending": descending, "after": last}
+            next_cursor = base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+        include = set(fields) if fields else None
+        return json.dumps(
+            {
+                "items": [item.model_dump(mode="json", include=include) for item in items],
+                "next_cursor": next_cursor,
+            },
+            separators=(",", ":"),
+        )
+
+    def search_pantry(self, query: str, limit: int = 10) -> str:
+        """
+        Search the pantry by name, returning the best matches first. Matching is fuzzy: it
+        tolerates typos and partial names, and looks at the general name, the product name and
+        the receipt name, so "chiken legs", "drumsticks" or "kerrygold" all find something.
+
+        Args:
+            query: What to look for, e.g. "chicken legs"
+            limit: Maximum number of items to return (1-100)
+
+        Returns:
+            Compact JSON with "items", each with its fields and a "score" from 0 to 1
+            (1 is an exact match)
+        """
+        if not 1 <= limit <= 100:
+            return "Error: limit must be between 1 and 100"
+
+        matches = self.db.search_items(query, limit)
+        return json.dumps(
+            {"items": [{**item.model_dump(mode="json"), "score": round(score, 3)} for item, score in matches]},
+            separators=(",", ":"),
+        )
+
+    def get_pantry_summary(self, general_name: Optional[str] = None) -> str:
+        """
+        Get how much of each item the pantry holds, with every entry of the same general name
+        added up. Use this tool for questions like "how much milk do I have?" instead of
+        reading the whole pantry.
+
+        Args:
+            general_name: Only summarize this general name (e.g. "milk"); all items if omitted
+
+        Returns:
+            Compact JSON with "items": per general name, the number of entries, the total
+            quantity per kind of measure (weight, volume, count, or containers such as cans)
+            in the unit most entries use, the number of entries whose quantity could not be
+            added up, and the earliest expiration
+        """
+        summaries = self.db.get_summary(general_name)
+        return json.dumps(
+            {"items": [summary.model_dump(mode="json") for summary in summaries]},
+            separators=(",", ":"),
+        )
+
+    def get_expiring_items(self, before: datetime) -> str:
+        """
+        Get pantry items that expire before a given date/time, soonest first. Use this tool
+        to find items that need to be used up or have already expired.
+
+        Args:
+            before: ISO 8601 date/time, e.g. "2024-01-15T12:00:00"
+
+        Returns:
+            JSON string of the matching pantry items
+        """
+        items = self.db.items_expiring_before(before)
+        return Pantry.model_construct(items=items).model_dump_json(indent=2)
+
+    def get_expired_items(self) -> str:
+        """
+        Get pantry items that have already expired, soonest expired first. Use this tool to
+        find what should be thrown out; purge_expired removes them.
+
+        Returns:
+            JSON string of the expired pantry items
+        """
+        items = self.db.items_expiring_before(datetime.now())
+        return Pantry.model_construct(items=items).model_dump_json(indent=2)
+
+    def purge_expired(self, archive: bool = True) -> str:
+        """
+        Remove every expired item from the pantry. Only use this when the user asks to clear
+        out expired items.
+
+        Args:
+            archive: Keep a copy of the removed items in the archive file next to the pantry
+                (default), so they can still be looked up later
+
+        Returns:
+            Confirmation message with removed items
+        """
+        removed = self.db.remove_expired(datetime.now(), archive=archive).items
+        if not removed:
+            return "No expired items in pantry"
+
+        item_list = "\n".join([
+            f"  - {item.general_name}: {item.quantity} (expired {item.expiration_time.isoformat()})"
+            for item in removed
+        ])
+        destination = f" and archived them to {self.db.archive_path}" if archive else ""
+        return f"Removed {len(removed)} expired item(s) from pantry{destination}:\n{item_list}"
+
+    def get_recently_added_items(self, since: datetime) -> str:
+        """
+        Get pantry items added on or after a given date/time, oldest first. Use this tool
+        to answer questions like "what did I buy this week?".
+
+        Args:
+            since: ISO 8601 date/time, e.g. "2024-01-15T00:00:00"
+
+        Returns:
+            JSON string of the matching pantry items
+        """
+        items = self.db.items_added_since(since)
+        return Pantry.model_construct(items=items).model_dump_json(indent=2)
 
 
     # ==================== MCP RESOURCES ====================
@@ -108,8 +361,60 @@ class PantryService:
         Returns:
             JSON string of pantry data
         """
-        pantry = self.db.get_pantry()
-        return pantry.model_dump_json(indent=2)
+        return self.db.get_snapshot().data
+
+    def get_pantry_changes(self, since_etag: str) -> str:
+        """
+        Get what changed in the pantry since a previously seen ETag, instead of re-reading
+        the whole inventory. Falls back to a full snapshot when the changes are no longer
+        available (the ETag is too old or from before a server restart).
+
+        Args:
+            since_etag: ETag from pantry://inventory/version or a previous call
+
+        Returns:
+            Compact JSON with the new "etag" and either "changes" (list of add/remove/update
+            events with their items) or "snapshot" (the full pantry)
+        """
+        version = self.db.parse_etag(since_etag)
+        changes = self.db.changes_since(version) if version is not None else None
+
+        if changes is None:
+            snapshot = self.db.get_snapshot()
+            return f'{{"etag":{json.dumps(snapshot.etag)},"snapshot":{snapshot.data}}}'
+
+        etag = self.db.format_etag(changes[-1].version if changes else version)
+        events = ",".join(event.model_dump_json() for event in changes)
+        return f'{{"etag":{json.dumps(etag)},"changes":[{events}]}}'
+
+    def get_pantry_changes_resource(self, since_etag: str) -> str:
+        """
+        Get pantry changes since an ETag for MCP resource (see get_pantry_changes).
+
+        Returns:
+            JSON string with the new "etag" and either "changes" or "snapshot"
+        """
+        return self.get_pantry_changes(since_etag)
+
+    def get_expired_items_resource(self) -> str:
+        """
+        Get the expired pantry items for MCP resource. Subscribers are notified as items expire.
+
+        Returns:
+            JSON string of the expired pantry items
+        """
+        return self.get_expired_items()
+
+    def get_pantry_version_resource(self) -> str:
+        """
+        Get the current version and ETag of the pantry inventory for MCP resource.
+        Clients can poll this cheaply and only re-read pantry://inventory when the ETag changes.
+
+        Returns:
+            JSON string with "version" and "etag"
+        """
+        snapshot = self.db.get_snapshot()
+        return json.dumps({"version": snapshot.version, "etag": snapshot.etag})
 
     # ==================== MCP PROMPTS ====================
 
@@ -147,8 +452,10 @@ reciept is from Food Bazar, then search for "Chicken Legs from Food Bazar". This
 price and quantity. Based on the price and quantity, and the price paid on the recipt, do the math on
 how much quantity I bought.
 
-5. Call the add_to_pantry tool with this JSON format:
+5. Call the add_to_pantry tool with this JSON format, with an idempotency_key made of the store,
+date and total from the receipt, so that a retried call never adds the receipt twice:
 {
+  "idempotency_key": "food-bazar-2024-01-15-42.17",
   "items": [
     {
       "name": "Large Organic Eggs AA",
@@ -188,3 +495,21 @@ Important notes:
 - Each purchase creates a separate pantry entry, even if you already have that item
 """
         return prompt
+
+
+def _valid_cursor(state: object) -> bool:
+    """
+    Whether a decoded cursor has the shape query_pantry gives out: the sort and a [key, id]
+    position, followed by the tag of the load the ids are from for the in-memory engines.
+    """
+    if not isinstance(state, dict) or not {"sort_by", "descending", "after"} <= state.keys():
+        return False
+    after = state["after"]
+    return (
+        isinstance(after, list)
+        and len(after) in (2, 3)
+        and isinstance(after[0], str)
+        and isinstance(after[1], int)
+        and not isinstance(after[1], bool)
+        and all(isinstance(tag, str) for tag in after[2:])
+    )
@@ -0,0 +1,68 @@
+"""SharedLock: a thread lock that readers hold together and a writer holds alone."""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class SharedLock:
+    """
+    Reader/writer lock for threads: any number of threads may hold it shared, or one
+    thread exclusively.
+
+    Both modes are re-entrant, and the exclusive holder may also take it shared (a write
+    can call a read). A thread holding it only shared cannot take it exclusively, since
+    two readers upgrading at once would wait on each other forever. A waiting writer
+    holds back threads asking for a first shared hold, so a steady stream of reads
+    cannot starve writes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        # Thread holding the lock exclusively, and how many times over
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        # Thread id -> shared hold count
+        self._readers: dict[int, int] = {}
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Hold the lock alongside other readers."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                self._cond.wait_for(lambda: self._writer is None and not self._writers_waiting)
+            self._readers[me] = self._readers.get(me, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers[me] -= 1
+                if not self._readers[me]:
+                    del self._readers[me]
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Hold the lock alone."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                if me in self._readers:
+                    raise RuntimeError("Cannot take a shared lock exclusively; release it first")
+                self._writers_waiting += 1
+                try:
+                    self._cond.wait_for(lambda: self._writer is None and not self._readers)
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+            self._writer_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._cond.notify_all()
@@ -0,0 +1,560 @@
+"""SQLiteDatabase: pantry storage in a local SQLite file with indexed lookups."""
+
+import argparse
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from .database import SORT_FIELDS, Database
+from .dedup import CONTENT_WINDOW, MAX_SUBMISSIONS, SUBMISSION_TTL, Submission, check_reuse
+from .item_store import sort_key
+from .pantry import Pantry, PantryItem, PantryOperation
+from .search import DEFAULT_THRESHOLD, SearchIndex
+from .summary import ItemSummary, build_summary, quantity_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pantry_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    general_name TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    reciept_name TEXT NOT NULL,
+    time_added TEXT NOT NULL,
+    expiration_time TEXT,
+    -- time_added and expiration_time as fixed-width naive local time (see _time_key), so
+    -- they compare and sort as text like the in-memory indexes, whatever the UTC offset
+    time_added_key TEXT NOT NULL,
+    expiration_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pantry_items_general_name ON pantry_items (general_name);
+CREATE INDEX IF NOT EXISTS idx_pantry_items_expiration_key ON pantry_items (expiration_key);
+CREATE INDEX IF NOT EXISTS idx_pantry_items_time_added_key ON pantry_items (time_added_key);
+CREATE INDEX IF NOT EXISTS idx_pantry_items_general_name_expiration ON pantry_items (general_name, expiration_key);
+
+-- Quantities summed per general_name and normalized unit ('' counts unparseable quantities),
+-- kept up to date by every write so summaries never scan pantry_items
+CREATE TABLE IF NOT EXISTS pantry_totals (
+    general_name TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    value REAL NOT NULL,
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (general_name, unit)
+);
+
+-- Recent add_items submissions (see dedup.py), so retries add nothing
+CREATE TABLE IF NOT EXISTS pantry_submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT,
+    content_hash TEXT NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pantry_submissions_idempotency_key ON pantry_submissions (idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_pantry_submissions_content_hash ON pantry_submissions (content_hash);
+"""
+
+ITEM_COLUMNS = "name, general_name, quantity, reciept_name, time_added, expiration_time"
+# Columns query_items sorts and pages on for each of SORT_FIELDS
+SORT_COLUMNS = {"time_added": "time_added_key", "expiration_time": "expiration_key", "general_name": "general_name"}
+
+
+class SQLiteDatabase(Database):
+    """
+    Database engine that stores one row per PantryItem in a SQLite file.
+
+    Nothing is loaded up front: lookups and removals by general_name and
+    expiry queries go through indexes, and only get_pantry reads every row.
+    The JSON format of the default engine is kept as an import/export format
+    (see import_json, export_json and migrate_json_to_sqlite).
+    """
+
+    default_filename = "pantry_data.db"
+    # SQLite does its own locking across processes
+    shared_file = False
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_state()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        # In-memory index for search_items, built on first use (see _search_index)
+        self._search: Optional[SearchIndex] = None
+        self._search_data_version: Optional[int] = None
+
+        # Databases created before pantry_totals existed
+        with self._lock.exclusive(), self.conn:
+            has_items = self.conn.execute("SELECT EXISTS (SELECT 1 FROM pantry_items)").fetchone()[0]
+            has_totals = self.conn.execute("SELECT EXISTS (SELECT 1 FROM pantry_totals)").fetchone()[0]
+            if has_items and not has_totals:
+                self._rebuild_totals()
+
+        # PRAGMA data_version as last seen by _refresh, to notice other connections' commits
+        (self._data_version,) = self.conn.execute("PRAGMA data_version").fetchone()
+
+    def load_data(self) -> Pantry:
+        """Read every row into a Pantry."""
+        return Pantry.model_construct(items=self._select("ORDER BY id", ()))
+
+    def save_data(self, pantry: Pantry) -> None:
+        """Replace the stored rows with the given pantry."""
+        with self._transaction():
+            self._search = None
+            self.conn.execute("DELETE FROM pantry_items")
+            self._insert(pantry.items)
+            self._rebuild_totals()
+            self._replaced()
+
+    def add_items(self, items: list[PantryItem], idempotency_key: Optional[str] = None) -> Pantry:
+        """
+        Add items to pantry, unless the submission repeats a recent one (see Database.add_items).
+
+        Returns only the added items, so a write never reads the whole table.
+        """
+        with self._transaction():
+            return super().add_items(items, idempotency_key)
+
+    def remove_items(self, general_names: list[str]) -> Pantry:
+        """
+        Remove items from pantry by general_name.
+
+        Returns only the removed items, so a write never reads the whole table.
+        """
+        with self._transaction():
+            return super().remove_items(general_names)
+
+    def update_item(
+        self,
+        general_name: str,
+        quantity: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> PantryItem:
+        """Update an existing pantry item's quantity or name."""
+        with self._transaction():
+            return super().update_item(general_name, quantity, name)
+
+    def remove_expired(self, before: datetime, archive: bool = True) -> Pantry:
+        """Remove every item expiring before the given time (see Database.remove_expired), in one transaction."""
+        with self._transaction():
+            return super().remove_expired(before, archive)
+
+    def apply_batch(self, operations: list[PantryOperation]) -> list[Any]:
+        """Apply add/remove/update operations in order, all or nothing, in a single transaction."""
+        with self._transaction():
+            return super().apply_batch(operations)
+
+    def get_pantry(self) -> Pantry:
+        """Get the entire pantry inventory."""
+        return self.load_data()
+
+    def get_summary(self, general_name: Optional[str] = None) -> list[ItemSummary]:
+        """
+        Get the total quantity, number of entries and earliest expiration per general_name,
+        sorted by general_name, from the pantry_totals table.
+        """
+        clause, params = ("WHERE general_name = ?", (general_name,)) if general_name is not None else ("", ())
+        with self._lock.shared():
+            rows = self.conn.execute(
+                f"""
+                SELECT general_name, unit, value, entries,
+                    (SELECT expiration_time FROM pantry_items
+                     WHERE pantry_items.general_name = pantry_totals.general_name AND expiration_key IS NOT NULL
+                     ORDER BY expiration_key LIMIT 1)
+                FROM pantry_totals {clause}
+                ORDER BY general_name
+                """,
+                params,
+            ).fetchall()
+
+        grouped: dict[str, tuple[dict[str, tuple[float, int]], Optional[str]]] = {}
+        for name, unit, value, entries, earliest in rows:
+            grouped.setdefault(name, ({}, earliest))[0][unit] = (value, entries)
+        return [
+            build_summary(name, unit_totals, datetime.fromisoformat(earliest) if earliest else None)
+            for name, (unit_totals, earliest) in grouped.items()
+        ]
+
+    def search_items(
+        self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD
+    ) -> list[tuple[PantryItem, float]]:
+        """Find the items best matching a free-text query (see Database.search_items)."""
+        with self._lock.shared():
+            ranked = self._search_index().search(query, limit, threshold)
+            ids = [item_id for _, item_id in ranked]
+            rows = self.conn.execute(
+                f"SELECT id, {ITEM_COLUMNS} FROM pantry_items WHERE id IN ({', '.join('?' for _ in ids)})", ids
+            ).fetchall()
+        items = {row[0]: _row_to_item(row[1:]) for row in rows}
+        return [(items[item_id], score) for score, item_id in ranked]
+
+    def _dump(self) -> str:
+        return self.get_pantry().model_dump_json(indent=2)
+
+    def find_item(self, general_name: str) -> Optional[PantryItem]:
+        """Find an item by its general_name."""
+        row = self._find_row(general_name)
+        return _row_to_item(row[1:]) if row else None
+
+    def items_expiring_before(self, before: datetime) -> list[PantryItem]:
+        """Get items whose expiration_time is before the given time, soonest first."""
+        return self._select(
+            "WHERE expiration_key IS NOT NULL AND expiration_key < ? ORDER BY expiration_key, id",
+            (_time_key(before),),
+        )
+
+    def next_expiration(self, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Get the soonest expiration_time at or after ``after`` (see Database.next_expiration)."""
+        clause, params = ("WHERE expiration_key >= ?", (_time_key(after),)) if after else ("", ())
+        with self._lock.shared():
+            (expiration,) = self.conn.execute(f"SELECT MIN(expiration_key) FROM pantry_items {clause}", params).fetchone()
+        return datetime.fromisoformat(expiration) if expiration else None
+
+    def items_added_since(self, since: datetime) -> list[PantryItem]:
+        """Get items added at or after the given time, oldest first."""
+        return self._select("WHERE time_added_key >= ? ORDER BY time_added_key, id", (_time_key(since),))
+
+    def query_items(
+        self,
+        general_name: Optional[str] = None,
+        general_name_prefix: Optional[str] = None,
+        expires_after: Optional[datetime] = None,
+        expires_before: Optional[datetime] = None,
+        added_since: Optional[datetime] = None,
+        sort_by: str = "time_added",
+        descending: bool = False,
+        after: Optional[list] = None,
+        limit: int = 50,
+    ) -> tuple[list[PantryItem], Optional[list]]:
+        """Get one page of items matching every given filter, using keyset pagination on (sort_by, id)."""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_by}'. Choose from: {', '.join(SORT_FIELDS)}")
+
+        conditions = []
+        params: list[Any] = []
+        if general_name is not None:
+            conditions.append("general_name = ?")
+            params.append(general_name)
+        if general_name_prefix:
+            # Range form so the general_name index can be used
+            conditions.append("general_name >= ? AND general_name < ?")
+            params += [general_name_prefix, general_name_prefix + "\U0010ffff"]
+        if expires_after or expires_before or sort_by == "expiration_time":
+            conditions.append("expiration_key IS NOT NULL")
+        if expires_after:
+            conditions.append("expiration_key >= ?")
+            params.append(_time_key(expires_after))
+        if expires_before:
+            conditions.append("expiration_key < ?")
+            params.append(_time_key(expires_before))
+        if added_since:
+            conditions.append("time_added_key >= ?")
+            params.append(_time_key(added_since))
+        sort_column = SORT_COLUMNS[sort_by]
+        if after is not None:
+            conditions.append(f"({sort_column}, id) {'<' if descending else '>'} (?, ?)")
+            params += after
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "DESC" if descending else "ASC"
+        with self._lock.shared():
+            rows = self.conn.execute(
+                f"SELECT id, {sort_column}, {ITEM_COLUMNS} FROM pantry_items {where} "
+                f"ORDER BY {sort_column} {direction}, id {direction} LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+
+        page = [_row_to_item(row[2:]) for row in rows[:limit]]
+        if len(rows) <= limit:
+            return page, None
+        last = rows[limit - 1]
+        return page, [last[1], last[0]]
+
+    # ==================== IMPORT / EXPORT ====================
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Append every item of a JSON pantry file (the default engine's format).
+
+        Returns:
+            Number of imported items
+        """
+        with open(json_path, 'r') as f:
+            pantry = Pantry(**json.load(f))
+
+        with self._transaction():
+            self._search = None
+            self._insert(pantry.items)
+            self._rebuild_totals()
+            self._replaced()
+        return len(pantry.items)
+
+    def export_json(self, json_path: str) -> None:
+        """Write the pantry to a JSON file in the default engine's format."""
+        with open(json_path, 'w') as f:
+            f.write(self.get_pantry().model_dump_json(indent=2))
+
+    def close(self) -> None:
+        """Stop write-behind and close the SQLite connection."""
+        super().close()
+        self.conn.close()
+
+    # ==================== MUTATION INTERNALS ====================
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Hold the lock exclusively for a write transaction, dropping the search index if it rolls back."""
+        with self._lock.exclusive():
+            try:
+                with self.conn:
+                    yield
+            except BaseException:
+                # The index may already reflect changes that were just rolled back
+                self._search = None
+                raise
+
+    def _refresh(self) -> None:
+        """
+        Bump the version if another connection committed since we last looked, so the
+        cached snapshot, ETags and change feed don't go stale. PRAGMA data_version only
+        changes for other connections' commits, never for our own.
+        """
+        (data_version,) = self.conn.execute("PRAGMA data_version").fetchone()
+        if data_version != self._data_version:
+            with self._lock.exclusive():
+                # Another thread may have noticed the commit while we waited for the lock
+                if data_version != self._data_version:
+                    self._data_version = data_version
+                    self._replaced()
+
+    def _search_index(self) -> SearchIndex:
+        """
+        The search index, built from every row on first use and kept up to date by the
+        _apply_* methods. It is rebuilt if another connection has changed the database.
+        """
+        with self._index_lock:
+            (data_version,) = self.conn.execute("PRAGMA data_version").fetchone()
+            if self._search is None or data_version != self._search_data_version:
+                self._search = SearchIndex(
+                    self.conn.execute("SELECT id, name, general_name, reciept_name FROM pantry_items")
+                )
+                self._search_data_version = data_version
+            return self._search
+
+    def _apply_add(self, items: list[PantryItem]) -> None:
+        ids = self._insert(items)
+        self._count_totals([(item.general_name, item.quantity) for item in items], 1)
+        if self._search is not None:
+            for item_id, item in zip(ids, items):
+                self._search.add(item_id, item.name, item.general_name, item.reciept_name)
+
+    def _apply_remove(self, general_names: list[str]) -> list[PantryItem]:
+        if not general_names:
+            return []
+        placeholders = ", ".join("?" for _ in general_names)
+        rows = self.conn.execute(
+            f"DELETE FROM pantry_items WHERE general_name IN ({placeholders}) RETURNING id, {ITEM_COLUMNS}",
+            list(general_names),
+        ).fetchall()
+        self.conn.execute(f"DELETE FROM pantry_totals WHERE general_name IN ({placeholders})", list(general_names))
+        removed = [_row_to_item(row[1:]) for row in rows]
+        if self._search is not None:
+            for row, item in zip(rows, removed):
+                self._search.discard(row[0], item.name, item.general_name, item.reciept_name)
+        return removed
+
+    def _apply_remove_expired(self, before: datetime) -> list[PantryItem]:
+        rows = self.conn.execute(
+            f"DELETE FROM pantry_items WHERE expiration_key IS NOT NULL AND expiration_key < ? "
+            f"RETURNING id, {ITEM_COLUMNS}, expiration_key",
+            (_time_key(before),),
+        ).fetchall()
+        # RETURNING gives no particular order
+        rows.sort(key=lambda row: (row[7], row[0]))
+        removed = [_row_to_item(row[1:7]) for row in rows]
+        self._count_totals([(item.general_name, item.quantity) for item in removed], -1)
+        if self._search is not None:
+            for row, item in zip(rows, removed):
+                self._search.discard(row[0], item.name, item.general_name, item.reciept_name)
+        return removed
+
+    def _apply_update(
+        self,
+        general_name: str,
+        quantity: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> PantryItem:
+        row = self._find_row(general_name)
+
+        if not row:
+            raise ValueError(f"Item with general_name '{general_name}' not found in pantry")
+
+        item = _row_to_item(row[1:])
+        if quantity is not None:
+            self._count_totals([(general_name, item.quantity)], -1)
+            self._count_totals([(general_name, quantity)], 1)
+            item.quantity = quantity
+        if name is not None:
+            if self._search is not None:
+                self._search.discard(row[0], item.name, item.general_name, item.reciept_name)
+            item.name = name
+            item.reciept_name = name
+            if self._search is not None:
+                self._search.add(row[0], item.name, item.general_name, item.reciept_name)
+
+        self.conn.execute(
+            "UPDATE pantry_items SET quantity = ?, name = ?, reciept_name = ? WHERE id = ?",
+            (item.quantity, item.name, item.reciept_name, row[0]),
+        )
+        return item
+
+    def _commit(self, record: dict[str, Any]) -> None:
+        """Rows are written by the _apply_* methods inside the caller's transaction."""
+
+    def _find_submission(self, submission: Submission) -> Optional[Submission]:
+        now = datetime.now()
+        if submission.idempotency_key is not None:
+            where, params = "idempotency_key = ?", (submission.idempotency_key, (now - SUBMISSION_TTL).isoformat())
+        else:
+            where = "idempotency_key IS NULL AND content_hash = ?"
+            params = (submission.content_hash, (now - CONTENT_WINDOW).isoformat())
+        row = self.conn.execute(
+            f"SELECT idempotency_key, content_hash, time FROM pantry_submissions "
+            f"WHERE {where} AND time >= ? ORDER BY id DESC LIMIT 1",
+            params,
+        ).fetchone()
+        if row is None:
+            return None
+
+        idempotency_key, content_hash, time = row
+        original = Submission(idempotency_key, content_hash, datetime.fromisoformat(time))
+        if idempotency_key is not None:
+            check_reuse(original, submission.content_hash)
+        return original
+
+    def _record_submission(self, submission: Submission) -> None:
+        """Store a submission and forget expired ones and the oldest beyond MAX_SUBMISSIONS."""
+        self.conn.execute(
+            "INSERT INTO pantry_submissions (idempotency_key, content_hash, time) VALUES (?, ?, ?)",
+            (submission.idempotency_key, submission.content_hash, submission.time.isoformat()),
+        )
+        self.conn.execute(
+            "DELETE FROM pantry_submissions WHERE time < ? OR id <= "
+            "(SELECT id FROM pantry_submissions ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            ((datetime.now() - SUBMISSION_TTL).isoformat(), MAX_SUBMISSIONS),
+        )
+
+    def _count_totals(self, entries: Iterable[tuple[str, str]], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) (general_name, quantity) entries to pantry_totals."""
+        # One upsert per (general_name, unit) rather than per entry
+        totals: dict[tuple[str, str], list] = {}
+        for general_name, quantity in entries:
+            unit, value = quantity_key(quantity)
+            total = totals.setdefault((general_name, unit), [0.0, 0])
+            total[0] += sign * value
+            total[1] += sign
+        self.conn.executemany(
+            """
+            INSERT INTO pantry_totals (general_name, unit, value, entries) VALUES (?, ?, ?, ?)
+            ON CONFLICT (general_name, unit)
+            DO UPDATE SET value = value + excluded.value, entries = entries + excluded.entries
+            """,
+            [(general_name, unit, value, entries) for (general_name, unit), (value, entries) in totals.items()],
+        )
+        if sign < 0:
+            self.conn.execute("DELETE FROM pantry_totals WHERE entries <= 0")
+
+    def _rebuild_totals(self) -> None:
+        """Recompute pantry_totals from every row."""
+        self.conn.execute("DELETE FROM pantry_totals")
+        self._count_totals(self.conn.execute("SELECT general_name, quantity FROM pantry_items"), 1)
+
+    def _insert(self, items: list[PantryItem]) -> list[int]:
+        """Insert a row per item, returning their ids."""
+        cursor = self.conn.cursor()
+        return [
+            cursor.execute(
+                f"INSERT INTO pantry_items ({ITEM_COLUMNS}, time_added_key, expiration_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _item_to_row(item),
+            ).lastrowid
+            for item in items
+        ]
+
+    def _select(self, clause: str, params: tuple) -> list[PantryItem]:
+        with self._lock.shared():
+            rows = self.conn.execute(f"SELECT {ITEM_COLUMNS} FROM pantry_items {clause}", params).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+    def _find_row(self, general_name: str) -> Optional[tuple]:
+        with self._lock.shared():
+            return self.conn.execute(
+                f"SELECT id, {ITEM_COLUMNS} FROM pantry_items WHERE general_name = ? ORDER BY id LIMIT 1",
+                (general_name,),
+            ).fetchone()
+
+
+def _item_to_row(item: PantryItem) -> tuple:
+    return (
+        item.name,
+        item.general_name,
+        item.quantity,
+        item.reciept_name,
+        item.time_added.isoformat(),
+        item.expiration_time.isoformat() if item.expiration_time else None,
+        _time_key(item.time_added),
+        _time_key(item.expiration_time) if item.expiration_time else None,
+    )
+
+
+def _time_key(timestamp: datetime) -> str:
+    """A timestamp's sort_key as fixed-width text, so text order is time order."""
+    return sort_key(timestamp).isoformat(timespec="microseconds")
+
+
+def _row_to_item(row: tuple) -> PantryItem:
+    # Rows were validated on the way in, so skip re-validation on the way out
+    name, general_name, quantity, reciept_name, time_added, expiration_time = row
+    return PantryItem.model_construct(
+        name=name,
+        general_name=general_name,
+        quantity=quantity,
+        reciept_name=reciept_name,
+        time_added=datetime.fromisoformat(time_added),
+        expiration_time=datetime.fromisoformat(expiration_time) if expiration_time else None,
+    )
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str) -> int:
+    """
+    One-shot migration of a JSON pantry file into a new SQLite database.
+
+    Args:
+        json_path: Existing pantry_data.json
+        sqlite_path: SQLite file to create; must not already contain items
+
+    Returns:
+        Number of migrated items
+    """
+    db = SQLiteDatabase(sqlite_path)
+    try:
+        (count,) = db.conn.execute("SELECT COUNT(*) FROM pantry_items").fetchone()
+        if count:
+            raise ValueError(f"SQLite pantry {sqlite_path} already contains {count} item(s)")
+        return db.import_json(json_path)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a JSON pantry file into a SQLite pantry database.")
+    parser.add_argument("json_path", help="Existing pantry_data.json")
+    parser.add_argument("sqlite_path", help="SQLite database file to create")
+    args = parser.parse_args()
+
+    migrated = migrate_json_to_sqlite(args.json_path, args.sqlite_path)
+    print(f"Migrated {migrated} item(s) from {args.json_path} to {args.sqlite_path}")
@@ -0,0 +1,65 @@
+"""ResourceSubscriptions: push MCP resources/updated notifications to subscribed clients."""
+
+import asyncio
+import threading
+
+import fastmcp
+from fastmcp import FastMCP
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+
+
+class ResourceSubscriptions:
+    """
+    Tracks which client sessions subscribed to which resource URIs, and sends them
+    a notifications/resources/updated message when notify() is called.
+
+    notify() is safe to call from any thread, including from synchronous tool handlers.
+    """
+
+    def __init__(self, mcp: FastMCP):
+        """
+        Register resources/subscribe and resources/unsubscribe handlers on the server.
+
+        Raises:
+            RuntimeError: If the installed fastmcp is not a 2.x release (see pyproject.toml)
+        """
+        # FastMCP has no public hook for resources/subscribe, so the handlers go on its
+        # low-level server, which only fastmcp 2.x (on mcp 1.x) exposes this way
+        self._server = getattr(mcp, "_mcp_server", None)
+        if not hasattr(self._server, "subscribe_resource"):
+            raise RuntimeError(
+                f"Resource subscriptions are not supported with fastmcp {fastmcp.__version__}: "
+                "they need fastmcp 2.x (install fastmcp>=2.13.0.2,<3)"
+            )
+        self._subscribers: dict[str, dict[ServerSession, asyncio.AbstractEventLoop]] = {}
+        self._lock = threading.Lock()
+
+        self._server.subscribe_resource()(self._subscribe)
+        self._server.unsubscribe_resource()(self._unsubscribe)
+
+    def notify(self, uri: str) -> None:
+        """Tell every session subscribed to ``uri`` that the resource changed."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(uri, {}).items())
+
+        for session, loop in subscribers:
+            asyncio.run_coroutine_threadsafe(self._send(uri, session), loop)
+
+    async def _subscribe(self, uri: AnyUrl) -> None:
+        session = self._server.request_context.session
+        with self._lock:
+            self._subscribers.setdefault(str(uri), {})[session] = asyncio.get_running_loop()
+
+    async def _unsubscribe(self, uri: AnyUrl) -> None:
+        session = self._server.request_context.session
+        with self._lock:
+            self._subscribers.get(str(uri), {}).pop(session, None)
+
+    async def _send(self, uri: str, session: ServerSession) -> None:
+        try:
+            await session.send_resource_updated(AnyUrl(uri))
+        except Exception:
+            # The client went away; stop notifying it
+            with self._lock:
+                self._subscribers.get(uri, {}).pop(session, None)
@@ -0,0 +1,153 @@
+"""Per-general_name pantry aggregates: total quantity, number of entries and earliest expiration."""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from .item_store import StoredItem, sort_key
+from .quantities import UNITS, Quantity, convert, dimension, parse_quantity
+
+# Unit key under which entries with an unparseable quantity are counted
+UNPARSED = ""
+
+
+class QuantityTotal(BaseModel):
+    value: float
+    unit: str
+
+
+class ItemSummary(BaseModel):
+    general_name: str
+    entries: int = Field(description="Number of pantry entries with this general_name.")
+    totals: list[QuantityTotal] = Field(
+        description="Total quantity, one per kind of measure (weight, volume, count, or containers such as cans).",
+    )
+    unparsed_entries: int = Field(description="Entries whose quantity could not be parsed, so are not in totals.")
+    earliest_expiration: Optional[datetime] = Field(description="Soonest expiration_time among the entries.")
+
+
+def build_summary(
+    general_name: str,
+    unit_totals: dict[str, tuple[float, int]],
+    earliest_expiration: Optional[datetime],
+) -> ItemSummary:
+    """
+    Turn per-unit totals into an ItemSummary. Units measuring the same thing are added up,
+    expressed in the unit most entries use.
+
+    Args:
+        general_name: The summarized general_name
+        unit_totals: Normalized unit -> (summed value, number of entries); UNPARSED counts
+            the entries whose quantity could not be parsed
+        earliest_expiration: Soonest expiration among the entries
+    """
+    unparsed = unit_totals.get(UNPARSED, (0.0, 0))[1]
+    by_dimension: dict[str, list[tuple[str, float, int]]] = {}
+    for unit, (value, entries) in unit_totals.items():
+        if unit != UNPARSED:
+            by_dimension.setdefault(dimension(unit), []).append((unit, value, entries))
+
+    totals = []
+    for dim in sorted(by_dimension, key=lambda dim: (-sum(entries for *_, entries in by_dimension[dim]), dim)):
+        units = by_dimension[dim]
+        # Ties go to the larger unit, e.g. lb over oz
+        display_unit = max(units, key=lambda unit: (unit[2], UNITS[unit[0]].factor if unit[0] in UNITS else 0))[0]
+        value = sum(
+            value if unit == display_unit else convert(Quantity(value, unit), display_unit).value
+            for unit, value, _ in units
+        )
+        totals.append(QuantityTotal(value=round(value, 3), unit=display_unit))
+
+    return ItemSummary(
+        general_name=general_name,
+        entries=sum(entries for _, entries in unit_totals.values()),
+        totals=totals,
+        unparsed_entries=unparsed,
+        earliest_expiration=earliest_expiration,
+    )
+
+
+def quantity_key(quantity: str) -> tuple[str, float]:
+    """The unit_totals key and value an entry's quantity contributes."""
+    parsed = parse_quantity(quantity)
+    return (parsed.unit, parsed.value) if parsed else (UNPARSED, 0.0)
+
+
+class _Aggregate:
+    __slots__ = ("units", "earliest")
+
+    def __init__(self):
+        # Normalized unit -> [summed value, number of entries]
+        self.units: dict[str, list] = {}
+        # (sort key, expiration_time) of the soonest expiring entry
+        self.earliest: Optional[tuple[datetime, datetime]] = None
+
+
+class SummaryIndex:
+    """
+    Aggregates of the in-memory pantry per general_name, updated on every change so a
+    summary costs O(distinct general_names) rather than a scan of every entry.
+    """
+
+    def __init__(self, items: Iterable[StoredItem] = ()):
+        self._aggregates: dict[str, _Aggregate] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: StoredItem) -> None:
+        aggregate = self._aggregates.get(item.general_name)
+        if aggregate is None:
+            aggregate = self._aggregates[item.general_name] = _Aggregate()
+        self._count(aggregate, item.quantity, 1)
+        if item.expiration_time is not None:
+            key = sort_key(item.expiration_time)
+            if aggregate.earliest is None or key < aggregate.earliest[0]:
+                aggregate.earliest = (key, item.expiration_time)
+
+    def discard(self, general_name: str) -> None:
+        """Forget a general_name whose entries were all removed."""
+        self._aggregates.pop(general_name, None)
+
+    def remove(self, item: StoredItem) -> None:
+        """
+        Account for a removed entry of a general_name that keeps other entries. The earliest
+        expiration is left as is; correct it with set_earliest if the entry was the earliest.
+        """
+        self._count(self._aggregates[item.general_name], item.quantity, -1)
+
+    def set_earliest(self, general_name: str, expiration_time: Optional[datetime]) -> None:
+        """Set a general_name's soonest expiration_time, after its earliest entry was removed."""
+        aggregate = self._aggregates[general_name]
+        aggregate.earliest = (sort_key(expiration_time), expiration_time) if expiration_time is not None else None
+
+    def change_quantity(self, general_name: str, old: str, new: str) -> None:
+        """Account for an entry whose quantity was updated."""
+        aggregate = self._aggregates[general_name]
+        self._count(aggregate, old, -1)
+        self._count(aggregate, new, 1)
+
+    def summarize(self, general_name: Optional[str] = None) -> list[ItemSummary]:
+        """Summaries sorted by general_name, or only the given one's (empty if absent)."""
+        names = [general_name] if general_name is not None else sorted(self._aggregates)
+        summaries = []
+        for name in names:
+            aggregate = self._aggregates.get(name)
+            if aggregate is None:
+                continue
+            unit_totals = {unit: (value, entries) for unit, (value, entries) in aggregate.units.items()}
+            earliest = aggregate.earliest[1] if aggregate.earliest else None
+            summaries.append(build_summary(name, unit_totals, earliest))
+        return summaries
+
+    @staticmethod
+    def _count(aggregate: _Aggregate, quantity: str, sign: int) -> None:
+        unit, value = quantity_key(quantity)
+        total = aggregate.units.get(unit)
+        if total is None:
+            total = aggregate.units[unit] = [0.0, 0]
+        total[0] += sign * value
+        total[1] += sign
+        if total[1] == 0:
+            # Drop the unit rather than keep a float rounding residue around
+            del aggregate.units[unit]
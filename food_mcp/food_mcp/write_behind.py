@@ -0,0 +1,75 @@
+"""WriteBehind: coalesce bursts of changes into a single debounced flush on a background thread."""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """
+    Calls ``flush`` on a background thread once changes stop arriving for ``delay``
+    seconds, and never later than ``max_delay`` seconds after the first unflushed change.
+
+    mark_dirty() only takes a lock and signals the thread, so callers never wait on disk I/O.
+    """
+
+    def __init__(self, flush: Callable[[], None], delay: float = 0.05, max_delay: float = 1.0):
+        """
+        Args:
+            flush: Writes pending changes to disk
+            delay: Quiet period after the last change before flushing
+            max_delay: Upper bound on how long a change may stay unflushed
+        """
+        self.flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self) -> None:
+        """Schedule a flush for a change that was just made."""
+        with self._cond:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Stop the background thread after a final flush of pending changes."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._first_change is None and not self._closed:
+                    self._cond.wait()
+                while self._first_change is not None and not self._closed:
+                    deadline = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                pending = self._first_change is not None
+                self._first_change = self._last_change = None
+                closed = self._closed
+
+            # Changes arriving during the flush start a new round
+            if pending:
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Flushing pending pantry changes failed")
+            if closed:
+                return
@@ -1,23 +1,99 @@
+import asyncio
+import os
+from datetime import timedelta
+
 from fastmcp import FastMCP
+from food_mcp.async_service import AsyncPantryService
+from food_mcp.expiry import ExpiryScheduler
 from food_mcp.service import PantryService
+from food_mcp.subscriptions import ResourceSubscriptions
 
 # Initialize MCP server
 mcp = FastMCP("Pantry MCP Server")
 
-# Initialize service
-service = PantryService()
+# Initialize service (PANTRY_ENGINE selects the storage engine: "json", "journal" or "sqlite";
+# PANTRY_DB_PATH overrides the data file under ~/.pantry_mcp)
+service = PantryService(db_path=os.getenv("PANTRY_DB_PATH"), engine=os.getenv("PANTRY_ENGINE", "json"))
+
+# Tools and resources run in worker threads so disk I/O never blocks the event loop.
+# PANTRY_FLUSH_DELAY > 0 coalesces bursts of changes into one write, flushed at most
+# PANTRY_MAX_FLUSH_DELAY seconds after the first change (and always on shutdown).
+# Up to PANTRY_MAX_READERS read tools run at once; writes run one at a time.
+async_service = AsyncPantryService(
+    service,
+    flush_delay=float(os.getenv("PANTRY_FLUSH_DELAY", "0")),
+    max_flush_delay=float(os.getenv("PANTRY_MAX_FLUSH_DELAY", "1.0")),
+    max_concurrent_reads=int(os.getenv("PANTRY_MAX_READERS", "8")),
+)
 
 # Register tools (using bound methods per FastMCP best practices)
-mcp.tool(service.add_to_pantry)
-mcp.tool(service.remove_from_pantry)
-mcp.tool(service.update_pantry_item)
-mcp.tool(service.get_pantry)
+mcp.tool(async_service.add_to_pantry)
+mcp.tool(async_service.remove_from_pantry)
+mcp.tool(async_service.update_pantry_item)
+mcp.tool(async_service.apply_pantry_changes)
+mcp.tool(async_service.get_pantry)
+mcp.tool(async_service.query_pantry)
+mcp.tool(async_service.search_pantry)
+mcp.tool(async_service.get_pantry_summary)
+mcp.tool(async_service.get_expiring_items)
+mcp.tool(async_service.get_expired_items)
+mcp.tool(async_service.purge_expired)
+mcp.tool(async_service.get_recently_added_items)
+mcp.tool(async_service.get_pantry_changes)
+
+# Register resources
+mcp.resource("pantry://inventory")(async_service.get_pantry_resource)
+mcp.resource("pantry://inventory/version")(async_service.get_pantry_version_resource)
+mcp.resource("pantry://inventory/expired")(async_service.get_expired_items_resource)
+mcp.resource("pantry://inventory/changes/{since_etag}")(async_service.get_pantry_changes_resource)
+
+# Notify subscribed clients when the inventory changes; they can then read
+# pantry://inventory/changes/{etag} to fetch only the delta
+subscriptions = ResourceSubscriptions(mcp)
+service.db.changes.subscribe(lambda event: subscriptions.notify("pantry://inventory"))
 
-# Register resource
-mcp.resource("pantry://inventory")(service.get_pantry_resource)
+# Notify subscribers of pantry://inventory/expired as items expire. With PANTRY_ARCHIVE_AFTER_DAYS
+# set, items expired for longer than that are moved to the archive file next to the pantry.
+archive_after = os.getenv("PANTRY_ARCHIVE_AFTER_DAYS")
+expiry = ExpiryScheduler(
+    service.db,
+    on_expired=lambda items: subscriptions.notify("pantry://inventory/expired"),
+    archive_after=timedelta(days=float(archive_after)) if archive_after else None,
+)
 
 # Register prompt
 mcp.prompt()(service.add_receipt_to_pantry_prompt)
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    # PANTRY_TRANSPORT is "stdio" (one client, the default), or "http" (streamable HTTP) or
+    # "sse" to serve many clients from this one process
+    transport = os.getenv("PANTRY_TRANSPORT", "stdio")
+    try:
+        if transport == "stdio":
+            mcp.run(transport="stdio")
+        else:
+            http_options = {}
+            if transport == "http":
+                # Answer each call with one JSON body rather than an SSE stream; no tool sends
+                # progress mid-call, and change notifications use the session's own stream
+                http_options["json_response"] = True
+            mcp.run(
+                transport=transport,
+                host=os.getenv("PANTRY_HOST", "127.0.0.1"),
+                port=int(os.getenv("PANTRY_PORT", "8000")),
+                **http_options,
+                uvicorn_config={
+                    # Connections and requests beyond this are answered with 503
+                    "limit_concurrency": int(os.getenv("PANTRY_MAX_CONNECTIONS", "256")),
+                    # On shutdown, give requests in progress this many seconds to finish
+                    "timeout_graceful_shutdown": int(os.getenv("PANTRY_SHUTDOWN_TIMEOUT", "10")),
+                },
+            )
+    except KeyboardInterrupt:
+        # Ctrl-C is how the HTTP server is stopped
+        pass
+    finally:
+        expiry.close()
+        # Waits (up to PANTRY_SHUTDOWN_TIMEOUT seconds) for tool calls still running, then
+        # flushes pending writes
+        asyncio.run(async_service.aclose(timeout=float(os.getenv("PANTRY_SHUTDOWN_TIMEOUT", "10"))))
\ No newline at end of file
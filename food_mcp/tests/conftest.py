@@ -0,0 +1,9 @@
+"""Shared fixtures for the food_mcp tests, run from the food_mcp directory with `uv run --with pytest pytest`."""
+
+import pytest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a pantry data file that does not exist yet."""
+    return str(tmp_path / "pantry_data.json")
@@ -0,0 +1,21 @@
+"""Builders shared by the tests."""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from food_mcp.pantry import PantryItem
+
+
+def make_item(general_name: str, quantity: str = "1", expires_in_days: Optional[float] = None, **fields) -> PantryItem:
+    """A pantry item named after its general_name, optionally expiring some days from now."""
+    expiration = datetime.now() + timedelta(days=expires_in_days) if expires_in_days is not None else None
+    return PantryItem(
+        **{
+            "name": general_name.title(),
+            "general_name": general_name,
+            "quantity": quantity,
+            "reciept_name": general_name.upper(),
+            "expiration_time": expiration,
+            **fields,
+        }
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from food_mcp.async_service import AsyncPantryService
+from food_mcp.service import PantryService
+
+from .helpers import make_item
+
+
+@pytest.fixture
+def service(db_path):
+    return PantryService(db_path)
+
+
+def _start_blocked_call(async_service, release: threading.Event) -> None:
+    """Start a read that blocks until ``release`` is set, and leave its event loop while it runs."""
+    started = threading.Event()
+
+    def blocked() -> str:
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async_service.service.get_blocked = blocked
+
+    async def leave_running():
+        asyncio.ensure_future(async_service.get_blocked())
+        await asyncio.to_thread(started.wait, 5)
+
+    asyncio.run(leave_running())
+
+
+def test_aclose_on_another_loop_waits_for_calls_left_running(service):
+    async_service = AsyncPantryService(service)
+    release = threading.Event()
+    _start_blocked_call(async_service, release)
+
+    threading.Timer(0.2, release.set).start()
+    started = time.monotonic()
+    asyncio.run(async_service.aclose(timeout=5))
+
+    assert 0.1 < time.monotonic() - started < 4
+
+
+def test_aclose_gives_up_after_the_timeout(service):
+    async_service = AsyncPantryService(service)
+    release = threading.Event()
+    _start_blocked_call(async_service, release)
+
+    started = time.monotonic()
+    asyncio.run(async_service.aclose(timeout=0.2))
+    release.set()
+
+    assert time.monotonic() - started < 2
+
+
+def test_calls_after_aclose_are_refused(service):
+    async_service = AsyncPantryService(service)
+
+    async def scenario():
+        await async_service.add_to_pantry([make_item("milk")])
+        await async_service.aclose()
+        with pytest.raises(RuntimeError):
+            await async_service.get_pantry()
+
+    asyncio.run(scenario())
+    assert [item.general_name for item in PantryService(service.db.db_path).db.get_pantry().items] == ["milk"]
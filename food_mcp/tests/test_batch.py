@@ -0,0 +1,67 @@
+import pytest
+
+from food_mcp.pantry import AddOperation, RemoveOperation, UpdateOperation
+from food_mcp.service import ENGINES
+
+from .helpers import make_item
+
+
+@pytest.fixture(params=list(ENGINES))
+def engine(request):
+    return request.param
+
+
+def _state(db):
+    return [(item.general_name, item.quantity, item.name) for item in db.get_pantry().items]
+
+
+def _files(tmp_path):
+    """Contents of the engine's files; SQLite's are compared by reopening instead, as a rollback may touch them."""
+    return {path.name: path.read_bytes() for path in sorted(tmp_path.iterdir()) if path.suffix in (".json", ".log")}
+
+
+@pytest.mark.parametrize(
+    "failing",
+    [
+        UpdateOperation(general_name="bread", quantity="2"),
+        # Removed earlier in the same batch
+        UpdateOperation(general_name="milk", quantity="2"),
+    ],
+)
+def test_invalid_operation_mid_batch_changes_nothing(tmp_path, engine, failing):
+    path = str(tmp_path / "pantry.json")
+    db = ENGINES[engine](path)
+    db.add_items([make_item("milk", "1 l"), make_item("eggs", "12")])
+    before, files, version = _state(db), _files(tmp_path), db.version
+
+    with pytest.raises(ValueError, match="Operation 4: .*no changes were applied"):
+        db.apply_batch([
+            AddOperation(items=[make_item("flour")]),
+            RemoveOperation(general_names=["milk"]),
+            UpdateOperation(general_name="eggs", quantity="6"),
+            failing,
+            AddOperation(items=[make_item("rice")]),
+        ])
+
+    assert _state(db) == before
+    assert db.version == version
+    assert [summary.general_name for summary in db.get_summary()] == ["eggs", "milk"]
+    assert _files(tmp_path) == files
+    db.close()
+    assert _state(ENGINES[engine](path)) == before
+
+
+def test_valid_batch_applies_every_operation_in_order(tmp_path, engine):
+    path = str(tmp_path / "pantry.json")
+    db = ENGINES[engine](path)
+    db.add_items([make_item("milk")])
+
+    results = db.apply_batch([
+        AddOperation(items=[make_item("eggs", "12")]),
+        UpdateOperation(general_name="eggs", quantity="6"),
+        RemoveOperation(general_names=["milk"]),
+    ])
+
+    assert [len(results[0]), results[1].quantity, len(results[2])] == [1, "6", 1]
+    db.close()
+    assert _state(ENGINES[engine](path)) == [("eggs", "6", "Eggs")]
@@ -0,0 +1,14 @@
+from food_mcp.database import Database
+
+from .helpers import make_item
+
+
+def test_close_releases_the_lock_file(db_path):
+    db = Database(db_path)
+    db.add_items([make_item("milk")])
+    lock_file = db._lock_file
+
+    db.close()
+
+    assert lock_file.closed
+    assert db._lock_file is None
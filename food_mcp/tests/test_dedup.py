@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from food_mcp.dedup import content_hash
+from food_mcp.service import ENGINES, PantryService
+
+from .helpers import make_item
+
+
+@pytest.fixture(params=list(ENGINES))
+def engine(request):
+    return request.param
+
+
+def _open(tmp_path, engine):
+    return PantryService(str(tmp_path / f"pantry.{engine}"), engine=engine)
+
+
+def test_retry_with_key_adds_nothing_and_repeats_the_confirmation(tmp_path, engine):
+    service = _open(tmp_path, engine)
+    items = [make_item("milk", "1 gallon"), make_item("eggs", "12")]
+
+    first = service.add_to_pantry(items, idempotency_key="receipt-1")
+    retry = service.add_to_pantry([make_item("eggs", "12"), make_item("milk", "1 gallon")], idempotency_key="receipt-1")
+
+    assert retry.splitlines()[0] == first.splitlines()[0] == "Added 2 item(s) to pantry:"
+    assert sorted(retry.splitlines()) == sorted(first.splitlines())
+    assert len(service.db.get_pantry().items) == 2
+
+
+def test_reusing_a_key_for_other_items_is_an_error(tmp_path, engine):
+    service = _open(tmp_path, engine)
+    service.add_to_pantry([make_item("milk")], idempotency_key="receipt-1")
+
+    assert service.add_to_pantry([make_item("bread")], idempotency_key="receipt-1").startswith("Error:")
+    assert [item.general_name for item in service.db.get_pantry().items] == ["milk"]
+
+
+def test_same_items_without_a_key_are_a_retry(tmp_path, engine):
+    service = _open(tmp_path, engine)
+    service.add_to_pantry([make_item("milk")])
+    service.add_to_pantry([make_item("milk")])
+    service.add_to_pantry([make_item("bread")])
+
+    assert [item.general_name for item in service.db.get_pantry().items] == ["milk", "bread"]
+
+
+def test_submissions_survive_a_restart(tmp_path, engine):
+    service = _open(tmp_path, engine)
+    service.add_to_pantry([make_item("milk")], idempotency_key="receipt-1")
+    service.db.close()
+
+    service = _open(tmp_path, engine)
+    service.add_to_pantry([make_item("milk")], idempotency_key="receipt-1")
+
+    assert len(service.db.get_pantry().items) == 1
+
+
+def test_json_file_keeps_no_second_copy_of_the_items(tmp_path):
+    service = _open(tmp_path, "json")
+    service.add_to_pantry([make_item(f"item {index}") for index in range(50)], idempotency_key="receipt-1")
+
+    with open(tmp_path / "pantry.json") as f:
+        data = json.load(f)
+    assert len(data["items"]) == 50
+    assert [set(entry) for entry in data["submissions"]] == [{"idempotency_key", "content_hash", "time"}]
+
+
+def test_content_hash_ignores_order_and_time_added():
+    milk, eggs = make_item("milk"), make_item("eggs")
+
+    assert content_hash([milk, eggs]) == content_hash([make_item("eggs"), make_item("milk")])
+    assert content_hash([milk]) != content_hash([make_item("milk", "2")])
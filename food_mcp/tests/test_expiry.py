@@ -0,0 +1,86 @@
+import json
+import queue
+from datetime import datetime, timedelta
+
+import pytest
+
+from food_mcp.database import Database
+from food_mcp.expiry import ExpiryScheduler
+from food_mcp.journal import JournalDatabase
+
+from .helpers import make_item
+
+SECOND = 1 / 86400
+
+
+@pytest.fixture
+def reported():
+    return queue.Queue()
+
+
+def _scheduler(db, reported, **options):
+    return ExpiryScheduler(db, lambda items: reported.put([item.general_name for item in items]), **options)
+
+
+def test_wakes_when_an_item_expires(db_path, reported):
+    db = Database(db_path)
+    db.add_items([make_item("stale", expires_in_days=-1), make_item("milk", expires_in_days=0.3 * SECOND)])
+    scheduler = _scheduler(db, reported)
+    try:
+        assert reported.get(timeout=2) == ["stale"]
+        # Well before max_sleep, which would be the next sweep without the expiry
+        assert reported.get(timeout=2) == ["milk"]
+    finally:
+        scheduler.close()
+
+
+def test_reschedules_after_a_change(db_path, reported):
+    db = Database(db_path)
+    db.add_items([make_item("flour", expires_in_days=30)])
+    scheduler = _scheduler(db, reported)
+    try:
+        db.add_items([make_item("milk", expires_in_days=0.3 * SECOND)])
+        assert reported.get(timeout=2) == ["milk"]
+        assert reported.empty()
+    finally:
+        scheduler.close()
+
+
+def test_archives_items_expired_for_longer_than_archive_after(db_path, reported):
+    db = Database(db_path)
+    db.add_items([make_item("stale", expires_in_days=-3), make_item("milk", expires_in_days=-0.5), make_item("flour")])
+    scheduler = _scheduler(db, reported, archive_after=timedelta(days=1))
+    try:
+        assert reported.get(timeout=2) == ["stale", "milk"]
+    finally:
+        scheduler.close()
+
+    assert [item.general_name for item in db.get_pantry().items] == ["milk", "flour"]
+    assert [json.loads(line)["general_name"] for line in db.archive_path.read_text().splitlines()] == ["stale"]
+
+
+@pytest.mark.parametrize("engine", [Database, JournalDatabase])
+def test_remove_expired_appends_to_the_archive(tmp_path, engine):
+    db = engine(str(tmp_path / "pantry.json"))
+    db.add_items([make_item("stale", expires_in_days=-3), make_item("old", expires_in_days=-2), make_item("flour")])
+
+    assert [item.general_name for item in db.remove_expired(datetime.now() - timedelta(days=2.5)).items] == ["stale"]
+    assert [item.general_name for item in db.remove_expired(datetime.now()).items] == ["old"]
+    db.close()
+
+    assert db.archive_path == tmp_path / "pantry.archive.jsonl"
+    archived = [json.loads(line) for line in db.archive_path.read_text().splitlines()]
+    assert [entry["general_name"] for entry in archived] == ["stale", "old"]
+    assert all("archived_at" in entry for entry in archived)
+    # The journal replays the removals rather than archiving again
+    reopened = engine(str(tmp_path / "pantry.json"))
+    assert [item.general_name for item in reopened.get_pantry().items] == ["flour"]
+    assert len(db.archive_path.read_text().splitlines()) == 2
+
+
+def test_remove_expired_without_archive_writes_no_archive(db_path):
+    db = Database(db_path)
+    db.add_items([make_item("stale", expires_in_days=-1)])
+
+    assert [item.general_name for item in db.remove_expired(datetime.now(), archive=False).items] == ["stale"]
+    assert not db.archive_path.exists()
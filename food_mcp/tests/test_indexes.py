@@ -0,0 +1,118 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from food_mcp.item_store import sort_key
+from food_mcp.service import ENGINES, PantryService
+
+from .helpers import make_item
+
+NAMES = ["milk", "eggs", "bread", "rice", "apples"]
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+@pytest.fixture(params=list(ENGINES))
+def engine(request):
+    return request.param
+
+
+@pytest.fixture
+def service(engine, tmp_path):
+    service = PantryService(str(tmp_path / "pantry.json"), engine=engine)
+    yield service
+    service.db.close()
+
+
+def _random_item(rng: random.Random):
+    # Whole days, so expirations and additions tie and the indexes must keep insertion order
+    expires = rng.choice([None, -2, -1, 1, 1, 3, 7])
+    return make_item(
+        rng.choice(NAMES),
+        str(rng.randint(1, 5)),
+        expiration_time=NOW + timedelta(days=expires) if expires is not None else None,
+        time_added=NOW - timedelta(days=rng.randint(0, 4)),
+    )
+
+
+def _mutate(db, rng: random.Random) -> None:
+    present = sorted({item.general_name for item in db.get_pantry().items})
+    op = rng.choice(["add", "add", "remove", "update", "rename", "expire"])
+    if op == "add" or not present:
+        db.add_items([_random_item(rng) for _ in range(rng.randint(1, 3))])
+    elif op == "remove":
+        db.remove_items([rng.choice(present)])
+    elif op == "update":
+        db.update_item(rng.choice(present), quantity=str(rng.randint(1, 9)))
+    elif op == "rename":
+        db.update_item(rng.choice(present), name=f"Renamed {rng.randint(0, 99)}")
+    else:
+        db.remove_expired(NOW + timedelta(days=rng.choice([-1, 0, 2])), archive=False)
+
+
+def _expiring_before(items, before):
+    matches = [item for item in items if item.expiration_time is not None and sort_key(item.expiration_time) < before]
+    return sorted(matches, key=lambda item: sort_key(item.expiration_time))
+
+
+def _added_since(items, since):
+    matches = [item for item in items if sort_key(item.time_added) >= since]
+    return sorted(matches, key=lambda item: sort_key(item.time_added))
+
+
+def _assert_indexes_match_scan(service) -> None:
+    db = service.db
+    items = db.get_pantry().items
+
+    for name in NAMES:
+        entries = [item for item in items if item.general_name == name]
+        assert db.find_item(name) == (entries[0] if entries else None)
+        page, _ = db.query_items(general_name=name, sort_by="general_name", limit=100)
+        assert page == entries
+
+    for days in (-3, -1, 0, 2, 8):
+        bound = NOW + timedelta(days=days)
+        assert db.items_expiring_before(bound) == _expiring_before(items, bound)
+        assert db.items_added_since(bound) == _added_since(items, bound)
+        assert json.loads(service.get_expiring_items(bound))["items"] == [
+            item.model_dump(mode="json") for item in _expiring_before(items, bound)
+        ]
+        assert json.loads(service.get_recently_added_items(bound))["items"] == [
+            item.model_dump(mode="json") for item in _added_since(items, bound)
+        ]
+
+    expirations = sorted(sort_key(item.expiration_time) for item in items if item.expiration_time is not None)
+    assert db.next_expiration() == (expirations[0] if expirations else None)
+    by_expiration, _ = db.query_items(sort_by="expiration_time", limit=1000)
+    assert by_expiration == _expiring_before(items, datetime.max)
+    by_time_added, _ = db.query_items(sort_by="time_added", descending=True, limit=1000)
+    assert by_time_added == _added_since(items, datetime.min)[::-1]
+
+    summaries = {summary.general_name: summary for summary in db.get_summary()}
+    assert sorted(summaries) == sorted({item.general_name for item in items})
+    for name, summary in summaries.items():
+        entries = [item for item in items if item.general_name == name]
+        assert summary.entries == len(entries)
+        soonest = _expiring_before(entries, datetime.max)
+        assert summary.earliest_expiration == (soonest[0].expiration_time if soonest else None)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_indexes_match_a_scan_after_every_change(service, seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        _mutate(service.db, rng)
+        _assert_indexes_match_scan(service)
+
+
+def test_indexes_match_a_scan_after_reopening(service, engine, tmp_path):
+    rng = random.Random(7)
+    for _ in range(30):
+        _mutate(service.db, rng)
+    service.db.close()
+    reopened = PantryService(str(tmp_path / "pantry.json"), engine=engine)
+    try:
+        _assert_indexes_match_scan(reopened)
+    finally:
+        reopened.db.close()
@@ -0,0 +1,56 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from food_mcp import item_store
+from food_mcp.item_store import StoredItem, dump_pantry, extend_pantry_document, iter_pantry_file
+
+NAMES = ["Milk", "a}b", "{[", "]}]}", 'say "hi"}', "back\\slash}", "", "é}ü", "line\nbreak}"]
+
+
+def _items(names):
+    return [StoredItem(name, name.lower(), "1", name, datetime(2024, 1, 1), None) for name in names]
+
+
+def _read(document):
+    extra = {}
+    items = list(iter_pantry_file(io.StringIO(document), extra))
+    return [item.name for item in items], extra
+
+
+@pytest.fixture(params=[1, 3, 16, 1 << 20])
+def chunk_size(request, monkeypatch):
+    monkeypatch.setattr(item_store, "CHUNK_SIZE", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_streams_items_with_brackets_and_escapes_in_strings(chunk_size, indent):
+    document = dump_pantry(_items(NAMES * 5), indent=indent, journal_seq=7, submissions=[{"key": "}]"}])
+
+    names, extra = _read(document)
+
+    assert names == NAMES * 5
+    assert extra == {"journal_seq": 7, "submissions": [{"key": "}]"}]}
+
+
+def test_reads_keys_added_after_the_items(chunk_size):
+    document = extend_pantry_document(dump_pantry(_items(["Milk"]), indent=2), journal_seq=3, other={"a": [1, "]"]})
+
+    assert _read(document) == (["Milk"], {"journal_seq": 3, "other": {"a": [1, "]"]}})
+
+
+def test_reads_an_empty_pantry(chunk_size):
+    assert _read(dump_pantry([])) == ([], {})
+    assert _read("{}") == ([], {})
+
+
+@pytest.mark.parametrize("cut", [1, 5, 40])
+def test_truncated_document_is_an_error(chunk_size, cut):
+    document = dump_pantry(_items(NAMES), indent=2)
+
+    with pytest.raises(json.JSONDecodeError):
+        _read(document[:-cut])
+
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from food_mcp.journal import JournalDatabase
+from food_mcp.pantry import AddOperation, RemoveOperation, UpdateOperation
+
+from .helpers import make_item
+
+
+def _names(db):
+    return [(item.general_name, item.quantity, item.name) for item in db.get_pantry().items]
+
+
+def _reopen(db, **options):
+    db.close()
+    return JournalDatabase(str(db.db_path), **options)
+
+
+def _log_lines(db):
+    return db.log_path.read_text().splitlines() if db.log_path.exists() else []
+
+
+def test_replays_every_kind_of_record_after_a_restart(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk"), make_item("eggs", "12")])
+    db.update_item("eggs", quantity="6")
+    db.remove_items(["milk"])
+    db.add_items([make_item("stale", expires_in_days=-3)])
+    db.remove_expired(datetime.now() - timedelta(days=1), archive=False)
+    db.apply_batch([
+        AddOperation(items=[make_item("bread")]),
+        UpdateOperation(general_name="bread", name="Rye Bread"),
+        RemoveOperation(general_names=["eggs"]),
+    ])
+    expected = _names(db)
+
+    db = _reopen(db)
+
+    assert _names(db) == expected == [("bread", "1", "Rye Bread")]
+    # Nothing was compacted: the snapshot is still empty and the log holds every record
+    assert [json.loads(line)["seq"] for line in _log_lines(db)] == [1, 2, 3, 4, 5, 6]
+
+
+def test_compaction_folds_the_log_into_the_snapshot(db_path):
+    db = JournalDatabase(db_path, compact_every=3)
+    for index in range(3):
+        db.add_items([make_item(f"item {index}")])
+    db._compaction.join()
+    for index in range(3, 5):
+        db.add_items([make_item(f"item {index}")])
+
+    with open(db_path) as f:
+        snapshot = json.load(f)
+    assert snapshot["journal_seq"] == 3
+    assert len(snapshot["items"]) == 3
+    assert [json.loads(line)["seq"] for line in _log_lines(db)] == [4, 5]
+
+    db = _reopen(db, compact_every=3)
+    assert [name for name, _, _ in _names(db)] == [f"item {index}" for index in range(5)]
+
+
+def test_explicit_compaction_keeps_the_pantry(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk"), make_item("eggs")])
+    db.remove_items(["milk"])
+    db.compact()
+
+    assert _log_lines(db) == []
+    assert not db.compacting_path.exists()
+    assert _names(_reopen(db)) == [("eggs", "1", "Eggs")]
+
+
+def test_torn_last_record_is_dropped_and_truncated(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk")])
+    db.close()
+    with open(db.log_path, "a") as f:
+        f.write('{"seq": 2, "op": "remove", "general_na')
+
+    db = JournalDatabase(db_path)
+
+    assert _names(db) == [("milk", "1", "Milk")]
+    assert [json.loads(line)["seq"] for line in _log_lines(db)] == [1]
+    db.add_items([make_item("eggs")])
+    assert [name for name, _, _ in _names(_reopen(db))] == ["milk", "eggs"]
+
+
+def test_corrupted_record_in_the_middle_is_an_error(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk")])
+    db.add_items([make_item("eggs")])
+    db.close()
+    lines = db.log_path.read_text().splitlines(keepends=True)
+    db.log_path.write_text("not json\n" + lines[1])
+
+    with pytest.raises(ValueError, match="Corrupted pantry journal"):
+        JournalDatabase(db_path)
+
+
+def test_interrupted_compaction_is_replayed(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk")])
+    db.add_items([make_item("eggs")])
+    db.close()
+    # A crash after the log was rotated but before the snapshot was written
+    db.log_path.rename(db.compacting_path)
+
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("bread")])
+
+    assert [name for name, _, _ in _names(_reopen(db))] == ["milk", "eggs", "bread"]
+
+
+def test_records_already_in_the_snapshot_are_skipped(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk")])
+    log = db.log_path.read_text()
+    db.compact()
+    db.close()
+    # The log of a compaction that wrote its snapshot but crashed before removing the log
+    db.compacting_path.write_text(log)
+
+    assert _names(JournalDatabase(db_path)) == [("milk", "1", "Milk")]
+
+
+def test_load_data_reads_the_files_without_touching_the_live_pantry(db_path):
+    db = JournalDatabase(db_path)
+    db.add_items([make_item("milk")])
+    db.add_items([make_item("eggs")])
+    version, items = db.get_snapshot().version, db._items
+    with open(db.log_path, "a") as f:
+        f.write('{"seq": 3, "op": "remove", "general_na')
+
+    assert [item.general_name for item in db.load_data().items] == ["milk", "eggs"]
+
+    assert db.get_snapshot().version == version
+    assert db._items is items
+    # The torn record is left for the next startup to cut off
+    assert db.log_path.read_text().endswith('"general_na')
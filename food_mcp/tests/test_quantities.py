@@ -0,0 +1,48 @@
+import pytest
+
+from food_mcp.quantities import Quantity, convert, parse_quantity
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("12", Quantity(12.0, "count")),
+        ("6 each", Quantity(6.0, "count")),
+        ("2.5lbs", Quantity(2.5, "lb")),
+        ("1 gallon", Quantity(1.0, "gal")),
+        ("500 ml", Quantity(500.0, "ml")),
+        ("1 1/2 cups", Quantity(1.5, "cup")),
+        ("1/2 lb", Quantity(0.5, "lb")),
+        (".5 kg", Quantity(0.5, "kg")),
+        ("16 fl oz", Quantity(16.0, "fl oz")),
+        ("gallon", Quantity(1.0, "gal")),
+        ("a dozen", Quantity(12.0, "count")),
+        ("half dozen", Quantity(6.0, "count")),
+        ("1 dozen eggs", Quantity(12.0, "count")),
+        ("2 dozen oz", Quantity(24.0, "oz")),
+        ("2 cans", Quantity(2.0, "can")),
+        ("3 boxes", Quantity(3.0, "box")),
+        ("2 bunches", Quantity(2.0, "bunch")),
+        ("1 pint", Quantity(1.0, "pt")),
+        ("2 tomatoes", Quantity(2.0, "tomato")),
+        ("4 leaves", Quantity(4.0, "leaf")),
+        ("2 loaves", Quantity(2.0, "loaf")),
+        ("1 loaf", Quantity(1.0, "loaf")),
+        ("2 berries", Quantity(2.0, "berry")),
+        ("3 cookies", Quantity(3.0, "cookie")),
+        ("1 glass", Quantity(1.0, "glass")),
+        ("1 hummus", Quantity(1.0, "hummus")),
+        ("milk", None),
+        ("some", None),
+        ("1/0 lb", None),
+        ("2 big bags", None),
+    ],
+)
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+
+def test_convert_within_a_dimension():
+    assert convert(Quantity(2.0, "lb"), "oz") == pytest.approx(Quantity(32.0, "oz"))
+    with pytest.raises(ValueError):
+        convert(Quantity(1.0, "lb"), "ml")
@@ -0,0 +1,101 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+from food_mcp.search import WORD_THRESHOLD, SearchIndex, item_texts, normalize, similarity, trigrams
+from food_mcp.service import ENGINES, PantryService
+
+from .helpers import make_item
+
+WORDS = ["chicken", "breast", "thigh", "boneless", "organic", "whole", "milk", "oat", "butter", "peanut",
+         "kerrygold", "salted", "egg", "large", "brown", "rice", "basmati", "flour", "bread", "rye"]
+TYPOS = ["chiken", "brest", "organik", "mlk", "buter", "kerrygld", "ryce", "flour", "bred", "peanutt"]
+
+
+@lru_cache(maxsize=None)
+def _word_score(token, word):
+    score = similarity(len(trigrams(token) & trigrams(word)), len(trigrams(token)), len(trigrams(word)))
+    return score if score >= WORD_THRESHOLD else 0.0
+
+
+def _brute_force(items, query, limit, threshold):
+    """Score every item against the query, as SearchIndex.search describes, and rank them all."""
+    tokens = set(normalize(query).split())
+    ranked = []
+    for item_id, *names in items:
+        best = 0.0
+        for text in item_texts(*names):
+            words = set(text.split())
+            shared = sum(max(_word_score(token, word) for word in words) for token in tokens)
+            best = max(best, similarity(shared, len(tokens), len(words)))
+        if best and best >= threshold:
+            ranked.append((best, item_id))
+    ranked.sort(key=lambda entry: (-entry[0], entry[1]))
+    return ranked[:limit]
+
+
+def test_early_stopping_ranks_like_scoring_every_item():
+    rng = random.Random(7)
+    items = []
+    for item_id in range(400):
+        name = " ".join(rng.sample(WORDS, rng.randint(1, 4)))
+        items.append((item_id, name.title(), rng.choice(WORDS), name.upper()))
+    index = SearchIndex(items)
+
+    for _ in range(200):
+        query = " ".join(rng.sample(WORDS + TYPOS, rng.randint(1, 3)))
+        limit = rng.choice([1, 3, 10, 50])
+        found = index.search(query, limit)
+        expected = _brute_force(items, query, limit, 0.3)
+        assert [item_id for _, item_id in found] == [item_id for _, item_id in expected], query
+        assert [score for score, _ in found] == pytest.approx([score for score, _ in expected])
+
+
+def test_discarded_items_are_ranked_like_a_fresh_index():
+    rng = random.Random(11)
+    items = [(item_id, " ".join(rng.sample(WORDS, 2)), rng.choice(WORDS), "") for item_id in range(200)]
+    index = SearchIndex(items)
+    for item in items[::3]:
+        index.discard(*item)
+    kept = [item for index_, item in enumerate(items) if index_ % 3]
+
+    for query in ["chicken breast", "organik milk", "rye"]:
+        assert index.search(query, 20) == SearchIndex(kept).search(query, 20)
+
+
+@pytest.fixture(params=list(ENGINES))
+def service(request, tmp_path):
+    return PantryService(str(tmp_path / f"pantry.{request.param}"), engine=request.param)
+
+
+def _found(service, query):
+    return [item.name for item, _ in service.db.search_items(query)]
+
+
+def test_typos_and_partial_names_match(service):
+    service.add_to_pantry([
+        make_item("chicken breast", name="Boneless Chicken Breast"),
+        make_item("butter", name="Kerrygold Salted Butter"),
+        make_item("milk", name="Oat Milk"),
+    ])
+
+    assert _found(service, "chiken") == ["Boneless Chicken Breast"]
+    assert _found(service, "kerrygld") == ["Kerrygold Salted Butter"]
+    assert _found(service, "milk") == ["Oat Milk"]
+    assert _found(service, "basmati") == []
+
+
+def test_index_follows_adds_removals_and_renames(service):
+    service.add_to_pantry([make_item("milk", name="Oat Milk")])
+    assert _found(service, "oat milk") == ["Oat Milk"]
+
+    service.add_to_pantry([make_item("bread", name="Rye Bread")])
+    service.update_pantry_item("milk", name="Whole Milk")
+    assert _found(service, "rye") == ["Rye Bread"]
+    assert _found(service, "whole") == ["Whole Milk"]
+    assert _found(service, "oat") == []
+
+    service.remove_from_pantry(["bread"])
+    assert _found(service, "rye") == []
+    assert _found(service, "milk") == ["Whole Milk"]
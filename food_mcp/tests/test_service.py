@@ -0,0 +1,62 @@
+import base64
+import json
+
+import pytest
+
+from food_mcp.service import PantryService
+
+from .helpers import make_item
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def service(request, tmp_path):
+    return PantryService(str(tmp_path / f"pantry.{request.param}"), engine=request.param)
+
+
+def _cursor(state) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def test_query_pantry_pages_through_every_item(service):
+    service.add_to_pantry([make_item(f"item {index:02}") for index in range(7)])
+
+    names, cursor = [], None
+    while True:
+        page = json.loads(service.query_pantry(sort_by="general_name", limit=3, cursor=cursor))
+        names += [item["general_name"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert names == [f"item {index:02}" for index in range(7)]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _cursor([1, 2]),
+        _cursor("after"),
+        _cursor({}),
+        _cursor({"sort_by": "time_added", "descending": False}),
+        _cursor({"sort_by": "time_added", "descending": False, "after": "2024-01-01"}),
+        _cursor({"sort_by": "time_added", "descending": False, "after": ["2024-01-01", "1"]}),
+        _cursor({"sort_by": "time_added", "descending": False, "after": ["2024-01-01", 1, 2]}),
+    ],
+)
+def test_query_pantry_rejects_malformed_cursors(service, cursor):
+    service.add_to_pantry([make_item("milk")])
+
+    assert service.query_pantry(cursor=cursor) == "Error: invalid cursor"
+
+
+def test_query_pantry_refuses_a_cursor_from_before_another_process_wrote(db_path):
+    reader, writer = PantryService(db_path), PantryService(db_path)
+    reader.add_to_pantry([make_item("apples"), make_item("bread"), make_item("milk")])
+    cursor = json.loads(reader.query_pantry(sort_by="general_name", limit=1))["next_cursor"]
+
+    # The reader reloads the file, and the ids in the cursor now point at other items
+    writer.remove_from_pantry(["apples"])
+
+    assert reader.query_pantry(sort_by="general_name", limit=1, cursor=cursor) == "Error: invalid cursor"
+    cursor = json.loads(reader.query_pantry(sort_by="general_name", limit=1))["next_cursor"]
+    assert [item["general_name"] for item in json.loads(reader.query_pantry(sort_by="general_name", cursor=cursor))["items"]] == ["milk"]
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from food_mcp.database import Database
+from food_mcp.shared_lock import SharedLock
+
+from .helpers import make_item
+
+
+def _in_thread(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_hold_the_lock_together():
+    lock = SharedLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def read():
+        with lock.shared():
+            inside.wait()
+
+    threads = [_in_thread(read) for _ in range(2)]
+    with lock.shared():
+        inside.wait()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_writer_waits_for_readers_and_holds_back_new_ones():
+    lock = SharedLock()
+    events = []
+    reading = threading.Event()
+    release = threading.Event()
+
+    def first_reader():
+        with lock.shared():
+            reading.set()
+            release.wait(5)
+            events.append("first read")
+
+    def writer():
+        with lock.exclusive():
+            events.append("write")
+
+    def late_reader():
+        with lock.shared():
+            events.append("late read")
+
+    threads = [_in_thread(first_reader)]
+    reading.wait(5)
+    threads.append(_in_thread(writer))
+    while not lock._writers_waiting:
+        time.sleep(0.001)
+    threads.append(_in_thread(late_reader))
+    time.sleep(0.05)
+    assert events == []
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert events == ["first read", "write", "late read"]
+
+
+def test_reentrant_and_a_writer_may_read():
+    lock = SharedLock()
+    with lock.exclusive(), lock.exclusive(), lock.shared(), lock.shared():
+        pass
+    with lock.shared(), lock.shared():
+        pass
+
+    def write():
+        with lock.exclusive():
+            written.set()
+
+    # Fully released: another thread can take it exclusively
+    written = threading.Event()
+    _in_thread(write).join(5)
+    assert written.is_set()
+
+
+def test_upgrading_a_shared_hold_is_refused():
+    lock = SharedLock()
+    with lock.shared():
+        with pytest.raises(RuntimeError):
+            with lock.exclusive():
+                pass
+    with lock.exclusive():
+        pass
+
+
+def test_database_reads_run_alongside_a_read_in_progress(db_path):
+    db = Database(db_path)
+    db.add_items([make_item("milk")])
+    results = []
+
+    with db._lock.shared():
+        reader = _in_thread(lambda: results.append(db.find_item("milk").general_name))
+        reader.join(5)
+        assert results == ["milk"]
+
+        writer = _in_thread(lambda: db.add_items([make_item("eggs")]))
+        writer.join(0.1)
+        assert writer.is_alive()
+    writer.join(5)
+    assert [item.general_name for item in db.get_pantry().items] == ["milk", "eggs"]
@@ -0,0 +1,155 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from food_mcp.database import Database
+from food_mcp.pantry import AddOperation, UpdateOperation
+from food_mcp.service import PantryService
+from food_mcp.sqlite_database import SQLiteDatabase, migrate_json_to_sqlite
+
+from .helpers import make_item
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "pantry_data.db")
+
+
+def _pantry(db):
+    return [(item.general_name, item.quantity, item.name, item.expiration_time) for item in db.get_pantry().items]
+
+
+def test_snapshot_sees_other_connections_writes(sqlite_path):
+    reader, writer = SQLiteDatabase(sqlite_path), SQLiteDatabase(sqlite_path)
+    before = reader.get_snapshot()
+
+    writer.add_items([make_item("milk")])
+
+    after = reader.get_snapshot()
+    assert after.etag != before.etag
+    assert [item["general_name"] for item in json.loads(after.data)["items"]] == ["milk"]
+    # The feed has no events for another connection's write, so clients must re-read the snapshot
+    assert reader.changes_since(before.version) is None
+
+
+def test_own_writes_keep_the_change_feed(sqlite_path):
+    db = SQLiteDatabase(sqlite_path)
+    before = db.get_snapshot()
+
+    db.add_items([make_item("milk")])
+
+    assert db.get_snapshot().version == before.version + 1
+    assert [event.op for event in db.changes_since(before.version)] == ["add"]
+
+
+def test_pantry_changes_fall_back_to_snapshot_after_another_process_writes(sqlite_path):
+    reader, writer = PantryService(sqlite_path, engine="sqlite"), PantryService(sqlite_path, engine="sqlite")
+    etag = json.loads(reader.get_pantry_version_resource())["etag"]
+
+    writer.add_to_pantry([make_item("milk")])
+
+    changes = json.loads(reader.get_pantry_changes(etag))
+    assert changes["etag"] != etag
+    assert [item["general_name"] for item in changes["snapshot"]["items"]] == ["milk"]
+
+
+def test_migrates_a_json_pantry(db_path, sqlite_path):
+    source = Database(db_path)
+    source.add_items([make_item("milk", "1 gallon", expires_in_days=3), make_item("eggs", "12"), make_item("milk", "2 l")])
+
+    assert migrate_json_to_sqlite(db_path, sqlite_path) == 3
+
+    db = SQLiteDatabase(sqlite_path)
+    assert _pantry(db) == _pantry(source)
+    assert [(summary.general_name, summary.entries) for summary in db.get_summary()] == [("eggs", 1), ("milk", 2)]
+    expires = source.get_pantry().items[0].expiration_time
+    assert [item.general_name for item in db.items_expiring_before(expires + timedelta(seconds=1))] == ["milk"]
+
+
+def test_migration_refuses_a_database_with_items(db_path, sqlite_path):
+    Database(db_path).add_items([make_item("milk")])
+    SQLiteDatabase(sqlite_path).add_items([make_item("eggs")])
+
+    with pytest.raises(ValueError, match="already contains 1 item"):
+        migrate_json_to_sqlite(db_path, sqlite_path)
+    assert [name for name, *_ in _pantry(SQLiteDatabase(sqlite_path))] == ["eggs"]
+
+
+def test_export_round_trips_through_the_json_engine(tmp_path, sqlite_path):
+    db = SQLiteDatabase(sqlite_path)
+    db.add_items([make_item("milk", expires_in_days=1), make_item("eggs", "12")])
+    db.update_item("eggs", quantity="6")
+
+    db.export_json(str(tmp_path / "export.json"))
+
+    assert _pantry(Database(str(tmp_path / "export.json"))) == _pantry(db)
+
+
+def test_totals_are_rebuilt_for_databases_without_them(sqlite_path):
+    db = SQLiteDatabase(sqlite_path)
+    db.add_items([make_item("milk", "1 l"), make_item("milk", "500 ml")])
+    with db.conn:
+        db.conn.execute("DELETE FROM pantry_totals")
+    db.close()
+
+    assert [(summary.general_name, summary.entries) for summary in SQLiteDatabase(sqlite_path).get_summary()] == [("milk", 2)]
+
+
+def test_rolled_back_batch_changes_nothing(sqlite_path):
+    db = SQLiteDatabase(sqlite_path)
+    db.add_items([make_item("milk")])
+
+    with pytest.raises(ValueError):
+        db.apply_batch([AddOperation(items=[make_item("eggs")]), UpdateOperation(general_name="bread", quantity="2")])
+
+    assert [name for name, *_ in _pantry(db)] == ["milk"]
+    assert [summary.general_name for summary in db.get_summary()] == ["milk"]
+    assert [item.general_name for item, _ in db.search_items("eggs")] == []
+
+
+@pytest.mark.parametrize("engine", [Database, SQLiteDatabase])
+def test_timestamps_with_different_utc_offsets_compare_by_instant(tmp_path, engine):
+    # 10:00 at -05:00 is 15:00 UTC, after the second item's 12:00 UTC
+    later = datetime(2030, 1, 1, 10, tzinfo=timezone(timedelta(hours=-5)))
+    sooner = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+    cutoff = datetime(2030, 1, 1, 14, tzinfo=timezone.utc)
+    db = engine(str(tmp_path / "pantry"))
+    db.add_items([
+        make_item("milk", name="Later", expiration_time=later),
+        make_item("milk", name="Sooner", expiration_time=sooner),
+    ])
+
+    assert [item.name for item in db.items_expiring_before(cutoff)] == ["Sooner"]
+    assert db.next_expiration() == sooner.astimezone().replace(tzinfo=None)
+    assert [item.name for item in db.query_items(sort_by="expiration_time")[0]] == ["Sooner", "Later"]
+    assert db.get_summary()[0].earliest_expiration == sooner
+    assert [item.name for item in db.remove_expired(cutoff, archive=False).items] == ["Sooner"]
+    assert [item.name for item in db.get_pantry().items] == ["Later"]
+
+
+def test_remove_sees_other_connections_writes(sqlite_path):
+    reader, writer = SQLiteDatabase(sqlite_path), SQLiteDatabase(sqlite_path)
+    reader.add_items([make_item("milk")])
+    version = reader.get_snapshot().version
+
+    writer.add_items([make_item("eggs")])
+    reader.remove_items(["eggs"])
+
+    # The other connection's write comes first, then the removal that saw it
+    assert reader.changes_since(version) is None
+    assert [(event.version, event.op) for event in reader.changes_since(version + 1)] == [(version + 2, "remove")]
+    assert [item.general_name for item, _ in reader.search_items("eggs")] == []
+
+
+def test_close_stops_write_behind(sqlite_path):
+    db = SQLiteDatabase(sqlite_path)
+    db.enable_write_behind(delay=10)
+    write_behind = db._write_behind
+    db.add_items([make_item("milk")])
+
+    db.close()
+
+    assert db._write_behind is None
+    assert not write_behind._thread.is_alive()
+    assert [name for name, *_ in _pantry(SQLiteDatabase(sqlite_path))] == ["milk"]
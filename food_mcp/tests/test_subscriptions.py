@@ -0,0 +1,14 @@
+import pytest
+
+from food_mcp.subscriptions import ResourceSubscriptions
+
+
+class _ServerWithoutSubscriptions:
+    """Stands in for a FastMCP whose low-level server has no subscribe_resource hook (fastmcp 3 and later)."""
+
+    _mcp_server = object()
+
+
+def test_unsupported_fastmcp_fails_clearly():
+    with pytest.raises(RuntimeError, match="fastmcp>=2.13.0.2,<3"):
+        ResourceSubscriptions(_ServerWithoutSubscriptions())
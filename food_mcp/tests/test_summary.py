@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from food_mcp.service import ENGINES, PantryService
+
+from .helpers import make_item
+
+
+@pytest.fixture(params=list(ENGINES))
+def service(request, tmp_path):
+    return PantryService(str(tmp_path / f"pantry.{request.param}"), engine=request.param)
+
+
+def _totals(service, general_name):
+    (summary,) = json.loads(service.get_pantry_summary(general_name))["items"]
+    return [(total["value"], total["unit"]) for total in summary["totals"]], summary["entries"], summary["unparsed_entries"]
+
+
+@pytest.mark.parametrize(
+    "quantities, totals",
+    [
+        (["1 dozen", "12", "6 each"], [(30.0, "count")]),
+        (["1 dozen eggs", "12"], [(24.0, "count")]),
+        (["1 lb", "8 oz"], [(1.5, "lb")]),
+        (["8 oz", "8 oz", "1 lb"], [(32.0, "oz")]),
+        (["1 gallon", "2 quarts"], [(1.5, "gal")]),
+        (["2 tomatoes", "1 tomato"], [(3.0, "tomato")]),
+        (["2 cans", "1 lb", "3 cans"], [(5.0, "can"), (1.0, "lb")]),
+        (["2 loaves", "1 loaf"], [(3.0, "loaf")]),
+    ],
+)
+def test_entries_with_the_same_general_name_add_up(service, quantities, totals):
+    service.add_to_pantry([make_item("food", quantity) for quantity in quantities])
+
+    assert _totals(service, "food") == (totals, len(quantities), 0)
+
+
+def test_unparsed_quantities_are_counted_apart(service):
+    service.add_to_pantry([make_item("milk", "1 l"), make_item("milk", "some")])
+
+    assert _totals(service, "milk") == ([(1.0, "l")], 2, 1)
+
+
+def test_totals_follow_updates_and_removals(service):
+    service.add_to_pantry([make_item("flour", "1 kg"), make_item("eggs", "12"), make_item("eggs", "6")])
+    service.update_pantry_item("flour", quantity="500 g")
+    service.remove_from_pantry(["eggs"])
+
+    summaries = json.loads(service.get_pantry_summary())["items"]
+    assert [(summary["general_name"], summary["totals"]) for summary in summaries] == [
+        ("flour", [{"value": 500.0, "unit": "g"}]),
+    ]
@@ -1,19 +1,32 @@
+from functools import lru_cache
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
+
+from config import config
+from .checkpoint import SQLiteCheckpointSaver
 
 from .nodes import (
     tool_node,
+    atool_node,
     llm_node,
+    allm_node,
     should_continue
 )
+from .streaming import stream_agent
+from .threads import initial_state, thread_config, turn_input, aturn_input, get_history
 
 from .schemas import State
 
-def create_agent():
+def create_agent(checkpointer: BaseCheckpointSaver = None):
     agent = StateGraph(State)
 
-    # Add nodes
-    agent.add_node("llm_node", llm_node)
-    agent.add_node("tool_node", tool_node)
+    # Add nodes; invoke/stream run the sync implementation, ainvoke/astream the async one
+    agent.add_node("llm_node", RunnableLambda(llm_node, afunc=allm_node))
+    agent.add_node("tool_node", RunnableLambda(tool_node, afunc=atool_node))
 
     # Add Edges
     agent.add_edge(START, "llm_node")
@@ -24,5 +37,19 @@ def create_agent():
     )
     agent.add_edge("tool_node", "llm_node")
 
-    agent_compiled = agent.compile()
-    return agent_compiled
\ No newline at end of file
+    # Tool calls of one LLM turn run as parallel tasks, at most MAX_PARALLEL_TOOLS at a time
+    agent_compiled = agent.compile(checkpointer=checkpointer).with_config(max_concurrency=config.MAX_PARALLEL_TOOLS)
+    return agent_compiled
+
+
+def create_checkpointer(path: str = config.CHECKPOINT_PATH) -> SQLiteCheckpointSaver:
+    """A checkpoint saver for the agent's state in the SQLite file at ``path``"""
+    # The to-do items in the state are our own type, so checkpoints may load it
+    serde = JsonPlusSerializer(allowed_msgpack_modules=[("agent.schemas", "Item")])
+    return SQLiteCheckpointSaver(path, serde=serde)
+
+
+@lru_cache(maxsize=None)
+def get_agent() -> CompiledStateGraph:
+    """The agent, compiled once per process, saving each thread's state to CHECKPOINT_PATH"""
+    return create_agent(checkpointer=create_checkpointer())
@@ -0,0 +1,129 @@
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.messages import AIMessage, AnyMessage, ToolMessage
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Tokens of per-message framing in the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+# Characters of an elided tool output kept as its gist
+GIST_CHARS = 160
+
+
+def fit_context(
+    messages: List[AnyMessage], budget: int = config.CONTEXT_TOKEN_BUDGET
+) -> Tuple[List[AnyMessage], Dict[str, int]]:
+    """
+    Fits the message history into a token budget before it is sent to the LLM.
+
+    Under the budget, the history is sent unchanged. Over it, the outputs of earlier tool
+    calls, oldest first, are replaced by a one-line gist until the history fits. The
+    system prompt and user messages, the LLM's own messages, the tool results of the
+    latest turn and the latest to-do list are always kept verbatim. The state keeps the
+    full history; only what the LLM is sent is cut down.
+
+    Args:
+        messages: The full message history
+        budget: Most tokens to send
+
+    Returns:
+        The messages to send, and a report with the tokens of the full history
+        ("tokens_before"), of the messages sent ("tokens"), the difference
+        ("tokens_saved") and the number of tool outputs elided ("elided")
+    """
+    counts = [count_tokens(message) for message in messages]
+    total = sum(counts)
+    report = {"tokens_before": total, "tokens": total, "tokens_saved": 0, "elided": 0}
+    if total <= budget:
+        return messages, report
+
+    tool_names = {
+        tool_call["id"]: tool_call["name"]
+        for message in messages
+        if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+    }
+    keep_from = _latest_turn_start(messages)
+    latest_todo = max(
+        (
+            index for index, message in enumerate(messages)
+            if isinstance(message, ToolMessage) and tool_names.get(message.tool_call_id) == "write_todo"
+        ),
+        default=None,
+    )
+
+    fitted = list(messages)
+    for index, message in enumerate(messages[:keep_from]):
+        if total <= budget:
+            break
+        if not isinstance(message, ToolMessage) or index == latest_todo:
+            continue
+        name = tool_names.get(message.tool_call_id, "tool")
+        elided = message.model_copy(update={"content": _gist(message, name, counts[index])})
+        saved = counts[index] - count_tokens(elided)
+        if saved <= 0:
+            continue
+        fitted[index] = elided
+        total -= saved
+        report["elided"] += 1
+
+    report["tokens"] = total
+    report["tokens_saved"] = report["tokens_before"] - total
+    logger.info(
+        "Context: %d of %d tokens sent (%d saved, %d tool outputs elided, budget %d)",
+        total, report["tokens_before"], report["tokens_saved"], report["elided"], budget,
+    )
+    return fitted, report
+
+
+def count_tokens(message: AnyMessage) -> int:
+    """Approximate prompt tokens of one message, tool call arguments included"""
+    text = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += json.dumps([tool_call["args"] for tool_call in message.tool_calls])
+    return _count_text(text) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _count_text(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        # About four characters per token for English text
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    """The gpt-4o tokenizer, or None if tiktoken or its data is not available (e.g. offline)"""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        logger.warning("tiktoken's gpt-4o encoding is not available; estimating tokens from characters")
+        return None
+
+
+def _latest_turn_start(messages: List[AnyMessage]) -> int:
+    """Index of the LLM's latest tool-calling message; the tool results after it are still being worked on"""
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if isinstance(message, AIMessage) and message.tool_calls:
+            return index
+    return len(messages)
+
+
+def _gist(message: ToolMessage, tool_name: str, tokens: int) -> str:
+    """One line standing in for an elided tool output: search results keep their title and URL"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    cited = [line for line in lines if line.startswith(("Title:", "URL:"))]
+    gist = " ".join(cited) if cited else " ".join(lines)
+    if len(gist) > GIST_CHARS:
+        gist = gist[:GIST_CHARS].rstrip() + "..."
+    return f"[Earlier {tool_name} output elided to save context ({tokens} tokens). {gist}]"
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration
+
+# Message fields that differ between otherwise identical replies (and are set on cache
+# hits), left out of the key so a replayed conversation keeps hitting turn after turn
+VOLATILE_FIELDS = ("id", "usage_metadata", "response_metadata")
+
+
+class ResponseCache(BaseCache):
+    """
+    Persistent LLM response cache in an SQLite file, for a chat model's ``cache`` field.
+
+    Entries are keyed on a SHA-256 of the model's LLM string (model name, temperature
+    and the bound tool schemas) and the message history, so a replayed conversation
+    prefix is answered without calling the API. Once the file holds more
+    than ``max_entries`` responses, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000):
+        """
+        Args:
+            path: SQLite file to keep the responses in
+            max_entries: Most responses kept
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, generations TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        """Hash of the LLM string and the serialized messages, minus their VOLATILE_FIELDS"""
+        try:
+            messages = json.loads(prompt)
+        except ValueError:
+            # A plain text prompt
+            messages = prompt
+        if isinstance(messages, list):
+            for message in messages:
+                if isinstance(message, dict):
+                    for field in VOLATILE_FIELDS:
+                        message.get("kwargs", {}).pop(field, None)
+        history = json.dumps(messages, sort_keys=True)
+        return hashlib.sha256(f"{llm_string}\n{history}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.key(prompt, llm_string)
+        with self._lock:
+            row = self._db.execute("SELECT generations FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return [ChatGeneration(message=message) for message in messages_from_dict(json.loads(row[0]))]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not all(isinstance(generation, ChatGeneration) for generation in return_val):
+            return
+        generations = json.dumps(messages_to_dict([generation.message for generation in return_val]))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, generations, last_used) VALUES (?, ?, ?)",
+                (self.key(prompt, llm_string), generations, time.time()),
+            )
+            (size,) = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            if size > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                    (size - self.max_entries,),
+                )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
@@ -2,10 +2,21 @@ from langchain_openai import OpenAI
 from langchain.chat_models import init_chat_model
 
 from config import config
+from .llm_cache import ResponseCache
 
 
 
+# Opt-in: the model runs at temperature 0, so a replayed conversation can reuse earlier answers
+llm_cache = (
+    ResponseCache(config.LLM_CACHE_PATH, max_entries=config.LLM_CACHE_MAX_ENTRIES)
+    if config.LLM_CACHE_PATH
+    else None
+)
+
 llm = init_chat_model(
     "openai:gpt-4o",
-    temperature=0
+    temperature=0,
+    cache=llm_cache,
 )
+# Never answered from the cache
+uncached_llm = llm.model_copy(update={"cache": False})
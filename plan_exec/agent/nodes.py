@@ -1,58 +1,238 @@
-from typing import Literal, List
+import asyncio
+import math
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Literal, List, Optional, Union
 
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.config import get_stream_writer
 from langgraph.graph import END
-from langchain.messages import ToolMessage, AIMessage
+from langgraph.types import Send
+from langchain.messages import ToolMessage, AIMessage, ToolCall
 
-from .schemas import State, Todo, Item
-from .models import llm
+from config import config
+from .context import fit_context
+from .schemas import State, ToolTask, Todo, Item
+from .models import llm, uncached_llm
 from .tools import tools, tools_by_name
 from .prompt_templates import (
     format_tool_response_for_llm,
 )
 
 
-def llm_node(state: State):
+# Bound once rather than on every turn, as binding converts every tool schema
+llm_with_tools = llm.bind_tools(tools)
+uncached_llm_with_tools = uncached_llm.bind_tools(tools)
+
+
+def _bound_llm(config: Optional[RunnableConfig]):
+    """The tool-bound model, bypassing the response cache if the run sets ``bypass_llm_cache``"""
+    if ((config or {}).get("configurable") or {}).get("bypass_llm_cache"):
+        return uncached_llm_with_tools
+    return llm_with_tools
+
+
+def llm_node(state: State, config: Optional[RunnableConfig] = None):
     """Processes the current task with LLM"""
-    llm_with_tool = llm.bind_tools(tools)
+    llm_with_tool = _bound_llm(config)
 
-    messages = state["messages"]
+    messages, context_usage = fit_context(state["messages"])
 
     try:
         response = llm_with_tool.invoke(messages)
     except Exception as e:
-        response = AIMessage(content=f"Something went wrong: {e}")
+        response = AIMessage(content=f"Something went wrong: {e}", response_metadata={"error": type(e).__name__})
 
     return {
-        "messages": [response]
+        "messages": [response],
+        "context_usage": context_usage,
+    }
+
+
+async def allm_node(state: State, config: Optional[RunnableConfig] = None):
+    """Processes the current task with LLM, without blocking the event loop.
+
+    Under ``astream(stream_mode="messages")`` the model's tokens are streamed as they arrive.
+    """
+    llm_with_tool = _bound_llm(config)
+
+    messages, context_usage = fit_context(state["messages"])
+
+    try:
+        response = await llm_with_tool.ainvoke(messages)
+    except Exception as e:
+        response = AIMessage(content=f"Something went wrong: {e}", response_metadata={"error": type(e).__name__})
+
+    return {
+        "messages": [response],
+        "context_usage": context_usage,
     }
     
-def tool_node(state: State):
-    """Performs the tool call"""
-    todo = state["todo"]
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool_name, tool_args = tool_call["name"], tool_call["args"]
-        tool = tools_by_name[tool_name]
-        tool_response = tool.invoke(tool_args)
-        if tool_name == "write_todo":
-            todo = tool_response
-        formatted_tool_response = format_tool_response_for_llm(tool_response, tool_name)
-        result.append(
-            ToolMessage(content=formatted_tool_response, tool_call_id=tool_call["id"])
-        )
-
-    return {"messages": result, "todo": todo}
-
-
-def should_continue(state: State) -> Literal["tool_node", END]:
+def tool_node(task: ToolTask):
+    """Performs one tool call of the last message; should_continue starts a task per call"""
+    tool_call = task["tool_call"]
+    return _tool_node_update(tool_call, run_tool_calls([tool_call])[0])
+
+
+async def atool_node(task: ToolTask):
+    """Performs one tool call of the last message on the event loop.
+
+    Under ``astream(stream_mode="custom")`` a ``tool_start`` and a ``tool_end`` event is
+    written for the call as it starts and finishes.
+    """
+    tool_call = task["tool_call"]
+    return _tool_node_update(tool_call, (await arun_tool_calls([tool_call]))[0])
+
+
+def _tool_node_update(tool_call: ToolCall, result: tuple[Any, Optional[str]]):
+    """Turns a tool result into its ToolMessage, and the new to-do list for a write_todo call"""
+    tool_response, error = result
+    if error is not None:
+        return {"messages": [ToolMessage(content=f"Error: {error}", tool_call_id=tool_call["id"], status="error")]}
+
+    update = {
+        "messages": [
+            ToolMessage(content=format_tool_response(tool_response, tool_call["name"]), tool_call_id=tool_call["id"])
+        ]
+    }
+    if tool_call["name"] == "write_todo":
+        update["todo"] = tool_response
+    return update
+
+
+def run_tool_calls(
+    tool_calls: List[ToolCall],
+    max_parallel: int = config.MAX_PARALLEL_TOOLS,
+    timeout: float = config.TOOL_TIMEOUT_SECONDS,
+) -> List[tuple[Any, Optional[str]]]:
+    """
+    Invoke tool calls on a thread pool, at most ``max_parallel`` at a time.
+
+    Returns a (tool response, error) pair per call, in call order. A call that raises,
+    names an unknown tool or runs longer than ``timeout`` seconds gets an error
+    description instead, so one failed call does not fail the others. A call still
+    queued when the batch should have finished (``timeout`` seconds per round of
+    ``max_parallel`` calls) is dropped with an error, so calls that hang and keep
+    every worker busy cannot block the node forever.
+    """
+    if not tool_calls:
+        return []
+
+    workers = min(max_parallel, len(tool_calls))
+    deadline = time.monotonic() + timeout * math.ceil(len(tool_calls) / workers)
+
+    # When each call started running; calls queued behind others have not started their clock
+    started: List[Optional[float]] = [None] * len(tool_calls)
+
+    def run(index: int, tool_call: ToolCall):
+        started[index] = time.monotonic()
+        tool = tools_by_name.get(tool_call["name"])
+        if tool is None:
+            raise ValueError(f"Unknown tool {tool_call['name']!r}")
+        return tool.invoke(tool_call["args"])
+
+    # Copies the context into the worker threads, so tool runs are traced under this node
+    executor = ContextThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(run, index, tool_call) for index, tool_call in enumerate(tool_calls)]
+        return [
+            _tool_result(future, started, index, tool_call["name"], timeout, deadline)
+            for index, (future, tool_call) in enumerate(zip(futures, tool_calls))
+        ]
+    finally:
+        # A call that timed out cannot be interrupted; leave its thread to finish on its own
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_tool_calls(
+    tool_calls: List[ToolCall],
+    max_parallel: int = config.MAX_PARALLEL_TOOLS,
+    timeout: float = config.TOOL_TIMEOUT_SECONDS,
+) -> List[tuple[Any, Optional[str]]]:
+    """
+    Async counterpart of ``run_tool_calls``: awaits the tools' ``ainvoke``, at most
+    ``max_parallel`` at a time, and cancels a call that runs longer than ``timeout`` seconds.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    write = _stream_writer()
+
+    async def run(tool_call: ToolCall) -> tuple[Any, Optional[str]]:
+        async with semaphore:
+            write({"type": "tool_start", "id": tool_call["id"], "name": tool_call["name"], "args": tool_call["args"]})
+            try:
+                tool = tools_by_name.get(tool_call["name"])
+                if tool is None:
+                    raise ValueError(f"Unknown tool {tool_call['name']!r}")
+                outcome = await asyncio.wait_for(tool.ainvoke(tool_call["args"]), timeout), None
+            except asyncio.TimeoutError:
+                outcome = None, f"{tool_call['name']} timed out after {timeout:g}s"
+            except Exception as e:
+                outcome = None, f"{tool_call['name']} failed: {e}"
+            write({"type": "tool_end", "id": tool_call["id"], "name": tool_call["name"], "error": outcome[1]})
+            return outcome
+
+    return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
+
+
+def _stream_writer():
+    """The graph's custom stream writer, or a no-op outside a graph run"""
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return lambda chunk: None
+
+
+def _tool_result(
+    future: Future, started: List[Optional[float]], index: int, tool_name: str, timeout: float, deadline: float
+) -> tuple[Any, Optional[str]]:
+    """
+    Wait for one tool call, at most ``timeout`` seconds after it started running. A call
+    still queued at ``deadline`` is cancelled instead.
+    """
+    start = None
+    while True:
+        start = start or started[index]
+        if start is None:
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                if future.cancel():
+                    return None, f"{tool_name} was not run: the other calls kept every worker busy"
+                # A worker has just picked it up
+                start = started[index] or time.monotonic()
+                continue
+        else:
+            wait = start + timeout - time.monotonic()
+        try:
+            return future.result(timeout=max(wait, 0)), None
+        except FutureTimeoutError:
+            if start is not None:
+                return None, f"{tool_name} timed out after {timeout:g}s"
+        except Exception as e:
+            return None, f"{tool_name} failed: {e}"
+
+
+def format_tool_response(tool_response, tool_name: str) -> str:
+    """Formats a tool response for the LLM, falling back to the raw response if it has an unexpected shape"""
+    try:
+        formatted = format_tool_response_for_llm(tool_response, tool_name)
+    except (LookupError, TypeError, AttributeError):
+        # E.g. a search that found nothing, or an error string from the search API
+        formatted = None
+    return str(tool_response) if formatted is None else formatted
+
+
+def should_continue(state: State) -> Union[List[Send], Literal[END]]:
     """Pure routing function - decides next step based on LLM output and todo list"""
     messages = state["messages"]
     last_message = messages[-1]
 
-    # If the LLM makes a tool call, execute it
+    # If the LLM makes tool calls, run each as its own task. The checkpointer saves a task's
+    # result as soon as it finishes, so a run resumed after a crash only redoes unfinished calls.
+    # Tasks write their results in call order, so the messages line up with the tool call ids
+    # and the last successful write_todo wins, as when the calls ran one by one.
     if last_message.tool_calls:
-        return "tool_node"
+        return [Send("tool_node", {"tool_call": tool_call}) for tool_call in last_message.tool_calls]
 
     # Otherwise, we're done
     return END
-
@@ -1,8 +1,8 @@
 from operator import add
 from typing_extensions import TypedDict
-from typing import Annotated, List, Literal
+from typing import Annotated, Dict, List, Literal
 
-from langchain.messages import AnyMessage
+from langchain.messages import AnyMessage, ToolCall
 from pydantic import BaseModel, Field
 
 class Item(BaseModel):
@@ -15,8 +15,19 @@ class Item(BaseModel):
 class Todo(BaseModel):
     todo: List[Item] = Field(description="The to-do list, that is, a list of items to be completed.")
 
+def latest(_, new):
+    """Reducer keeping the newest value; of several writes in one step, the last task's wins"""
+    return new
+
 class State(TypedDict):
     final_output: str
-    todo: List[Item]
+    # Tool calls run as separate tasks, so more than one may write the list in a step
+    todo: Annotated[List[Item], latest]
     messages: Annotated[List[AnyMessage], add]
+    # Tokens sent to the LLM on its latest turn, and how many context management saved
+    context_usage: Dict[str, int]
     
+
+class ToolTask(TypedDict):
+    # One tool call of the LLM's last message, run as its own tool_node task
+    tool_call: ToolCall
@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+CacheEntry = Tuple[float, Any]  # (expires at, search results)
+# Result of a flight whose leader was cancelled; its waiters look the key up again
+_ABANDONED = object()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query, so near-identical queries share a cache entry:
+    Unicode-normalized, case-folded, whitespace collapsed, surrounding punctuation dropped.
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"\s+", " ", query)
+    return query.strip(" \t\n\"'.,;:!?")
+
+
+class SearchCache:
+    """
+    Cache of search results: an in-memory LRU with a time to live, optionally backed by
+    an SQLite file so results survive restarts and are shared between processes.
+
+    Concurrent lookups of the same query are coalesced: one caller runs the search and
+    the others wait for its result. If that caller is cancelled, one of the waiters
+    runs the search instead. Only list results are cached; the search tool reports
+    failures as a string, and those are retried on the next call.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600.0, path: Optional[str] = None):
+        """
+        Args:
+            max_size: Most results kept in memory; the least recently used are evicted first
+            ttl: Seconds a result stays valid
+            path: SQLite file for the on-disk tier; None keeps results in memory only
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, results TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+
+    def get_or_search(self, key: str, search: Callable[[], Any]) -> Any:
+        """The cached results for ``key``, running ``search()`` on a miss"""
+        while True:
+            role, found = self._claim(key)
+            if role == "hit":
+                return found
+            if role == "lead":
+                return self._lead(key, found, search)
+            value = found.result()
+            if value is not _ABANDONED:
+                return value
+
+    async def aget_or_search(self, key: str, search: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of ``get_or_search``; waiting callers do not block the event loop"""
+        while True:
+            role, found = self._claim(key)
+            if role == "hit":
+                return found
+            if role == "lead":
+                break
+            # Shielded, so a waiter that is cancelled doesn't cancel the flight for the others
+            value = await asyncio.shield(asyncio.wrap_future(found))
+            if value is not _ABANDONED:
+                return value
+
+        flight = found
+        try:
+            loaded, value = await asyncio.to_thread(self._load, key) if self._db is not None else (False, None)
+            if not loaded:
+                self._count_miss()
+                value = await search()
+        except Exception as e:
+            self._land(key, flight, exception=e)
+            raise
+        except BaseException:
+            # Cancelled: the waiters are not, so one of them takes over the search
+            self._abandon(key, flight)
+            raise
+        self._land(key, flight, value, store=not loaded)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; ``hit_rate`` counts memory and disk hits and coalesced lookups"""
+        lookups = self.hits + self.disk_hits + self.coalesced + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": (lookups - self.misses) / lookups if lookups else None,
+        }
+
+    def clear(self) -> None:
+        """Drop every cached result, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM search_cache")
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def _claim(self, key: str) -> Tuple[str, Any]:
+        """
+        Returns ("hit", results) on a memory hit, ("wait", flight) when another caller is
+        already looking ``key`` up, and ("lead", flight) when this caller should, with
+        ``flight`` the future the other callers will wait on.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return "hit", entry[1]
+                del self._entries[key]
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return "wait", flight
+            flight = self._in_flight[key] = Future()
+            return "lead", flight
+
+    def _lead(self, key: str, flight: Future, search: Callable[[], Any]) -> Any:
+        """Look ``key`` up on disk, then with ``search()``, and hand the results to the waiting callers"""
+        try:
+            loaded, value = self._load(key)
+            if not loaded:
+                self._count_miss()
+                value = search()
+        except Exception as e:
+            self._land(key, flight, exception=e)
+            raise
+        except BaseException:
+            # Interrupted (e.g. KeyboardInterrupt), which is not the waiters' failure
+            self._abandon(key, flight)
+            raise
+        self._land(key, flight, value, store=not loaded)
+        return value
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _load(self, key: str) -> Tuple[bool, Any]:
+        """Look ``key`` up in the on-disk tier"""
+        if self._db is None:
+            return False, None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, results FROM search_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return False, None
+        value = json.loads(row[1])
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, (row[0], value))
+        return True, value
+
+    def _land(
+        self, key: str, flight: Future, value: Any = None, store: bool = False, exception: Optional[BaseException] = None
+    ) -> None:
+        """Finish a flight: cache fresh results and hand them (or the failure) to the waiting callers"""
+        if exception is None and store and isinstance(value, list):
+            entry = (time.time() + self.ttl, value)
+            with self._lock:
+                self._remember(key, entry)
+            if self._db is not None:
+                with self._db_lock:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO search_cache (key, expires_at, results) VALUES (?, ?, ?)",
+                        (key, entry[0], json.dumps(value)),
+                    )
+        with self._lock:
+            del self._in_flight[key]
+        if exception is not None:
+            flight.set_exception(exception)
+        else:
+            flight.set_result(value)
+
+    def _abandon(self, key: str, flight: Future) -> None:
+        """Finish a flight whose leader stopped without a result, so a waiting caller takes over"""
+        with self._lock:
+            del self._in_flight[key]
+        flight.set_result(_ABANDONED)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Add to the in-memory LRU; call with the lock held"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Search tool that answers from a SearchCache, calling the wrapped search tool on a miss.
+
+    It keeps the wrapped tool's name, description and arguments, so the LLM sees no difference.
+    """
+
+    backend: BaseTool
+    cache: SearchCache
+
+    def __init__(self, backend: BaseTool, cache: SearchCache, **kwargs: Any):
+        super().__init__(
+            name=backend.name,
+            description=backend.description,
+            args_schema=backend.args_schema,
+            backend=backend,
+            cache=cache,
+            **kwargs,
+        )
+
+    def cache_key(self, query: str) -> str:
+        # Different backends or result counts must not share entries
+        namespace = f"{type(self.backend).__name__}:{getattr(self.backend, 'max_results', '')}"
+        return f"{namespace}:{normalize_query(query)}"
+
+    def _run(self, query: str, run_manager=None) -> Any:
+        return self.cache.get_or_search(self.cache_key(query), lambda: self.backend.invoke({"query": query}))
+
+    async def _arun(self, query: str, run_manager=None) -> Any:
+        return await self.cache.aget_or_search(self.cache_key(query), lambda: self.backend.ainvoke({"query": query}))
+
+
+class StubSearchInput(BaseModel):
+    query: str = Field(description="search query to look up")
+
+
+class StubSearchTool(BaseTool):
+    """
+    Offline stand-in for TavilySearchResults, for tests and benchmarks: returns made-up
+    results, the same for the same query, in the same shape as Tavily's.
+    """
+
+    name: str = "tavily_search_results_json"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "Input should be a search query."
+    )
+    args_schema: Type[BaseModel] = StubSearchInput
+    max_results: int = 3
+    # Seconds each search takes, to stand in for the network round trip
+    latency: float = 0.0
+    # Characters of content per result
+    content_size: int = 200
+    # Number of searches run, cached or not
+    calls: int = 0
+
+    def _run(self, query: str, run_manager=None) -> List[Dict[str, Any]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._results(query)
+
+    async def _arun(self, query: str, run_manager=None) -> List[Dict[str, Any]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._results(query)
+
+    def _results(self, query: str) -> List[Dict[str, Any]]:
+        self.calls += 1
+        seed = hashlib.sha256(query.encode()).hexdigest()
+        rng = random.Random(seed)
+        words = re.findall(r"\w+", query) or ["result"]
+        results = []
+        for rank in range(self.max_results):
+            filler = " ".join(rng.choice(words) for _ in range(self.content_size // 4 + 1))
+            results.append({
+                "title": f"{query} ({rank + 1})",
+                "url": f"https://example.com/{seed[:12]}/{rank + 1}",
+                "content": filler[: self.content_size],
+                "score": round(1.0 - rank / (self.max_results + 1), 3),
+            })
+        return results
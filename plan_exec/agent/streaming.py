@@ -0,0 +1,63 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain.messages import AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+
+async def stream_agent(
+    agent: CompiledStateGraph, state: Optional[Dict[str, Any]], config: Optional[RunnableConfig] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the agent with ``astream`` and yield what happens as it happens.
+
+    Args:
+        agent: The compiled agent graph, from create_agent()
+        state: The input: the initial state (todo and messages), the new messages on a
+            thread with a checkpoint, or None to resume the thread's interrupted run
+        config: Optional run config, e.g. callbacks or a thread id
+
+    Yields:
+        Event dictionaries, each with a "type":
+        - "token": a piece of the LLM's reply ("content")
+        - "tool_start" / "tool_end": a tool call ("id", "name", and "args" or "error")
+        - "todo": the to-do list after a write_todo call ("todo", a list of item dicts)
+        - "context": earlier tool outputs were elided to fit the token budget (see fit_context)
+        - "final": the LLM's last message, once the agent is done ("content")
+    """
+    if state and "todo" in state:
+        todo = state["todo"]
+    elif agent.checkpointer and config:
+        todo = (await agent.aget_state(config)).values.get("todo", [])
+    else:
+        todo = []
+    async for mode, chunk in agent.astream(state, config, stream_mode=["messages", "custom", "updates"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if (
+                metadata.get("langgraph_node") == "llm_node"
+                and isinstance(message, AIMessageChunk)
+                and isinstance(message.content, str)
+                and message.content
+            ):
+                yield {"type": "token", "content": message.content}
+        elif mode == "custom":
+            yield chunk
+        else:
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                if node == "tool_node" and "todo" in update and update["todo"] != todo:
+                    todo = update["todo"]
+                    yield {"type": "todo", "todo": [_dump(item) for item in todo]}
+                elif node == "llm_node":
+                    usage = update.get("context_usage")
+                    if usage and usage["tokens_saved"]:
+                        yield {"type": "context", **usage}
+                    message = update["messages"][-1]
+                    if not message.tool_calls:
+                        yield {"type": "final", "content": message.content}
+
+
+def _dump(item: Any) -> Dict[str, Any]:
+    return item.model_dump() if hasattr(item, "model_dump") else dict(item)
@@ -0,0 +1,47 @@
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain.messages import AnyMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from .prompt_templates import AGENT_SYSTEM_PROMPT
+
+
+def initial_state(user_message: str) -> Dict[str, Any]:
+    """The state a new thread starts from"""
+    return {
+        "todo": [],  # List[Item]
+        "messages": [
+            SystemMessage(content=AGENT_SYSTEM_PROMPT),
+            HumanMessage(content=user_message)
+        ]  # List[AnyMessage]
+    }
+
+
+def thread_config(thread_id: Optional[str] = None) -> RunnableConfig:
+    """Run config for a conversation thread; a new thread id if none is given"""
+    return {"configurable": {"thread_id": thread_id or str(uuid.uuid4())}}
+
+
+def turn_input(agent: CompiledStateGraph, config: RunnableConfig, user_message: str) -> Dict[str, Any]:
+    """
+    Graph input for a user message on a thread: the whole initial state on a new thread,
+    only the new message on one with a checkpoint, whose state (system prompt, earlier
+    messages, to-do list) the run continues from.
+    """
+    if agent.get_state(config).values:
+        return {"messages": [HumanMessage(content=user_message)]}
+    return initial_state(user_message)
+
+
+async def aturn_input(agent: CompiledStateGraph, config: RunnableConfig, user_message: str) -> Dict[str, Any]:
+    """Async counterpart of ``turn_input``"""
+    if (await agent.aget_state(config)).values:
+        return {"messages": [HumanMessage(content=user_message)]}
+    return initial_state(user_message)
+
+
+def get_history(agent: CompiledStateGraph, thread_id: str) -> List[AnyMessage]:
+    """A thread's messages, loaded from its latest checkpoint without running anything"""
+    return agent.get_state(thread_config(thread_id)).values.get("messages", [])
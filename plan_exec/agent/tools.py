@@ -3,7 +3,9 @@ from typing import Literal, List
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain.tools import tool
 
+from config import config
 from .schemas import Item
+from .search import CachedSearchTool, SearchCache, StubSearchTool
 
 TODO_TOOL_DESCRIPTION = """Use this tool to create and manage a structured task list for your current work session. This helps you track progress, organize complex tasks, and demonstrate thoroughness to the user.
 
@@ -75,5 +77,12 @@ def write_todo(todo: List[Item]):
     """
     return todo
 
-tools = [TavilySearchResults(max_results=3), write_todo]
+search_cache = SearchCache(
+    max_size=config.SEARCH_CACHE_SIZE,
+    ttl=config.SEARCH_CACHE_TTL_SECONDS,
+    path=config.SEARCH_CACHE_PATH,
+)
+search_backend = StubSearchTool(max_results=3) if config.SEARCH_BACKEND == "stub" else TavilySearchResults(max_results=3)
+
+tools = [CachedSearchTool(search_backend, search_cache), write_todo]
 tools_by_name = {tool.name: tool for tool in tools}
\ No newline at end of file
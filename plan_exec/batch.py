@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from langchain.messages import AIMessage, ToolMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langgraph.graph.state import CompiledStateGraph
+from openinference.instrumentation.langchain import LangChainInstrumentor
+from phoenix.otel import register
+
+from agent import create_agent, initial_state
+from config import config
+from stats import percentile
+
+tracer_provider = register(project_name="plan_exec")
+LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
+
+logger = logging.getLogger(__name__)
+
+
+def read_prompts(path: str) -> List[Dict[str, str]]:
+    """
+    Reads the prompts of a JSONL file.
+
+    Each line is either a string or an object with a "prompt" (or "user_message" or
+    "question") and an optional "id"; the id defaults to the line number.
+
+    Returns:
+        Dictionaries with the prompt's "id" and "prompt"
+    """
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"prompt": item}
+            prompt = item.get("prompt") or item.get("user_message") or item.get("question")
+            if not prompt:
+                raise ValueError(f"{path}:{number}: no prompt")
+            prompts.append({"id": str(item.get("id", number)), "prompt": prompt})
+    return prompts
+
+
+def read_finished(path: str) -> Set[str]:
+    """Ids of the prompts answered in an earlier run; failed prompts and a line cut short by a crash don't count"""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("error") is None:
+                finished.add(record["id"])
+    return finished
+
+
+async def run_prompt(agent: CompiledStateGraph, item: Dict[str, str]) -> Dict[str, Any]:
+    """Runs one prompt from a fresh state and returns its result record"""
+    started = time.monotonic()
+    record: Dict[str, Any] = {"id": item["id"], "prompt": item["prompt"], "answer": None, "error": None}
+    messages = []
+    try:
+        state = await agent.ainvoke(initial_state(item["prompt"]), {"metadata": {"prompt_id": item["id"]}})
+        messages = state["messages"]
+        record["answer"] = messages[-1].text
+        # The LLM node replies with the error rather than raising
+        record["error"] = messages[-1].response_metadata.get("error")
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["latency"] = round(time.monotonic() - started, 3)
+    record.update(_usage(messages))
+    return record
+
+
+def _usage(messages: List[Any]) -> Dict[str, Any]:
+    """Token usage and tool calls of a run"""
+    tokens = Counter()
+    tool_calls = Counter()
+    llm_calls = 0
+    tool_errors = 0
+    for message in messages:
+        if isinstance(message, AIMessage):
+            llm_calls += 1
+            for key in ("input_tokens", "output_tokens", "total_tokens"):
+                tokens[key] += (message.usage_metadata or {}).get(key, 0)
+            tool_calls.update(tool_call["name"] for tool_call in message.tool_calls)
+        elif isinstance(message, ToolMessage) and message.status == "error":
+            tool_errors += 1
+    return {
+        "llm_calls": llm_calls,
+        "tokens": {key: tokens[key] for key in ("input_tokens", "output_tokens", "total_tokens")},
+        "tool_calls": dict(tool_calls),
+        "tool_errors": tool_errors,
+    }
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = config.BATCH_CONCURRENCY,
+    rate_limit: float = config.BATCH_RATE_LIMIT,
+    agent: Optional[CompiledStateGraph] = None,
+) -> Dict[str, Any]:
+    """
+    Runs every prompt of a JSONL file through the agent and appends a result record per
+    prompt to ``output_path`` as soon as it is done, so the results can be followed while
+    the batch runs.
+
+    Prompts already answered in ``output_path`` are skipped, so after a crash or Ctrl-C
+    the same command picks up where it stopped; failed prompts are run again.
+
+    Args:
+        input_path: JSONL file of prompts (see read_prompts)
+        output_path: JSONL file the result records are appended to
+        concurrency: Prompts run at the same time
+        rate_limit: Most prompts started per second; 0 for no limit
+        agent: The compiled agent; by default one without a checkpointer, so the
+            batch's runs don't show up as conversation threads
+
+    Returns:
+        The report of this run (see report())
+    """
+    agent = agent or create_agent()
+    prompts = read_prompts(input_path)
+    finished = read_finished(output_path)
+    pending: "asyncio.Queue[Dict[str, str]]" = asyncio.Queue()
+    for item in prompts:
+        if item["id"] not in finished:
+            pending.put_nowait(item)
+    total = pending.qsize()
+    logger.info("%d prompts, %d already answered, %d to run", len(prompts), len(prompts) - total, total)
+
+    limiter = InMemoryRateLimiter(requests_per_second=rate_limit, check_every_n_seconds=0.05) if rate_limit else None
+    records = []
+    started = time.monotonic()
+    _end_last_line(output_path)
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def worker() -> None:
+            while not pending.empty():
+                item = pending.get_nowait()
+                if limiter is not None:
+                    await limiter.aacquire()
+                record = await run_prompt(agent, item)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                records.append(record)
+                logger.info(
+                    "[%d/%d] %s %s in %.1fs",
+                    len(records), total, item["id"],
+                    "failed" if record["error"] else "done", record["latency"],
+                )
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return report(records, time.monotonic() - started, skipped=len(prompts) - total)
+
+
+def _end_last_line(path: str) -> None:
+    """Ends a last line cut short by a crash, so it doesn't swallow the first new record"""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def report(records: List[Dict[str, Any]], elapsed: float, skipped: int = 0) -> Dict[str, Any]:
+    """Throughput, latency percentiles (seconds), token usage and tool calls of a batch's records"""
+    latencies = sorted(record["latency"] for record in records)
+    tokens = Counter()
+    tool_calls = Counter()
+    for record in records:
+        tokens.update(record["tokens"])
+        tool_calls.update(record["tool_calls"])
+    return {
+        "prompts": len(records),
+        "failed": sum(1 for record in records if record["error"]),
+        "skipped": skipped,
+        "elapsed": round(elapsed, 3),
+        "prompts_per_second": round(len(records) / elapsed, 3) if elapsed else None,
+        "latency": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "max": latencies[-1] if latencies else None,
+        },
+        "llm_calls": sum(record["llm_calls"] for record in records),
+        "tokens": dict(tokens),
+        "tool_calls": dict(tool_calls),
+        "tool_errors": sum(record["tool_errors"] for record in records),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through the agent")
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("output", help="JSONL file the results are appended to; rerun to resume")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY, help="prompts run at the same time")
+    parser.add_argument("--rate-limit", type=float, default=config.BATCH_RATE_LIMIT, help="most prompts started per second (0: no limit)")
+    parser.add_argument("--report", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    summary = asyncio.run(run_batch(args.input, args.output, args.concurrency, args.rate_limit))
+    print(json.dumps(summary, indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
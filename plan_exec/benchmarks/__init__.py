@@ -0,0 +1,8 @@
+"""Offline benchmarks of the agent graph, with scripted stand-ins for the chat model and search."""
+
+import os
+
+# The settings require API keys, though the benchmarks never call the APIs
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("TAVILY_API_KEY", "offline")
+os.environ.setdefault("SEARCH_BACKEND", "stub")
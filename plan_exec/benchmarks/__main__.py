@@ -0,0 +1,94 @@
+"""
+Command line entry point, run from the plan_exec directory:
+
+    python -m benchmarks run --steps 3 --fan-out 3 --output results.json
+    python -m benchmarks run --llm-latency 0.5 --search-latency 0.3 --concurrency 16 --checkpoint
+    python -m benchmarks compare baseline.json results.json --threshold 1.2
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from .report import find_regressions, format_table
+from .runner import run_benchmarks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the agent graph offline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and emit JSON results")
+    run.add_argument("--mode", choices=["async", "sync"], default="async", help="Run the graph with astream or stream/invoke")
+    run.add_argument("--steps", type=int, default=3, help="Tool-calling turns per run")
+    run.add_argument("--fan-out", type=int, default=3, help="Searches per tool-calling turn")
+    run.add_argument("--todo-items", type=int, default=3, help="Items of the to-do list written each turn (0: none)")
+    run.add_argument("--answer-size", type=int, default=400, help="Characters of the final answer")
+    run.add_argument("--results", type=int, default=3, help="Results per search")
+    run.add_argument("--result-size", type=int, default=200, help="Characters of content per search result")
+    run.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per LLM call in the throughput benchmark")
+    run.add_argument("--search-latency", type=float, default=0.0, help="Seconds per search in the throughput benchmark")
+    run.add_argument("--runs", type=int, default=50, help="Runs per benchmark")
+    run.add_argument("--concurrency", type=int, default=8, help="Runs at the same time in the throughput benchmark")
+    run.add_argument("--long-steps", type=int, default=50, help="Tool-calling turns of the history growth run")
+    run.add_argument("--checkpoint", action="store_true", help="Checkpoint every step to SQLite, as the server does")
+    run.add_argument("--workdir", help="Directory for the temporary checkpoint file")
+    run.add_argument("--output", help="Write JSON results here instead of stdout")
+
+    compare = commands.add_parser("compare", help="Report regressions between two result files")
+    compare.add_argument("baseline", help="Earlier results JSON")
+    compare.add_argument("current", help="Newer results JSON")
+    compare.add_argument("--threshold", type=float, default=1.2, help="Ratio above which a metric counts as a regression")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        with open(args.current) as f:
+            current = json.load(f)["results"]
+        regressions = find_regressions(baseline, current, args.threshold)
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regression(s) above {args.threshold}x", file=sys.stderr)
+        return 1 if regressions else 0
+
+    params = {
+        "mode": args.mode,
+        "steps": args.steps,
+        "fan_out": args.fan_out,
+        "todo_items": args.todo_items,
+        "answer_size": args.answer_size,
+        "results_per_search": args.results,
+        "result_size": args.result_size,
+        "llm_latency": args.llm_latency,
+        "search_latency": args.search_latency,
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "long_steps": args.long_steps,
+        "checkpoint": args.checkpoint,
+    }
+    results = run_benchmarks(**params, workdir=args.workdir, progress=lambda message: print(message, file=sys.stderr))
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **params,
+        },
+        "results": results,
+    }
+
+    print(format_table(results), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
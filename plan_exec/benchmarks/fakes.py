@@ -0,0 +1,127 @@
+"""A scripted chat model that drives the agent through a fixed plan without calling an API."""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Iterator, List
+
+from langchain.messages import AIMessage, AIMessageChunk, AnyMessage, HumanMessage
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Offline stand-in for the agent's chat model. For every question it makes ``steps``
+    tool-calling turns, each with ``fan_out`` searches (and a write_todo call if
+    ``todo_items`` is set), then answers with ``answer_size`` characters, streamed in
+    chunks when the graph streams tokens. Every search query is unique, so none is
+    answered from the search cache.
+    """
+
+    # Tool-calling turns before the answer
+    steps: int = 3
+    # Searches per tool-calling turn
+    fan_out: int = 3
+    # Items on the to-do list written on each tool-calling turn; 0 for no write_todo calls
+    todo_items: int = 3
+    # Seconds each call takes, to stand in for the API round trip
+    latency: float = 0.0
+    # Characters of the answer, and per streamed chunk
+    answer_size: int = 400
+    chunk_size: int = 16
+    # Number of calls made
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages: List[AnyMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages: List[AnyMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(self, messages: List[AnyMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self._chunks(self._reply(messages)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self, messages: List[AnyMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._reply(messages)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _reply(self, messages: List[AnyMessage]) -> AIMessage:
+        """The next message of the script, from the turns taken since the latest question"""
+        self.calls += 1
+        asked = max(index for index, message in enumerate(messages) if isinstance(message, HumanMessage))
+        question = messages[asked].text
+        turn = sum(1 for message in messages[asked:] if isinstance(message, AIMessage))
+        if turn >= self.steps:
+            return AIMessage(content=_filler(f"Answer to {question}: ", self.answer_size))
+
+        # Ids only need to be unique within the history
+        prefix = f"call_{len(messages)}"
+        tool_calls = [
+            {
+                "name": "tavily_search_results_json",
+                "args": {"query": f"{question} (step {turn + 1}, search {index + 1})"},
+                "id": f"{prefix}_{index}",
+                "type": "tool_call",
+            }
+            for index in range(self.fan_out)
+        ]
+        if self.todo_items:
+            todo = [
+                {"content": f"Step {index + 1}", "status": _status(index, turn * self.todo_items // self.steps)}
+                for index in range(self.todo_items)
+            ]
+            tool_calls.append({"name": "write_todo", "args": {"todo": todo}, "id": f"{prefix}_todo", "type": "tool_call"})
+        return AIMessage(content="", tool_calls=tool_calls)
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                        for index, call in enumerate(message.tool_calls)
+                    ],
+                )
+            )
+            return
+        text = message.text
+        for start in range(0, len(text), self.chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[start : start + self.chunk_size]))
+
+
+def _status(index: int, current: int) -> str:
+    if index < current:
+        return "done"
+    return "in_progress" if index == current else "todo"
+
+
+def _filler(prefix: str, size: int) -> str:
+    words = "the agent found several sources that agree on this point".split()
+    text = prefix
+    while len(text) < size:
+        text += words[len(text) % len(words)] + " "
+    return text[:size]
@@ -0,0 +1,71 @@
+"""Human-readable summary and regression checks for benchmark results."""
+
+from typing import Any, Dict, List
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    """Render the step overhead as one row per node, then a line per other benchmark"""
+    header = f"{'step':<12} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'mean ms':>10}"
+    lines = [header, "-" * len(header)]
+    overhead = results["overhead"]
+    for node, stats in [*overhead["nodes"].items(), ("whole run", overhead["run"])]:
+        lines.append(
+            f"{node:<12} {stats['count']:>7} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+            f"{stats['p99_ms']:>10.3f} {stats['mean_ms']:>10.3f}"
+        )
+
+    scaling = results["scaling"]
+    slopes = ", ".join(
+        f"{node} {stats['us_per_message']:+.2f} us/message"
+        for node, stats in scaling["nodes"].items()
+        if "us_per_message" in stats
+    )
+    lines.append(f"history of {scaling['messages']} messages ({scaling['state_bytes'] / 2**10:.1f} KiB): {slopes}")
+
+    memory = results["memory"]
+    lines.append(
+        f"memory: peak {memory['peak_bytes'] / 2**20:.2f} MiB, {memory['retained_bytes'] / 2**10:.1f} KiB retained "
+        f"after {memory['runs']} runs ({memory['growth_per_run_bytes']:.0f} bytes/run)"
+    )
+
+    throughput = results["throughput"]
+    lines.append(
+        f"throughput: {throughput['runs_per_sec']:.1f} runs/s, {throughput['llm_calls_per_sec']:.1f} LLM calls/s "
+        f"with {throughput['concurrency']} at a time; p50 {throughput['p50_ms']:.1f} ms, "
+        f"p95 {throughput['p95_ms']:.1f} ms (ideal {throughput['ideal_ms']:.1f} ms)"
+    )
+    return "\n".join(lines)
+
+
+def find_regressions(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.2) -> List[str]:
+    """
+    Compare two result sets and describe every metric that got worse by more than ``threshold``x.
+
+    Compared are the p95 step and run times, the per-message cost of a growing history,
+    the peak and retained memory per run, and the throughput.
+    """
+    regressions = []
+
+    def check(label: str, old: float, new: float, higher_is_better: bool = False) -> None:
+        if old <= 0 or new <= 0:
+            return
+        if (old / new if higher_is_better else new / old) > threshold:
+            regressions.append(f"{label}: {old:.3f} -> {new:.3f}")
+
+    old_overhead, overhead = baseline["overhead"], current["overhead"]
+    for node, stats in overhead["nodes"].items():
+        if node in old_overhead["nodes"]:
+            check(f"{node} step p95_ms", old_overhead["nodes"][node]["p95_ms"], stats["p95_ms"])
+    check("run p95_ms", old_overhead["run"]["p95_ms"], overhead["run"]["p95_ms"])
+
+    for node, stats in current["scaling"]["nodes"].items():
+        old_stats = baseline["scaling"]["nodes"].get(node, {})
+        if "us_per_message" in stats and "us_per_message" in old_stats:
+            check(f"{node} us_per_message", old_stats["us_per_message"], stats["us_per_message"])
+
+    for metric in ("peak_bytes", "growth_per_run_bytes"):
+        check(f"memory {metric}", baseline["memory"][metric], current["memory"][metric])
+
+    check("throughput p95_ms", baseline["throughput"]["p95_ms"], current["throughput"]["p95_ms"])
+    check("throughput runs_per_sec", baseline["throughput"]["runs_per_sec"], current["throughput"]["runs_per_sec"], True)
+    return regressions
@@ -0,0 +1,275 @@
+"""Run the real agent graph against the scripted model and the stub search, and time it."""
+
+import asyncio
+import gc
+import math
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langchain.messages import AnyMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph.state import CompiledStateGraph
+
+import agent.nodes as nodes
+from agent import create_agent, create_checkpointer, initial_state, stream_agent, thread_config
+from agent.search import CachedSearchTool, SearchCache, StubSearchTool
+from config import config
+from stats import percentile
+
+from .fakes import ScriptedChatModel
+
+PERCENTILES = (50, 95, 99)
+# Points of the step time / history length curve kept in the results
+SCALING_SAMPLES = 20
+
+Step = Tuple[str, int, float]  # (node, messages in the state before the step, seconds)
+
+
+def run_benchmarks(
+    mode: str = "async",
+    steps: int = 3,
+    fan_out: int = 3,
+    todo_items: int = 3,
+    answer_size: int = 400,
+    results_per_search: int = 3,
+    result_size: int = 200,
+    llm_latency: float = 0.0,
+    search_latency: float = 0.0,
+    runs: int = 50,
+    concurrency: int = 8,
+    long_steps: int = 50,
+    checkpoint: bool = False,
+    workdir: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmark the agent graph offline.
+
+    The overhead, scaling and memory benchmarks run without simulated latency, so they
+    time the graph and the nodes themselves; the throughput benchmark adds
+    ``llm_latency`` and ``search_latency``.
+
+    Args:
+        mode: "async" runs the graph with astream, as the server does; "sync" with stream/invoke
+        steps: Tool-calling turns per run before the answer
+        fan_out: Searches per tool-calling turn
+        todo_items: Items of the to-do list written each turn; 0 for no write_todo calls
+        answer_size: Characters of the final answer
+        results_per_search: Results per search
+        result_size: Characters of content per search result
+        llm_latency: Seconds per LLM call in the throughput benchmark
+        search_latency: Seconds per search in the throughput benchmark
+        runs: Runs per benchmark
+        concurrency: Runs at the same time in the throughput benchmark
+        long_steps: Tool-calling turns of the run whose growing history is measured
+        checkpoint: Save every step with the SQLite checkpointer, as get_agent() does
+        workdir: Directory for the checkpoint file (a temporary directory by default)
+        progress: Called with a short message as each benchmark starts
+
+    Returns:
+        The results of the "overhead", "scaling", "memory" and "throughput" benchmarks
+    """
+    progress = progress or (lambda message: None)
+    script = {"steps": steps, "fan_out": fan_out, "todo_items": todo_items, "answer_size": answer_size}
+    search = {"max_results": results_per_search, "content_size": result_size}
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        path = str(Path(tmp) / "checkpoints.db") if checkpoint else None
+
+        with offline_agent(ScriptedChatModel(**script), StubSearchTool(**search), path) as graph:
+            progress(f"overhead: {runs} runs of {steps} tool-calling turns")
+            _run(graph, mode, "Warm-up question", checkpoint)
+            results["overhead"] = _overhead(
+                [_run(graph, mode, f"Question {index}", checkpoint)[0] for index in range(runs)]
+            )
+
+            progress(f"memory: {runs} runs under tracemalloc")
+            results["memory"] = _memory(graph, mode, runs, checkpoint)
+
+        with offline_agent(ScriptedChatModel(**{**script, "steps": long_steps}), StubSearchTool(**search), path) as graph:
+            progress(f"scaling: one run of {long_steps} tool-calling turns")
+            results["scaling"] = _scaling(*_run(graph, mode, "Long question", checkpoint))
+
+        model = ScriptedChatModel(**script, latency=llm_latency)
+        with offline_agent(model, StubSearchTool(**search, latency=search_latency), path) as graph:
+            progress(f"throughput: {runs} runs, {concurrency} at a time")
+            start = time.perf_counter()
+            latencies = _concurrent(graph, mode, runs, concurrency, checkpoint)
+            elapsed = time.perf_counter() - start
+            # What a run would take if the graph cost nothing: the LLM calls, and the searches of a turn in parallel
+            ideal = (steps + 1) * llm_latency + steps * math.ceil(fan_out / config.MAX_PARALLEL_TOOLS) * search_latency
+            results["throughput"] = {
+                **_summarize(latencies),
+                "concurrency": concurrency,
+                "elapsed_sec": elapsed,
+                "runs_per_sec": runs / elapsed,
+                "llm_calls_per_sec": model.calls / elapsed,
+                "ideal_ms": ideal * 1e3,
+            }
+    return results
+
+
+@contextmanager
+def offline_agent(
+    model: ScriptedChatModel, search: StubSearchTool, checkpoint_path: Optional[str] = None
+) -> Iterator[CompiledStateGraph]:
+    """
+    The real agent graph from create_agent(), with the chat model and the search backend
+    swapped for offline stand-ins. Searches still go through CachedSearchTool, with a
+    cache that keeps no results, so every one of them reaches the stand-in.
+    """
+    saved = nodes.llm_with_tools, nodes.uncached_llm_with_tools, nodes.tools_by_name[search.name]
+    nodes.llm_with_tools = nodes.uncached_llm_with_tools = model
+    nodes.tools_by_name[search.name] = CachedSearchTool(search, SearchCache(max_size=0))
+    checkpointer = create_checkpointer(checkpoint_path) if checkpoint_path else None
+    try:
+        yield create_agent(checkpointer=checkpointer)
+    finally:
+        nodes.llm_with_tools, nodes.uncached_llm_with_tools, nodes.tools_by_name[search.name] = saved
+        if checkpointer is not None:
+            checkpointer.close()
+
+
+def _run(graph: CompiledStateGraph, mode: str, question: str, checkpoint: bool) -> Tuple[List[Step], List[AnyMessage]]:
+    """
+    Runs one question, timing each step from one state update to the next.
+
+    Returns:
+        The steps, and the messages of the final state
+    """
+    state = initial_state(question)
+    run_config = thread_config() if checkpoint else {}
+    messages = list(state["messages"])
+    steps: List[Step] = []
+
+    def record(update: Dict[str, Any], last: float) -> float:
+        now = time.perf_counter()
+        for node, values in update.items():
+            steps.append((node, len(messages), now - last))
+            messages.extend((values or {}).get("messages", []))
+        # Bookkeeping is left out of the next step's time
+        return time.perf_counter()
+
+    if mode == "sync":
+        last = time.perf_counter()
+        for update in graph.stream(state, run_config, stream_mode="updates"):
+            last = record(update, last)
+    else:
+        async def drive() -> None:
+            last = time.perf_counter()
+            async for update in graph.astream(state, run_config, stream_mode="updates"):
+                last = record(update, last)
+
+        asyncio.run(drive())
+    return steps, messages
+
+
+def _overhead(runs: List[List[Step]]) -> Dict[str, Any]:
+    """Step times by node, and the time of a whole run"""
+    by_node: Dict[str, List[float]] = {}
+    for steps in runs:
+        for node, _, seconds in steps:
+            by_node.setdefault(node, []).append(seconds)
+    return {
+        "steps_per_run": statistics.fmean(len(steps) for steps in runs),
+        "nodes": {node: _summarize(seconds) for node, seconds in by_node.items()},
+        "run": _summarize([sum(seconds for _, _, seconds in steps) for steps in runs]),
+    }
+
+
+def _scaling(steps: List[Step], messages: List[AnyMessage]) -> Dict[str, Any]:
+    """
+    How step times grow with the history: a least-squares line of each node's step time
+    against the number of messages in the state, and a sample of the points. The state
+    is copied, counted for the context budget and (when checkpointing) serialized on
+    every step, so the slope is the per-message cost of those.
+    """
+    by_node: Dict[str, Dict[str, Any]] = {}
+    for node in sorted({node for node, _, _ in steps}):
+        points = [(history, seconds) for name, history, seconds in steps if name == node]
+        result: Dict[str, Any] = {"count": len(points)}
+        if len(points) > 1 and len({history for history, _ in points}) > 1:
+            slope, intercept = statistics.linear_regression(
+                [history for history, _ in points], [seconds for _, seconds in points]
+            )
+            result.update(us_per_message=slope * 1e6, intercept_ms=intercept * 1e3)
+        every = max(1, len(points) // SCALING_SAMPLES)
+        result["samples"] = [[history, seconds * 1e3] for history, seconds in points[::every]]
+        by_node[node] = result
+    _, serialized = JsonPlusSerializer().dumps_typed(messages)
+    return {"messages": len(messages), "state_bytes": len(serialized), "nodes": by_node}
+
+
+def _memory(graph: CompiledStateGraph, mode: str, runs: int, checkpoint: bool) -> Dict[str, Any]:
+    """
+    Memory allocated by runs, traced with tracemalloc (which slows allocation down, so
+    this is kept apart from the timings): the peak above what was allocated before the
+    first run, and what is still allocated after the runs, in total and per run.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peaks, retained = [], []
+        for index in range(runs):
+            tracemalloc.reset_peak()
+            _run(graph, mode, f"Question memory {index}", checkpoint)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            gc.collect()
+            retained.append(tracemalloc.get_traced_memory()[0] - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        "runs": runs,
+        "peak_bytes": max(peaks),
+        "retained_bytes": retained[-1],
+        "growth_per_run_bytes": (retained[-1] - retained[0]) / (runs - 1) if runs > 1 else 0.0,
+    }
+
+
+def _concurrent(graph: CompiledStateGraph, mode: str, runs: int, concurrency: int, checkpoint: bool) -> List[float]:
+    """
+    Seconds each of ``runs`` runs took, ``concurrency`` at a time: streamed with
+    stream_agent as the server does, or with invoke from a thread pool.
+    """
+    def question(index: int) -> Dict[str, Any]:
+        return initial_state(f"Question load {index}")
+
+    if mode == "sync":
+        def run(index: int) -> float:
+            start = time.perf_counter()
+            graph.invoke(question(index), thread_config() if checkpoint else {})
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(run, range(runs)))
+
+    async def arun(index: int, limit: asyncio.Semaphore) -> float:
+        async with limit:
+            start = time.perf_counter()
+            async for _ in stream_agent(graph, question(index), thread_config() if checkpoint else None):
+                pass
+            return time.perf_counter() - start
+
+    async def all_runs() -> List[float]:
+        limit = asyncio.Semaphore(concurrency)
+        return list(await asyncio.gather(*(arun(index, limit) for index in range(runs))))
+
+    return asyncio.run(all_runs())
+
+
+def _summarize(seconds: List[float]) -> Dict[str, Any]:
+    """Latency statistics in milliseconds"""
+    ordered = sorted(seconds)
+    stats: Dict[str, Any] = {"count": len(ordered)}
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = percentile(ordered, p / 100) * 1e3
+    stats["mean_ms"] = statistics.fmean(ordered) * 1e3
+    stats["max_ms"] = ordered[-1] * 1e3
+    return stats
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -7,6 +9,34 @@ class Config(BaseSettings):
     OPENAI_API_KEY: str
     TAVILY_API_KEY: str
     PHOENIX_COLLECTOR_ENDPOINT: str = "http://localhost:4317"
+    # Tool calls from one LLM turn that may run at the same time
+    MAX_PARALLEL_TOOLS: int = 4
+    # Seconds a single tool call may run before it is reported as failed
+    TOOL_TIMEOUT_SECONDS: float = 30.0
+    # "stub" answers searches offline with made-up results, for tests and benchmarks
+    SEARCH_BACKEND: Literal["tavily", "stub"] = "tavily"
+    # Search results kept in memory, and how long they stay valid
+    SEARCH_CACHE_SIZE: int = 256
+    SEARCH_CACHE_TTL_SECONDS: float = 3600.0
+    # SQLite file that keeps search results across runs; unset keeps them in memory only
+    SEARCH_CACHE_PATH: Optional[str] = None
+    # SQLite file caching LLM responses, for replaying conversations (evals, retries); unset disables it
+    LLM_CACHE_PATH: Optional[str] = None
+    LLM_CACHE_MAX_ENTRIES: int = 10_000
+    # Prompt tokens the history may take before earlier tool outputs are elided
+    CONTEXT_TOKEN_BUDGET: int = 24_000
+    # SQLite file keeping every conversation thread's checkpoints
+    CHECKPOINT_PATH: str = "~/.plan_exec/checkpoints.db"
+    # Address the HTTP server (server.py) listens on
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    # Agent runs the server executes at the same time
+    MAX_CONCURRENT_RUNS: int = 4
+    # Requests that may wait for a free run; any beyond this get a 503
+    MAX_QUEUED_RUNS: int = 32
+    # Prompts a batch run (batch.py) runs at the same time, and most it starts per second (0: no limit)
+    BATCH_CONCURRENCY: int = 8
+    BATCH_RATE_LIMIT: float = 0.0
     
     
-config = Config()
\ No newline at end of file
+config = Config()
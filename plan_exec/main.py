@@ -1,33 +1,76 @@
-from langchain.messages import SystemMessage, HumanMessage
+import asyncio
+import sys
+
 from openinference.instrumentation.langchain import LangChainInstrumentor
 from phoenix.otel import register
 
-from agent import create_agent
-from agent.prompt_templates import AGENT_SYSTEM_PROMPT
+from agent import get_agent, stream_agent, thread_config, turn_input, aturn_input
 
 tracer_provider = register(project_name="plan_exec")
 LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
 
 
-def main(user_message):
-    agent = create_agent()
-
-    state = {
-        "todo": [],  # List[Item]
-        "messages": [
-            SystemMessage(content=AGENT_SYSTEM_PROMPT),
-            HumanMessage(content=user_message)
-        ]  # List[AnyMessage]
-    }
+def main(user_message, thread_id=None):
+    """Runs one user message on a thread (a new one if thread_id is None) and returns the final state"""
+    agent = get_agent()
+    config = thread_config(thread_id)
+    if agent.get_state(config).next:
+        # The previous run on this thread was interrupted; finish it first
+        agent.invoke(None, config)
 
-    response = agent.invoke(state)
+    response = agent.invoke(turn_input(agent, config, user_message), config)
 
     return response
 
 
+def resume(thread_id):
+    """Finishes an interrupted run on a thread from its last checkpoint, without redoing finished steps"""
+    agent = get_agent()
+    config = thread_config(thread_id)
+    if not agent.get_state(config).next:
+        return None
+    return agent.invoke(None, config)
+
+
+async def amain(user_message, thread_id=None):
+    """Runs the agent, printing the reply token by token along with tool calls and to-do updates"""
+    agent = get_agent()
+    config = thread_config(thread_id)
+    runs = [await aturn_input(agent, config, user_message)]
+    if (await agent.aget_state(config)).next:
+        # The previous run on this thread was interrupted; finish it first
+        runs.insert(0, None)
+        print("Resuming the interrupted run")
+
+    for state in runs:
+        async for event in stream_agent(agent, state, config):
+            _print_event(event)
+
+    return config["configurable"]["thread_id"]
+
+
+def _print_event(event):
+    """Prints one event of ``stream_agent``"""
+    if event["type"] == "token":
+        print(event["content"], end="", flush=True)
+    elif event["type"] == "tool_start":
+        print(f"\n[{event['name']}] {event['args']}", flush=True)
+    elif event["type"] == "tool_end":
+        status = f"failed: {event['error']}" if event["error"] else "done"
+        print(f"[{event['name']}] {status}", flush=True)
+    elif event["type"] == "todo":
+        print("To-do list:")
+        for item in event["todo"]:
+            print(f"  - [{item['status']}] {item['content']}")
+    elif event["type"] == "final":
+        print()
+
+
 if __name__ == "__main__":
+    # Pass a thread id to continue that conversation
+    thread_id = sys.argv[1] if len(sys.argv) > 1 else None
     user_message = input("What would you like to know? ")
-    response = main(user_message)
-    print(response)
+    thread_id = asyncio.run(amain(user_message, thread_id))
+    print(f"Continue this conversation with: python main.py {thread_id}")
     # agent = create_agent()
     # agent.get_graph().draw_mermaid_png(output_file_path="./graph.png")
\ No newline at end of file
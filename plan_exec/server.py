@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from langchain.messages import AIMessage, HumanMessage
+from openinference.instrumentation.langchain import LangChainInstrumentor
+from phoenix.otel import register
+from pydantic import BaseModel
+
+from agent import aturn_input, get_agent, stream_agent, thread_config
+from config import config
+from stats import percentile
+
+tracer_provider = register(project_name="plan_exec")
+LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
+
+logger = logging.getLogger(__name__)
+
+# Characters of a thread's first message used as its title
+TITLE_CHARS = 60
+# Finished requests whose latencies /metrics summarizes
+LATENCY_WINDOW = 1000
+
+
+class ChatRequest(BaseModel):
+    user_message: str
+    thread_id: Optional[str] = None
+
+
+class RunPool:
+    """
+    Admission control for agent runs: at most ``max_running`` run at a time, and up to
+    ``max_queued`` more wait for a slot in arrival order. Requests beyond that are
+    turned away instead of piling up.
+    """
+
+    def __init__(self, max_running: int, max_queued: int):
+        """
+        Args:
+            max_running: Agent runs at the same time
+            max_queued: Runs that may wait for a free slot
+        """
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.latencies: "deque[Dict[str, Any]]" = deque(maxlen=LATENCY_WINDOW)
+        self._slots = asyncio.Semaphore(max_running)
+
+    def admit(self, thread_id: str) -> Optional["Admission"]:
+        """Takes a place in the queue, or returns None if every slot and place is taken"""
+        if self.running + self.queued >= self.max_running + self.max_queued:
+            self.rejected += 1
+            return None
+        self.queued += 1
+        self.admitted += 1
+        return Admission(self, thread_id)
+
+    @asynccontextmanager
+    async def slot(self, admission: "Admission") -> AsyncIterator[None]:
+        """Waits for a free slot, leaving the queue, and holds it for the run"""
+        try:
+            await self._slots.acquire()
+        finally:
+            admission.leave_queue()
+        admission.latency["queue_wait"] = time.monotonic() - admission.arrived
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and latency percentiles (in seconds) of the recent requests"""
+        latency = {}
+        for name in ("queue_wait", "first_token", "total"):
+            values = sorted(entry[name] for entry in self.latencies if entry[name] is not None)
+            latency[name] = {
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": values[-1] if values else None,
+            }
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "max_running": self.max_running,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "latency": latency,
+            "recent": list(self.latencies)[-20:],
+        }
+
+
+class Admission:
+    """
+    An admitted request: its place in the pool's queue until its run gets a slot, and its
+    latency record, added to the pool's recent latencies when the request is over. Both
+    are given back once, however the request ends, even if its run never started.
+    """
+
+    def __init__(self, pool: RunPool, thread_id: str):
+        self.pool = pool
+        self.arrived = time.monotonic()
+        self.latency: Dict[str, Any] = {"thread_id": thread_id, "queue_wait": None, "first_token": None, "total": None}
+        self._queued = True
+        self._finished = False
+
+    def leave_queue(self) -> None:
+        if self._queued:
+            self._queued = False
+            self.pool.queued -= 1
+
+    def finish(self) -> None:
+        """Leaves the queue if still in it and records the latency"""
+        self.leave_queue()
+        if self._finished:
+            return
+        self._finished = True
+        latency = self.latency
+        latency["total"] = time.monotonic() - self.arrived
+        self.pool.latencies.append(latency)
+        logger.info(
+            "Run on thread %s: waited %s, first token %s, total %.3fs",
+            latency["thread_id"], _seconds(latency["queue_wait"]), _seconds(latency["first_token"]), latency["total"],
+        )
+
+
+class ReplyResponse(StreamingResponse):
+    """
+    Streams an admitted request's reply. The reply's generator finishes the admission
+    when it ends, but never runs at all if the client leaves before the body starts,
+    so the response finishes it too.
+    """
+
+    def __init__(self, content: AsyncIterator[str], admission: Admission, **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.admission = admission
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.finish()
+
+
+pool = RunPool(config.MAX_CONCURRENT_RUNS, config.MAX_QUEUED_RUNS)
+# One run per thread at a time, so two messages on a thread don't interleave
+_thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+app = FastAPI(title="plan_exec")
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest) -> StreamingResponse:
+    """Runs a user message on a thread, streaming the reply as plain text as it is written"""
+    run_config = thread_config(request.thread_id)
+    thread_id = run_config["configurable"]["thread_id"]
+    admission = pool.admit(thread_id)
+    if admission is None:
+        raise HTTPException(503, "Too many requests in progress; try again shortly", headers={"Retry-After": "1"})
+    return ReplyResponse(
+        _reply(run_config, request.user_message, admission),
+        admission,
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Thread-Id": thread_id},
+    )
+
+
+@app.get("/history/{thread_id}")
+async def history(thread_id: str) -> List[Dict[str, str]]:
+    """A thread's conversation: the user's messages and the agent's replies"""
+    state = await get_agent().aget_state(thread_config(thread_id))
+    if not state.values:
+        raise HTTPException(404, f"No thread {thread_id}")
+    conversation = []
+    for message in state.values.get("messages", []):
+        if isinstance(message, HumanMessage):
+            conversation.append({"role": "user", "content": message.text})
+        elif isinstance(message, AIMessage) and message.text:
+            conversation.append({"role": "assistant", "content": message.text})
+    return conversation
+
+
+@app.get("/threads")
+async def threads() -> List[Dict[str, str]]:
+    """Every thread, most recently updated first"""
+    found = await asyncio.to_thread(get_agent().checkpointer.threads)
+    return [
+        {"id": thread["id"], "title": thread["metadata"]["title"]} if thread["metadata"].get("title")
+        else {"id": thread["id"]}
+        for thread in found
+    ]
+
+
+@app.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """Queue depth, active runs and per-request latency"""
+    return pool.stats()
+
+
+async def _reply(run_config: Dict[str, Any], user_message: str, admission: Admission) -> AsyncIterator[str]:
+    """
+    Waits for a slot in the pool, runs the agent and yields its reply as text: the
+    LLM's tokens as they arrive, with a blank line between the replies of successive
+    LLM turns.
+    """
+    thread_id = run_config["configurable"]["thread_id"]
+    latency = admission.latency
+    written = False  # anything sent yet
+    in_turn = False  # the current LLM turn has sent text
+    try:
+        lock = _thread_locks.setdefault(thread_id, asyncio.Lock())
+        async with lock, pool.slot(admission):
+            agent = get_agent()
+            current = await agent.aget_state(run_config)
+            # Checkpoint metadata, so /threads can list the thread by its first message
+            title = current.metadata.get("title") if current.metadata else None
+            run_config["metadata"] = {"title": title or user_message[:TITLE_CHARS]}
+            runs = [await aturn_input(agent, run_config, user_message)]
+            if current.next:
+                # The previous run on this thread was interrupted; finish it first
+                runs.insert(0, None)
+
+            for state in runs:
+                async for event in stream_agent(agent, state, run_config):
+                    kind = event["type"]
+                    text = event.get("content")
+                    if (kind == "token" or (kind == "final" and not in_turn)) and isinstance(text, str) and text:
+                        if written and not in_turn:
+                            text = "\n\n" + text
+                        if latency["first_token"] is None:
+                            latency["first_token"] = time.monotonic() - admission.arrived
+                        written = in_turn = True
+                        yield text
+                    if kind in ("tool_start", "final"):
+                        in_turn = False
+    except Exception as e:
+        pool.failed += 1
+        logger.exception("Run on thread %s failed", thread_id)
+        yield ("\n\n" if written else "") + f"Something went wrong: {e}"
+    finally:
+        admission.finish()
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}s"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=config.SERVER_HOST, port=config.SERVER_PORT)
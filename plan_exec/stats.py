@@ -0,0 +1,20 @@
+from typing import Optional, Sequence
+
+
+def percentile(ordered: Sequence[float], q: float) -> Optional[float]:
+    """
+    Linearly interpolated percentile of a sorted sequence.
+
+    Args:
+        ordered: The values, sorted
+        q: The percentile as a fraction, e.g. 0.95 for the 95th
+
+    Returns:
+        The percentile, or None if there are no values
+    """
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
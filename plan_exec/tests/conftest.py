@@ -0,0 +1,27 @@
+"""Shared setup for the plan_exec tests, run from the plan_exec directory with `uv run --with pytest pytest`."""
+
+import os
+
+# The settings require API keys, though the tests never call the APIs
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("TAVILY_API_KEY", "offline")
+os.environ.setdefault("SEARCH_BACKEND", "stub")
+# No trace collector runs during the tests, and exporting each span to a missing one stalls every call
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import pytest  # noqa: E402
+
+from benchmarks.fakes import ScriptedChatModel  # noqa: E402
+from benchmarks.runner import offline_agent  # noqa: E402
+from agent.search import StubSearchTool  # noqa: E402
+
+
+@pytest.fixture
+def offline_graph(tmp_path):
+    """
+    The agent graph with a scripted chat model (one turn of two searches, then the answer)
+    and offline search, saving checkpoints to a temporary file.
+    """
+    model = ScriptedChatModel(steps=1, fan_out=2, todo_items=0, answer_size=80)
+    with offline_agent(model, StubSearchTool(), str(tmp_path / "checkpoints.db")) as graph:
+        yield graph
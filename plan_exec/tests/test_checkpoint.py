@@ -0,0 +1,89 @@
+import pytest
+from langchain.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+from agent import create_agent, create_checkpointer, initial_state, thread_config, nodes
+
+
+def _texts(state):
+    return [message.text for message in state.values["messages"] if isinstance(message, (AIMessage, HumanMessage)) and message.text]
+
+
+def test_thread_state_survives_reopening_the_file(offline_graph, tmp_path):
+    config = thread_config("paris")
+    config["metadata"] = {"title": "Where is Paris?"}
+    offline_graph.invoke(initial_state("Where is Paris?"), config)
+    expected = offline_graph.get_state(config)
+    offline_graph.checkpointer.close()
+
+    checkpointer = create_checkpointer(str(tmp_path / "checkpoints.db"))
+    try:
+        state = create_agent(checkpointer=checkpointer).get_state(thread_config("paris"))
+        assert state.values["messages"] == expected.values["messages"]
+        assert not state.next
+        assert [(thread["id"], thread["metadata"]["title"]) for thread in checkpointer.threads()] == [("paris", "Where is Paris?")]
+        # Every step was saved, newest first
+        steps = [entry.metadata["step"] for entry in checkpointer.list(thread_config("paris"))]
+        assert steps == sorted(steps, reverse=True) and len(steps) > 1
+    finally:
+        checkpointer.close()
+
+
+def test_resume_skips_the_steps_that_finished(offline_graph):
+    config = thread_config()
+    offline_graph.invoke(initial_state("Where is Paris?"), config, interrupt_before=["tool_node"])
+    # A task per tool call
+    assert offline_graph.get_state(config).next == ("tool_node", "tool_node")
+    calls = nodes.llm_with_tools.calls
+
+    offline_graph.invoke(None, config)
+
+    # Only the answer is asked for; the turn that made the tool calls is not redone
+    assert nodes.llm_with_tools.calls == calls + 1
+    assert _texts(offline_graph.get_state(config))[-1].startswith("Answer to Where is Paris?")
+
+
+def test_deleted_threads_are_gone(offline_graph):
+    offline_graph.invoke(initial_state("Where is Paris?"), thread_config("paris"))
+
+    offline_graph.checkpointer.delete_thread("paris")
+
+    assert offline_graph.checkpointer.threads() == []
+    assert not offline_graph.get_state(thread_config("paris")).values
+
+
+class _Killed(BaseException):
+    """Stands in for the process dying: not an Exception, so no tool error handling catches it"""
+
+
+def test_a_run_killed_mid_tool_step_only_redoes_the_unfinished_calls(offline_graph, monkeypatch):
+    name = nodes.tools_by_name["tavily_search_results_json"].name
+    searched = []
+    kill = True
+
+    @tool
+    def search(query: str) -> str:
+        """Records the search, and kills the run at the second one"""
+        searched.append(query)
+        if kill and len(searched) == 2:
+            raise _Killed()
+        return f"Results for {query}"
+
+    monkeypatch.setitem(nodes.tools_by_name, name, search)
+    config = thread_config()
+    # One call at a time, so the first has finished when the second kills the run
+    with pytest.raises(_Killed):
+        offline_graph.invoke(initial_state("Where is Paris?"), {**config, "max_concurrency": 1})
+    assert len(searched) == 2
+
+    kill = False
+    offline_graph.invoke(None, config)
+
+    # Only the killed search ran again
+    assert searched == [searched[0], searched[1], searched[1]]
+    messages = offline_graph.get_state(config).values["messages"]
+    calls = [message for message in messages if isinstance(message, AIMessage) and message.tool_calls][0].tool_calls
+    results = [message for message in messages if isinstance(message, ToolMessage)]
+    assert [result.tool_call_id for result in results] == [call["id"] for call in calls]
+    assert [result.content for result in results] == [f"Results for {call['args']['query']}" for call in calls]
+    assert _texts(offline_graph.get_state(config))[-1].startswith("Answer to Where is Paris?")
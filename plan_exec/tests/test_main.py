@@ -0,0 +1,45 @@
+import asyncio
+
+from langchain.messages import AIMessage, HumanMessage
+
+import main
+from agent import initial_state, thread_config
+
+
+def _conversation(graph, thread_id):
+    messages = graph.get_state(thread_config(thread_id)).values["messages"]
+    return [
+        message.text for message in messages
+        if isinstance(message, HumanMessage) or (isinstance(message, AIMessage) and message.text)
+    ]
+
+
+def _interrupted_thread(graph):
+    config = thread_config()
+    graph.invoke(initial_state("Where is Paris?"), config, interrupt_before=["tool_node"])
+    return config["configurable"]["thread_id"]
+
+
+def test_main_finishes_an_interrupted_run_before_the_new_message(offline_graph, monkeypatch):
+    monkeypatch.setattr(main, "get_agent", lambda: offline_graph)
+    thread_id = _interrupted_thread(offline_graph)
+
+    main.main("Where is Rome?", thread_id)
+
+    conversation = _conversation(offline_graph, thread_id)
+    assert conversation[-2] == "Where is Rome?"
+    assert conversation[-3].startswith("Answer to Where is Paris?")
+    assert conversation[-1].startswith("Answer to Where is Rome?")
+
+
+def test_amain_finishes_an_interrupted_run_before_the_new_message(offline_graph, monkeypatch, capsys):
+    monkeypatch.setattr(main, "get_agent", lambda: offline_graph)
+    thread_id = _interrupted_thread(offline_graph)
+
+    asyncio.run(main.amain("Where is Rome?", thread_id))
+
+    conversation = _conversation(offline_graph, thread_id)
+    assert conversation[-2] == "Where is Rome?"
+    assert conversation[-3].startswith("Answer to Where is Paris?")
+    assert conversation[-1].startswith("Answer to Where is Rome?")
+    assert "Resuming the interrupted run" in capsys.readouterr().out
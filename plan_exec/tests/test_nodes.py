@@ -0,0 +1,39 @@
+import threading
+import time
+
+from langchain_core.tools import tool
+
+from agent import nodes
+
+
+def test_queued_calls_are_dropped_when_every_worker_hangs(monkeypatch):
+    release = threading.Event()
+
+    @tool
+    def hang(query: str) -> str:
+        """Blocks until the test ends"""
+        release.wait(5)
+        return query
+
+    monkeypatch.setitem(nodes.tools_by_name, "hang", hang)
+    calls = [{"name": "hang", "args": {"query": str(index)}, "id": str(index)} for index in range(3)]
+
+    started = time.monotonic()
+    try:
+        results = nodes.run_tool_calls(calls, max_parallel=1, timeout=0.2)
+    finally:
+        release.set()
+
+    # One round per call at most: the running call times out and the queued ones are never run
+    assert time.monotonic() - started < 1.5
+    assert [error for _, error in results] == [
+        "hang timed out after 0.2s",
+        "hang was not run: the other calls kept every worker busy",
+        "hang was not run: the other calls kept every worker busy",
+    ]
+
+
+def test_calls_within_the_timeout_all_run():
+    calls = [{"name": "write_todo", "args": {"todo": []}, "id": str(index)} for index in range(3)]
+
+    assert [error for _, error in nodes.run_tool_calls(calls, max_parallel=1, timeout=5)] == [None, None, None]
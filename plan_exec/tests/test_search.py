@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from agent.search import CachedSearchTool, SearchCache, StubSearchTool
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_lookups_share_one_search():
+    cache = SearchCache()
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_search("key", search) for _ in range(5)))
+
+    assert _run(scenario()) == [["result"]] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_waiter_takes_over_when_the_leader_is_cancelled():
+    cache = SearchCache()
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [f"result {len(calls)}"]
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.aget_or_search("key", search))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(cache.aget_or_search("key", search)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert _run(scenario()) == [["result 2"]] * 3
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_leaves_the_search_running():
+    cache = SearchCache()
+
+    async def search():
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.aget_or_search("key", search))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.aget_or_search("key", search))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await leader
+
+    assert _run(scenario()) == ["result"]
+
+
+def test_search_errors_reach_the_waiters_and_are_not_cached():
+    cache = SearchCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_search("key", failing) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in _run(scenario())] == [RuntimeError] * 3
+    assert cache.get_or_search("key", lambda: ["result"]) == ["result"]
+
+
+def test_results_expire_after_the_ttl():
+    cache = SearchCache(ttl=0)
+    cache.get_or_search("key", lambda: ["old"])
+
+    assert cache.get_or_search("key", lambda: ["new"]) == ["new"]
+
+
+def test_string_results_are_not_cached():
+    cache = SearchCache()
+    cache.get_or_search("key", lambda: "Error: rate limited")
+
+    assert cache.get_or_search("key", lambda: ["result"]) == ["result"]
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = SearchCache(max_size=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_search(key, lambda: [key])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_search("a", lambda: ["searched again"]) == ["a"]
+    assert cache.get_or_search("b", lambda: ["searched again"]) == ["searched again"]
+
+
+def test_cached_tool_answers_normalized_queries_from_the_cache(tmp_path):
+    backend = StubSearchTool()
+    tool = CachedSearchTool(backend, SearchCache(path=str(tmp_path / "search.db")))
+
+    first = tool.invoke({"query": "Capital of France?"})
+    again = tool.invoke({"query": "  capital of   FRANCE "})
+
+    assert again == first
+    assert backend.calls == 1
+
+    # A new process finds the result in the on-disk tier
+    restarted = CachedSearchTool(backend, SearchCache(path=str(tmp_path / "search.db")))
+    assert _run(restarted.ainvoke({"query": "capital of france"})) == first
+    assert backend.calls == 1
+    assert restarted.cache.stats()["disk_hits"] == 1
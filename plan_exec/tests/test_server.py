@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+import server
+from server import ReplyResponse, RunPool
+
+
+@pytest.fixture
+def client(offline_graph, monkeypatch):
+    monkeypatch.setattr(server, "get_agent", lambda: offline_graph)
+    monkeypatch.setattr(server, "pool", RunPool(max_running=1, max_queued=1))
+    with TestClient(server.app) as client:
+        yield client
+
+
+def test_chat_streams_the_reply_and_keeps_the_thread(client):
+    response = client.post("/chat", json={"user_message": "Where is Paris?"})
+
+    assert response.status_code == 200
+    assert response.text.startswith("Answer to Where is Paris?")
+    thread_id = response.headers["X-Thread-Id"]
+    assert [entry["role"] for entry in client.get(f"/history/{thread_id}").json()] == ["user", "assistant"]
+
+    metrics = client.get("/metrics").json()
+    assert (metrics["running"], metrics["queued"], metrics["admitted"]) == (0, 0, 1)
+    assert metrics["recent"][0]["first_token"] is not None
+
+
+def test_requests_beyond_the_queue_are_turned_away(client, monkeypatch):
+    monkeypatch.setattr(server, "pool", RunPool(max_running=0, max_queued=0))
+
+    response = client.post("/chat", json={"user_message": "Where is Paris?"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_reply_that_never_starts_gives_back_its_queue_place():
+    pool = RunPool(max_running=1, max_queued=1)
+    admission = pool.admit("thread")
+    started = []
+
+    async def body():
+        started.append(True)
+        yield "never sent"
+
+    async def gone(message):
+        # The client left before the response could start
+        raise OSError("connection reset")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    response = ReplyResponse(body(), admission)
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, gone))
+
+    assert not started
+    assert pool.queued == 0
+    assert [entry["thread_id"] for entry in pool.latencies] == ["thread"]
+    assert pool.admit("next") is not None
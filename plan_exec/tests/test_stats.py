@@ -0,0 +1,15 @@
+import pytest
+
+from stats import percentile
+
+
+def test_percentile_interpolates_between_values():
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.0) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 1.0) == 4.0
+    assert percentile([10.0, 20.0], 0.95) == pytest.approx(19.5)
+
+
+def test_percentile_of_nothing_is_none():
+    assert percentile([], 0.5) is None
+    assert percentile([7.0], 0.95) == 7.0